@@ -12,6 +12,8 @@ import time
 import subprocess
 import re
 import json
+import fnmatch
+import posixpath
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
 from typing import Dict, List, Tuple, Any, Optional, Union
@@ -19,11 +21,20 @@ from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 from eval_agents.core.utils import (
-    get_validated_repos,
     DEFAULT_DB_NAME,
-    run_cmd,
     update_repo_commit_id,
 )
+from eval_agents.core.runner_image import (
+    BASE_IMAGE,
+    ensure_runner_image,
+    remote_build_command,
+    runner_image_tag,
+)
+from eval_agents.core import git_mirror, repo_scanner, telemetry
+from eval_agents.core.git_mirror import CLONE_STRATEGIES, CLONE_STRATEGY, FALLBACK_STRATEGY
+from eval_agents.core.workspace import Workspace
+from eval_agents.core.docker_backend import DockerSDKBackend, SSHCLIBackend
+from eval_agents.core.work_queue import LeaseHeartbeat, claim_repos, default_worker_id, release_claims
 
 import logging
 
@@ -38,11 +49,13 @@ if not logger.handlers:
         format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
     )
 
-# Container configuration
-BASE_IMAGE = "python:3.13-alpine"
+# Container configuration (BASE_IMAGE comes from core.runner_image)
 WORKSPACE_DIR = "/workspace"
 REPO_DIR = f"{WORKSPACE_DIR}/repo"
 
+# Installs git only when the image does not already ship it
+INSTALL_GIT_CMD = "command -v git >/dev/null 2>&1 || apk add --no-cache git"
+
 # SSH configuration for Playerzero Ubuntu server
 PLAYERZERO_SSH_HOST = os.getenv("PLAYERZERO_SSH_HOST", "playerzero.example.com")
 PLAYERZERO_SSH_USER = os.getenv("PLAYERZERO_SSH_USER", "ubuntu")
@@ -65,7 +78,8 @@ class CloneAgent:
                  ssh_user: str = PLAYERZERO_SSH_USER,
                  ssh_key_path: str = PLAYERZERO_SSH_KEY_PATH,
                  ssh_port: str = PLAYERZERO_SSH_PORT,
-                 work_dir: str = "/tmp/repo_tests"):
+                 work_dir: str = "/tmp/repo_tests",
+                 clone_strategy: str = CLONE_STRATEGY):
         """Initialize the CloneAgent for connecting to the Playerzero Ubuntu server.
         
         Args:
@@ -74,12 +88,18 @@ class CloneAgent:
             ssh_key_path: Path to SSH private key
             ssh_port: SSH port
             work_dir: Remote directory to mount into containers
+            clone_strategy: One of full, shallow, blobless or mirror (see core/git_mirror.py)
         """
+        if clone_strategy not in CLONE_STRATEGIES:
+            raise ValueError(f"Unknown clone strategy: {clone_strategy}")
+
         self.ssh_host = ssh_host
         self.ssh_user = ssh_user
         self.ssh_key_path = ssh_key_path
         self.ssh_port = ssh_port
         self.work_dir = work_dir
+        self.clone_strategy = clone_strategy
+        self._image = None
         
         # Verify SSH connection and Docker availability
         self._verify_connection()
@@ -87,95 +107,56 @@ class CloneAgent:
     def _verify_connection(self) -> None:
         """Verify SSH connection and Docker availability on the Playerzero Ubuntu server.
         Falls back to local Docker if SSH connection fails.
+        
+        Selects the execution backend: the docker CLI over a multiplexed SSH
+        connection for the remote server, or the shared Docker SDK client locally.
         """
         self.use_remote = True
         self.use_local_docker = False
         
-        # Test SSH connection using agent forwarding
-        ssh_cmd = ["ssh"]
-        
-        # Add key if provided
-        if self.ssh_key_path and os.path.exists(self.ssh_key_path):
-            ssh_cmd.extend(["-i", self.ssh_key_path])
-        
-        # Add other SSH options
-        ssh_cmd.extend([
-            "-p", self.ssh_port,
-            "-o", "StrictHostKeyChecking=no",
-            "-A",  # Enable SSH agent forwarding
-            f"{self.ssh_user}@{self.ssh_host}",
-            "echo 'SSH connection successful'"
-        ])
+        ssh_backend = SSHCLIBackend(self.ssh_host, self.ssh_user, self.ssh_key_path, self.ssh_port)
+        self._ssh = ssh_backend
         
         logger.info(f"Testing SSH connection to {self.ssh_user}@{self.ssh_host}...")
-        stdout, stderr, exit_code = run_cmd(ssh_cmd)
+        exit_code, stdout, stderr = ssh_backend.run("echo 'SSH connection successful'")
         
         if exit_code != 0:
             logger.info(f"SSH connection failed: {stderr}")
-            logger.info("Falling back to local Docker")
-            self.use_remote = False
-            self.use_local_docker = True
+        else:
+            logger.info("SSH connection successful!")
             
-            # Check local Docker availability
-            docker_cmd = ["docker", "--version"]
-            stdout, stderr, exit_code = run_cmd(docker_cmd)
+            # Check Docker availability on remote server
+            exit_code, stdout, stderr = ssh_backend.run("docker --version")
             
-            if exit_code != 0:
-                raise RuntimeError(f"Local Docker not available: {stderr}. Please install Docker or fix SSH connection.")
+            if exit_code == 0:
+                logger.info(f"Connected to Playerzero Ubuntu Docker: {stdout.strip()}")
+                logger.info(f"Using SSH connection to {self.ssh_user}@{self.ssh_host}:{self.ssh_port}")
+                logger.info(f"Working directory: {self.work_dir}")
+                
+                # Create work directory if it doesn't exist
+                ssh_backend.run(f"mkdir -p {self.work_dir}")
+                self.backend = ssh_backend
+                return
             
-            logger.info(f"Connected to Docker: {stdout.strip()}")
-            return
-        
-        logger.info("SSH connection successful!")
-        
-        # Check Docker availability on remote server
-        docker_cmd = ["ssh"]
-        
-        # Add key if provided and valid
-        if self.ssh_key_path and os.path.exists(self.ssh_key_path):
-            docker_cmd.extend(["-i", self.ssh_key_path])
+            logger.info(f"Docker not available on remote server: {stderr}")
         
-        # Add other SSH options
-        docker_cmd.extend([
-            "-p", self.ssh_port,
-            "-o", "StrictHostKeyChecking=no",
-            "-A",  # Enable SSH agent forwarding
-            f"{self.ssh_user}@{self.ssh_host}",
-            "docker --version"
-        ])
+        logger.info("Falling back to local Docker")
+        self._connect_local()
+    
+    def _connect_local(self) -> None:
+        """Switch to the local Docker daemon through the shared Docker SDK client."""
+        self.use_remote = False
+        self.use_local_docker = True
         
-        stdout, stderr, exit_code = run_cmd(docker_cmd)
+        # Check local Docker availability
+        local_backend = DockerSDKBackend()
+        try:
+            version = local_backend.version()
+        except Exception as e:
+            raise RuntimeError(f"Local Docker not available: {str(e)}. Please install Docker or fix SSH connection.")
         
-        if exit_code != 0:
-            logger.info(f"Docker not available on remote server: {stderr}")
-            logger.info("Falling back to local Docker")
-            self.use_remote = False
-            self.use_local_docker = True
-            
-            # Check local Docker availability
-            docker_cmd = ["docker", "--version"]
-            stdout, stderr, exit_code = run_cmd(docker_cmd)
-            
-            if exit_code != 0:
-                raise RuntimeError(f"Local Docker not available: {stderr}. Please install Docker or fix SSH connection.")
-            
-            logger.info(f"Connected to Docker: {stdout.strip()}")
-            return
-        
-        logger.info(f"Connected to Playerzero Ubuntu Docker: {stdout.strip()}")
-        logger.info(f"Using SSH connection to {self.ssh_user}@{self.ssh_host}:{self.ssh_port}")
-        logger.info(f"Working directory: {self.work_dir}")
-        
-        # Create work directory if it doesn't exist
-        cmd = [
-            "ssh", 
-            "-i", self.ssh_key_path,
-            "-p", self.ssh_port,
-            f"{self.ssh_user}@{self.ssh_host}",
-            f"mkdir -p {self.work_dir}"
-        ]
-        
-        run_cmd(cmd)
+        logger.info(f"Connected to Docker: {version}")
+        self.backend = local_backend
     
     def _run_ssh_command(self, remote_cmd: str) -> Tuple[int, str, str]:
         """Run a command on the Playerzero Ubuntu server via SSH
@@ -186,29 +167,31 @@ class CloneAgent:
         Returns:
             Tuple of (exit_code, stdout, stderr)
         """
-        cmd = ["ssh"]
-        
-        # Add key if provided and valid
-        if self.ssh_key_path and os.path.exists(self.ssh_key_path):
-            cmd.extend(["-i", self.ssh_key_path])
-        
-        # Add other SSH options
-        cmd.extend([
-            "-p", self.ssh_port,
-            "-o", "StrictHostKeyChecking=no",
-            "-A",  # Enable SSH agent forwarding
-            f"{self.ssh_user}@{self.ssh_host}",
-            remote_cmd
-        ])
-        
-        stdout, stderr, exit_code = run_cmd(cmd)
-        return exit_code, stdout, stderr
+        return tuple(self._ssh.run(remote_cmd))
+    
+    def _runner_image(self) -> str:
+        """Return the pre-baked runner image, building it on first use.
+        
+        Falls back to BASE_IMAGE if the runner image cannot be built.
+        """
+        if self._image is None:
+            if self.use_remote:
+                exit_code, stdout, stderr = self._run_ssh_command(remote_build_command())
+                if exit_code == 0:
+                    self._image = runner_image_tag()
+                else:
+                    logger.info(f"Failed to build runner image on remote server: {stderr}")
+                    self._image = BASE_IMAGE
+            else:
+                self._image = ensure_runner_image()
+        return self._image
     
-    def clone_repo(self, repo_url: str) -> Tuple[bool, str, str, str]:
+    def clone_repo(self, repo_url: str, commit_id: Optional[str] = None) -> Tuple[bool, str, str, str]:
         """Clone a repository into a Docker container on the Playerzero Ubuntu server or locally.
         
         Args:
             repo_url: URL of the GitHub repository to clone
+            commit_id: Check out this commit instead of the default branch
             
         Returns:
             Tuple of (success, container_id, output, commit_id)
@@ -218,124 +201,125 @@ class CloneAgent:
         sanitized_repo_name = re.sub(r'[^a-zA-Z0-9_-]', '', repo_name)
         container_name = f"repo_test_{sanitized_repo_name}_{int(time.time())}"
         
-        if self.use_remote:
-            logger.info(f"Cloning {repo_url} into container {container_name} on Playerzero Ubuntu server")
-            
-            # Create container on remote server
-            remote_cmd = (
-                f"docker run -d --name {container_name} "
-                f"-v {self.work_dir}:{WORKSPACE_DIR} "
-                f"--memory=2g "
-                f"--workdir={WORKSPACE_DIR} "
-                f"{BASE_IMAGE} sleep infinity"
+        location = "on Playerzero Ubuntu server" if self.use_remote else "locally"
+        logger.info(f"Cloning {repo_url} into container {container_name} {location}")
+        
+        # Create container; the remote work directory is mounted into it
+        try:
+            container_id = self.backend.run_container(
+                self._runner_image(),
+                container_name,
+                workdir=WORKSPACE_DIR,
+                volumes={self.work_dir: WORKSPACE_DIR} if self.use_remote else None,
             )
-            
-            exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            
-            if exit_code != 0:
-                error_msg = f"Failed to create container: {stderr}"
-                return False, "", error_msg, ""
-            
-            container_id = stdout.strip()
-            
-            # Install git in container
-            remote_cmd = f"docker exec {container_name} apk add --no-cache git"
-            exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to install git: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            # Create repo directory
-            remote_cmd = f"docker exec {container_name} mkdir -p {REPO_DIR}"
-            exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to create repo directory: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            # Clone repository
-            remote_cmd = f"docker exec --workdir={REPO_DIR} {container_name} git clone {repo_url} ."
-            exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to clone repository: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            # Get commit ID
-            remote_cmd = f"docker exec --workdir={REPO_DIR} {container_name} git rev-parse HEAD"
-            exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to get commit ID: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            commit_id = stdout.strip()
-        else:
-            # Use local Docker
-            logger.info(f"Cloning {repo_url} into container {container_name} locally")
-            
-            # Create container locally
-            cmd = [
-                "docker", "run", "-d", 
-                "--name", container_name,
-                "--memory=2g",
-                "--workdir", WORKSPACE_DIR,
-                BASE_IMAGE, "sleep", "infinity"
-            ]
-            
-            stdout, stderr, exit_code = run_cmd(cmd)
-            
-            if exit_code != 0:
-                error_msg = f"Failed to create container: {stderr}"
-                return False, "", error_msg, ""
-            
-            container_id = stdout.strip()
-            
-            # Install git in container
-            cmd = ["docker", "exec", container_name, "apk", "add", "--no-cache", "git"]
-            stdout, stderr, exit_code = run_cmd(cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to install git: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            # Create repo directory
-            cmd = ["docker", "exec", container_name, "mkdir", "-p", REPO_DIR]
-            stdout, stderr, exit_code = run_cmd(cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to create repo directory: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            # Clone repository
-            cmd = ["docker", "exec", "--workdir", REPO_DIR, container_name, "git", "clone", repo_url, "."]
-            stdout, stderr, exit_code = run_cmd(cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to clone repository: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            # Get commit ID
-            cmd = ["docker", "exec", "--workdir", REPO_DIR, container_name, "git", "rev-parse", "HEAD"]
-            stdout, stderr, exit_code = run_cmd(cmd)
-            
-            if exit_code != 0:
-                self._cleanup_container(container_name)
-                error_msg = f"Failed to get commit ID: {stderr}"
-                return False, container_id, error_msg, ""
-            
-            commit_id = stdout.strip()
+        except Exception as e:
+            error_msg = f"Failed to create container: {str(e)}"
+            return False, "", error_msg, ""
+        
+        success, output, commit_id = self.clone_into(container_name, repo_url, commit_id)
+        if not success:
+            self._cleanup_container(container_name)
+            return False, container_id, output, ""
         
         return True, container_id, f"Successfully cloned {repo_url}", commit_id
     
+    def clone_into(self, container_name: str, repo_url: str,
+                   commit_id: Optional[str] = None) -> Tuple[bool, str, str]:
+        """Clone a repository into an already running container.
+        
+        Used with pooled containers (see :class:`ContainerPool`); the caller owns
+        the container and is responsible for cleaning it up.
+        
+        Args:
+            container_name: Name or ID of the running container
+            repo_url: URL of the GitHub repository to clone
+            commit_id: Check out this commit instead of the default branch
+                (used when resuming from a checkpoint)
+            
+        Returns:
+            Tuple of (success, output, commit_id)
+        """
+        # Any manifest scanned before this clone is stale
+        repo_scanner.invalidate(container_name, self.backend)
+        
+        # Clone through the host mirror cache when the workspace is mounted locally
+        if self.clone_strategy == "mirror":
+            head = self._clone_from_mirror(container_name, repo_url)
+            if head and commit_id:
+                return self._checkout(container_name, repo_url, commit_id)
+            if head:
+                return True, f"Successfully cloned {repo_url}", head
+        
+        # Install git in container (already present in the runner image)
+        exit_code, stdout, stderr = self.backend.exec(container_name, INSTALL_GIT_CMD)
+        
+        if exit_code != 0:
+            return False, f"Failed to install git: {stderr}", ""
+        
+        # Create repo directory
+        exit_code, stdout, stderr = self.backend.exec(container_name, ["mkdir", "-p", REPO_DIR])
+        
+        if exit_code != 0:
+            return False, f"Failed to create repo directory: {stderr}", ""
+        
+        # Clone repository
+        strategy = FALLBACK_STRATEGY if self.clone_strategy == "mirror" else self.clone_strategy
+        exit_code, stdout, stderr = self.backend.exec(
+            container_name, git_mirror.clone_command(repo_url, strategy), workdir=REPO_DIR
+        )
+        
+        if exit_code != 0:
+            return False, f"Failed to clone repository: {stderr}", ""
+        
+        if commit_id:
+            return self._checkout(container_name, repo_url, commit_id)
+        
+        # Get commit ID
+        exit_code, stdout, stderr = self.backend.exec(container_name, ["git", "rev-parse", "HEAD"], workdir=REPO_DIR)
+        
+        if exit_code != 0:
+            return False, f"Failed to get commit ID: {stderr}", ""
+        
+        return True, f"Successfully cloned {repo_url}", stdout.strip()
+    
+    def _checkout(self, container_name: str, repo_url: str, commit_id: str) -> Tuple[bool, str, str]:
+        """Check out *commit_id* in a freshly cloned repository.
+        
+        If the commit no longer exists (e.g. after a force push) the default
+        branch is kept and its commit ID returned instead.
+        
+        Returns:
+            Tuple of (success, output, commit_id) like :meth:`clone_into`
+        """
+        exit_code, stdout, stderr = self.backend.exec(
+            container_name, ["git", "checkout", "--quiet", "--detach", commit_id], workdir=REPO_DIR
+        )
+        if exit_code == 0:
+            return True, f"Successfully cloned {repo_url} at {commit_id}", commit_id
+        
+        logger.info(f"Could not check out {commit_id} in {repo_url}, using the default branch: {stderr.strip()}")
+        exit_code, stdout, stderr = self.backend.exec(container_name, ["git", "rev-parse", "HEAD"], workdir=REPO_DIR)
+        if exit_code != 0:
+            return False, f"Failed to get commit ID: {stderr}", ""
+        return True, f"Successfully cloned {repo_url}", stdout.strip()
+    
+    def _clone_from_mirror(self, container_name: str, repo_url: str) -> Optional[str]:
+        """Clone *repo_url* into the container's workspace from the host-side git mirror.
+        
+        Returns:
+            The commit ID, or None if the mirror cannot be used for this container
+        """
+        if self.use_remote or not git_mirror.is_available():
+            return None
+        host_repo = Workspace(container_name, self.backend).host_path(REPO_DIR)
+        if host_repo is None:
+            return None
+        try:
+            return git_mirror.clone_from_mirror(repo_url, host_repo)
+        except Exception as e:
+            logger.info(f"Mirror clone of {repo_url} failed, cloning in container: {str(e)}")
+            return None
+    
     def _cleanup_container(self, container_name: str) -> None:
         """Clean up a container on the Playerzero Ubuntu server or locally
         
@@ -343,22 +327,7 @@ class CloneAgent:
             container_name: Name of the container to clean up
         """
         try:
-            if self.use_remote:
-                # Stop the container on remote server
-                remote_cmd = f"docker stop {container_name}"
-                self._run_ssh_command(remote_cmd)
-                
-                # Remove the container from remote server
-                remote_cmd = f"docker rm {container_name}"
-                self._run_ssh_command(remote_cmd)
-            else:
-                # Stop the container locally
-                cmd = ["docker", "stop", container_name]
-                run_cmd(cmd)
-                
-                # Remove the container locally
-                cmd = ["docker", "rm", container_name]
-                run_cmd(cmd)
+            self.backend.remove_container(container_name)
         except Exception as e:
             logger.info(f"Error cleaning up container {container_name}: {str(e)}")
     
@@ -384,49 +353,19 @@ class CloneAgent:
         }
         
         try:
-            # Check for key files
-            for file_path in ["setup.py", "requirements.txt", "pyproject.toml", "pytest.ini", "conftest.py", "tox.ini"]:
-                if self.use_remote:
-                    remote_cmd = f"docker exec {container_name} test -f {REPO_DIR}/{file_path} && echo 'exists' || echo 'not found'"
-                    exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-                else:
-                    cmd = ["docker", "exec", container_name, "sh", "-c", f"test -f {REPO_DIR}/{file_path} && echo 'exists' || echo 'not found'"]
-                    stdout, stderr, exit_code = run_cmd(cmd)
-                
-                if stdout.strip() == "exists":
-                    key = f"has_{file_path.replace('.', '_')}"
-                    if key in structure:
-                        structure[key] = True
+            # One scan of the tree answers every check (see core/repo_scanner.py)
+            manifest = repo_scanner.get_manifest(container_name, self.backend, repo_dir=REPO_DIR)
             
-            # Check for tests directory
-            if self.use_remote:
-                remote_cmd = f"docker exec {container_name} test -d {REPO_DIR}/tests && echo 'exists' || echo 'not found'"
-                exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            else:
-                cmd = ["docker", "exec", container_name, "sh", "-c", f"test -d {REPO_DIR}/tests && echo 'exists' || echo 'not found'"]
-                stdout, stderr, exit_code = run_cmd(cmd)
-                
-            structure["has_tests_dir"] = (stdout.strip() == "exists")
-            
-            # Count Python files
-            if self.use_remote:
-                remote_cmd = f"docker exec {container_name} find {REPO_DIR} -name '*.py' | wc -l"
-                exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            else:
-                cmd = ["docker", "exec", container_name, "sh", "-c", f"find {REPO_DIR} -name '*.py' | wc -l"]
-                stdout, stderr, exit_code = run_cmd(cmd)
-                
-            structure["python_files"] = int(stdout.strip()) if stdout.strip().isdigit() else 0
-            
-            # Count test files
-            if self.use_remote:
-                remote_cmd = f"docker exec {container_name} find {REPO_DIR} -name 'test_*.py' -o -name '*_test.py' | wc -l"
-                exit_code, stdout, stderr = self._run_ssh_command(remote_cmd)
-            else:
-                cmd = ["docker", "exec", container_name, "sh", "-c", f"find {REPO_DIR} -name 'test_*.py' -o -name '*_test.py' | wc -l"]
-                stdout, stderr, exit_code = run_cmd(cmd)
-                
-            structure["test_files"] = int(stdout.strip()) if stdout.strip().isdigit() else 0
+            for file_path in ["setup.py", "requirements.txt", "pyproject.toml", "pytest.ini", "conftest.py", "tox.ini"]:
+                structure[f"has_{file_path.replace('.', '_')}"] = repo_scanner.has_file(manifest, file_path)
+            
+            structure["has_tests_dir"] = "tests" in manifest["directories"]
+            structure["python_files"] = manifest["languages"].get("Python", 0)
+            structure["test_files"] = sum(
+                1 for path in repo_scanner.files_with_extension(manifest, ".py")
+                if fnmatch.fnmatch(posixpath.basename(path), "test_*.py")
+                or fnmatch.fnmatch(posixpath.basename(path), "*_test.py")
+            )
         except Exception as e:
             logger.info(f"Error analyzing repository structure: {str(e)}")
             
@@ -443,41 +382,41 @@ class CloneAgent:
         Returns:
             Dictionary with repository information
         """
-        # Verify SSH connection before processing
-        self._verify_connection()
-        
-        # Clone the repository
-        success, container_id, output, commit_id = self.clone_repo(repo_url)
-        
-        if not success:
+        with telemetry.repo_context(repo_url):
+            # Clone the repository
+            with telemetry.span("clone"):
+                success, container_id, output, commit_id = self.clone_repo(repo_url)
+            
+            if not success:
+                return {
+                    "repo_url": repo_url,
+                    "success": False,
+                    "output": output,
+                    "commit_id": "",
+                    "structure": {},
+                    "remote_execution": self.use_remote
+                }
+            
+            # Extract container name from ID
+            container_name = container_id.strip()
+            
+            # Analyze repository structure
+            with telemetry.span("scan_structure"):
+                structure = self.get_repo_structure(container_name)
+            
+            # Clean up container if not keeping it
+            if not keep_container:
+                self._cleanup_container(container_name)
+            
             return {
                 "repo_url": repo_url,
-                "success": False,
+                "success": True,
                 "output": output,
-                "commit_id": "",
-                "structure": {},
+                "commit_id": commit_id,
+                "structure": structure,
+                "container_name": container_name if keep_container else "",
                 "remote_execution": self.use_remote
             }
-        
-        # Extract container name from ID
-        container_name = container_id.strip()
-        
-        # Analyze repository structure
-        structure = self.get_repo_structure(container_name)
-        
-        # Clean up container if not keeping it
-        if not keep_container:
-            self._cleanup_container(container_name)
-        
-        return {
-            "repo_url": repo_url,
-            "success": True,
-            "output": output,
-            "commit_id": commit_id,
-            "structure": structure,
-            "container_name": container_name if keep_container else "",
-            "remote_execution": self.use_remote
-        }
     
     def process_repos_parallel(self, repo_urls: List[str], max_parallel: int = DEFAULT_MAX_PARALLEL) -> List[Dict[str, Any]]:
         """Process multiple repositories in parallel on the Playerzero Ubuntu server or locally.
@@ -519,18 +458,21 @@ class CloneAgent:
         
         return results
         
-    def process_validated_repos(self, db_name: str = DEFAULT_DB_NAME, max_parallel: int = DEFAULT_MAX_PARALLEL) -> List[Dict[str, Any]]:
+    def process_validated_repos(self, db_name: str = DEFAULT_DB_NAME, max_parallel: int = DEFAULT_MAX_PARALLEL,
+                                limit: int = 10) -> List[Dict[str, Any]]:
         """Process repositories that have been validated but not yet tested on the Playerzero Ubuntu server or locally.
         
         Args:
             db_name: Name of the database to use
             max_parallel: Maximum number of parallel processes
+            limit: Maximum number of repositories to claim
             
         Returns:
             List of dictionaries with repository processing results
         """
-        # Get validated repositories from the database
-        repos = get_validated_repos(db_name)
+        # Claim validated repositories so concurrent workers skip them
+        worker_id = default_worker_id()
+        repos = claim_repos("test", worker_id, limit=limit, db_name=db_name)
         
         if not repos:
             logger.info("No validated repositories found in the database")
@@ -539,7 +481,12 @@ class CloneAgent:
         logger.info(f"Found {len(repos)} validated repositories to process")
         
         # Process repositories in parallel
-        return self.process_repos_parallel([repo["repo_url"] for repo in repos], max_parallel)
+        repo_urls = [repo["repo_url"] for repo in repos]
+        try:
+            with LeaseHeartbeat(worker_id, repo_urls, db_name):
+                return self.process_repos_parallel(repo_urls, max_parallel)
+        finally:
+            release_claims(repo_urls, worker_id, db_name)
 
 # ---------------------------------------------
 # CLI helper (python -m agents.clone_agent)
@@ -555,6 +502,8 @@ def main():
     parser.add_argument("--ssh-port", default=PLAYERZERO_SSH_PORT, help="SSH port for Playerzero Ubuntu server")
     parser.add_argument("--max-parallel", type=int, default=DEFAULT_MAX_PARALLEL, help="Maximum number of parallel processes")
     parser.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Database name to use")
+    parser.add_argument("--clone-strategy", choices=CLONE_STRATEGIES, default=CLONE_STRATEGY,
+                        help="How repositories are cloned (default: host mirror cache)")
     
     args = parser.parse_args()
     
@@ -563,7 +512,8 @@ def main():
         ssh_user=args.ssh_user,
         ssh_key_path=args.ssh_key,
         ssh_port=args.ssh_port,
-        work_dir=args.work_dir
+        work_dir=args.work_dir,
+        clone_strategy=args.clone_strategy
     )
     
     if args.repo:
@@ -13,14 +13,11 @@ Usage example:
 """
 
 import os
-import sys
-import time
 import argparse
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Set, Tuple
 
-import requests
 from dotenv import load_dotenv
 import logging
 
@@ -37,79 +34,13 @@ if not logger.handlers:
 
 # Import database utilities
 from eval_agents.core.utils import (
-    add_repo_to_db,
+    add_repos_to_db,
     is_repo_in_db,
     init_db,
     DEFAULT_DB_NAME,
 )
-
-# ---------------------------------
-# Helper functions
-# ---------------------------------
-
-def _github_request(path: str, params: Optional[Dict] = None, max_retries: int = 3) -> requests.Response:
-    """Make an authenticated request to the GitHub API.
-    
-    Handles rate limiting by waiting when necessary and implements retry logic
-    for transient failures.
-    
-    Args:
-        path: API endpoint path
-        params: Query parameters
-        max_retries: Maximum number of retry attempts
-        
-    Returns:
-        Response object from the GitHub API
-        
-    Raises:
-        requests.HTTPError: If the request fails after all retries
-    """
-    headers = {"Accept": "application/vnd.github+json"}
-
-    # Increased rate limits by using a GitHub token
-    token = os.getenv("GITHUB_TOKEN")
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-
-    url = f"https://api.github.com{path}"
-    
-    for attempt in range(max_retries):
-        try:
-            resp = requests.get(url, headers=headers, params=params, timeout=20)
-            
-            # Check for rate limiting
-            if resp.status_code == 403 and 'rate limit exceeded' in resp.text.lower():
-                reset_time = int(resp.headers.get('X-RateLimit-Reset', 0))
-                wait_time = max(reset_time - time.time(), 0) + 3  # Add 3 seconds buffer
-                
-                if wait_time > 60 and attempt < max_retries - 1:  # Don't wait on last attempt
-                    logger.info(f"Rate limit exceeded. Waiting {wait_time:.0f} seconds...")
-                    time.sleep(min(wait_time, 60))  # Wait at most 60 seconds
-                    continue
-            
-            resp.raise_for_status()
-            return resp
-            
-        except requests.HTTPError as exc:
-            if attempt < max_retries - 1 and resp.status_code in (429, 500, 502, 503, 504):
-                # Retry on rate limit or server errors
-                wait_time = 2 ** attempt  # Exponential backoff
-                logger.info(f"Request failed with {resp.status_code}. Retrying in {wait_time}s...")
-                time.sleep(wait_time)
-                continue
-            logger.info(f"GitHub API error for {url}: {resp.text}", file=sys.stderr)
-            raise exc
-        except (requests.ConnectionError, requests.Timeout) as exc:
-            if attempt < max_retries - 1:
-                wait_time = 2 ** attempt
-                logger.info(f"Connection error. Retrying in {wait_time}s...")
-                time.sleep(wait_time)
-                continue
-            raise exc
-    
-    # This should not be reached, but just in case
-    raise RuntimeError(f"Failed to get response from {url} after {max_retries} attempts")
-
+from eval_agents.core import github_async
+from eval_agents.core.github import github_request as _github_request
 
 @dataclass
 class DiscoveryAgent:
@@ -119,6 +50,7 @@ class DiscoveryAgent:
     db_name: str = DEFAULT_DB_NAME
     min_stars: int = 5  # Minimum number of stars to filter by
     custom_query: Optional[str] = None  # Custom query to add to the search
+    use_async: bool = True  # Run search queries concurrently when aiohttp is available
     
     def __post_init__(self):
         """Initialize the database if it doesn't exist."""
@@ -142,13 +74,10 @@ class DiscoveryAgent:
         # Search for repositories
         repos = self._search_repositories(limit=limit, integration_tests=integration_tests)
         
-        # Add repositories to database
-        added_repos = []
-        for repo in repos:
-            repo_url = repo["html_url"]
-            if add_repo_to_db(repo_url, self.language, self.db_name):
-                logger.info(f"Added repository: {repo_url}")
-                added_repos.append(repo_url)
+        # Add repositories to database in bulk; existing ones are skipped
+        added_repos = add_repos_to_db([repo["html_url"] for repo in repos], self.language, self.db_name)
+        for repo_url in added_repos:
+            logger.info(f"Added repository: {repo_url}")
         
         logger.info(f"Added {len(added_repos)} new repositories to the database")
         return added_repos
@@ -173,7 +102,7 @@ class DiscoveryAgent:
         
         if not integration_tests:
             # Standard search without integration test filtering
-            return self._execute_search_with_pagination(base_query, limit)
+            return self._search_single_query(base_query, limit)
         
         # Enhanced search for repositories with integration tests
         logger.info("Using enhanced search for integration tests")
@@ -206,14 +135,78 @@ class DiscoveryAgent:
         language_queries = self._get_language_specific_queries()
         integration_queries.extend([f"{base_query} {q}" for q in language_queries])
         
-        # Track repositories and their search match count
-        repo_matches = {}
-        repo_data = {}
-        
         # Calculate how many results we need per query to reach our limit
         # This is a heuristic - we'll get more results than needed and filter later
         results_per_query = min(100, max(25, limit // len(integration_queries) * 2))
         
+        if self._async_search_enabled():
+            try:
+                results = github_async.search_repositories(
+                    integration_queries, results_per_query, stop_after=limit * 3
+                )
+                top_repos = results.ranked()[:limit]
+            except Exception as e:
+                logger.info(f"Concurrent search failed, retrying sequentially: {str(e)}")
+                top_repos = self._search_sequentially(integration_queries, results_per_query, limit)
+        else:
+            top_repos = self._search_sequentially(integration_queries, results_per_query, limit)
+        
+        # If we didn't find enough repos with integration tests, fall back to regular search
+        if len(top_repos) < limit:
+            remaining = limit - len(top_repos)
+            logger.info(f"Found only {len(top_repos)} repositories with integration tests, falling back to standard search for {remaining} more")
+            
+            try:
+                fallback_repos = self._search_single_query(base_query, remaining)
+                
+                # Filter out repos we already found
+                existing_urls = {repo["html_url"] for repo in top_repos}
+                new_repos = [repo for repo in fallback_repos if repo["html_url"] not in existing_urls]
+                
+                top_repos.extend(new_repos[:remaining])
+                logger.info(f"Added {len(new_repos[:remaining])} repositories from fallback search")
+            except Exception as e:
+                logger.info(f"Error in fallback search: {str(e)}")
+        
+        return top_repos
+    
+    def _async_search_enabled(self) -> bool:
+        """Return True if search queries should run concurrently."""
+        return self.use_async and github_async.is_available()
+    
+    def _search_single_query(self, query: str, limit: int) -> List[Dict]:
+        """Run one search query, fetching its pages concurrently when possible.
+        
+        Args:
+            query: The search query string
+            limit: Maximum number of results to return
+            
+        Returns:
+            List of repository data dictionaries
+        """
+        if self._async_search_enabled():
+            try:
+                return github_async.search_repositories([query], limit).ranked()[:limit]
+            except Exception as e:
+                logger.info(f"Concurrent search failed, retrying sequentially: {str(e)}")
+        return self._execute_search_with_pagination(query, limit)
+    
+    def _search_sequentially(self, integration_queries: List[str], results_per_query: int,
+                             limit: int) -> List[Dict]:
+        """Run search queries one after another, ranking results by match count.
+        
+        Args:
+            integration_queries: Search query strings
+            results_per_query: Maximum number of results per query
+            limit: Maximum number of repositories to return
+            
+        Returns:
+            List of repository data dictionaries
+        """
+        # Track repositories and their search match count
+        repo_matches = {}
+        repo_data = {}
+        
         # Execute each search strategy
         for i, query in enumerate(integration_queries):
             try:
@@ -245,26 +238,7 @@ class DiscoveryAgent:
         )
         
         # Get the top repositories based on match frequency
-        top_repos = [repo_data[url] for url, _ in sorted_repos[:limit]]
-        
-        # If we didn't find enough repos with integration tests, fall back to regular search
-        if len(top_repos) < limit:
-            remaining = limit - len(top_repos)
-            logger.info(f"Found only {len(top_repos)} repositories with integration tests, falling back to standard search for {remaining} more")
-            
-            try:
-                fallback_repos = self._execute_search_with_pagination(base_query, remaining)
-                
-                # Filter out repos we already found
-                existing_urls = {repo["html_url"] for repo in top_repos}
-                new_repos = [repo for repo in fallback_repos if repo["html_url"] not in existing_urls]
-                
-                top_repos.extend(new_repos[:remaining])
-                logger.info(f"Added {len(new_repos[:remaining])} repositories from fallback search")
-            except Exception as e:
-                logger.info(f"Error in fallback search: {str(e)}")
-        
-        return top_repos
+        return [repo_data[url] for url, _ in sorted_repos[:limit]]
     
     def _execute_search(self, query: str, limit: int) -> List[Dict]:
         """Execute a GitHub search query.
@@ -317,12 +291,9 @@ class DiscoveryAgent:
                 if 'Link' not in resp.headers or 'rel="next"' not in resp.headers['Link']:
                     break
                     
-                # Move to next page
+                # Move to next page; the shared rate-limit governor paces requests
                 page += 1
                 
-                # Add a small delay to avoid hitting rate limits
-                time.sleep(0.5)
-                
             except Exception as e:
                 logger.info(f"Error in paginated search (page {page}): {str(e)}")
                 break
@@ -385,6 +356,8 @@ if __name__ == "__main__":
                         help="Don't prioritize repositories with integration tests")
     parser.add_argument("--custom-query", type=str, default=None,
                         help="Custom query to add to the search")
+    parser.add_argument("--no-async", action="store_false", dest="use_async",
+                        help="Run search queries one after another instead of concurrently")
     args = parser.parse_args()
     
     # Create agent
@@ -392,7 +365,8 @@ if __name__ == "__main__":
         language=args.lang,
         db_name=args.db_name,
         min_stars=args.min_stars,
-        custom_query=args.custom_query
+        custom_query=args.custom_query,
+        use_async=args.use_async
     )
     
     # Discover repositories
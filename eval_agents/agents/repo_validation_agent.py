@@ -23,7 +23,9 @@ import sys
 import json
 import requests
 import argparse
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 
 import anthropic
@@ -43,8 +45,17 @@ if not logger.handlers:
     )
 
 # Import database utilities
-from eval_agents.core.utils import update_validation_results, get_unvalidated_repos
+from eval_agents.core.utils import update_validation_results, update_validation_results_batch
 from eval_agents.core.utils import DEFAULT_DB_NAME
+from eval_agents.core import telemetry
+from eval_agents.core.github import github_request
+from eval_agents.core.work_queue import LeaseHeartbeat, claim_repos, default_worker_id, release_claims
+
+# Default number of concurrent GitHub fetches and LLM calls in validate_batch
+VALIDATION_CONCURRENCY = int(os.getenv("EVAL_AGENTS_VALIDATION_CONCURRENCY", "8"))
+
+# validate_batch writes results to the database in batches of this size
+VALIDATION_DB_BATCH = int(os.getenv("EVAL_AGENTS_VALIDATION_DB_BATCH", "50"))
 
 # ---------------------------------
 # Helper functions
@@ -67,32 +78,24 @@ def _get_repo_structure(repo_url: str) -> Dict[str, Any]:
     owner = parts[-2]
     repo = parts[-1]
     
-    # Get repository contents using GitHub API
-    headers = {}
-    github_token = os.getenv("GITHUB_TOKEN")
-    if github_token:
-        headers["Authorization"] = f"token {github_token}"
-    
-    # Get repository information
-    api_url = f"https://api.github.com/repos/{owner}/{repo}"
-    repo_response = requests.get(api_url, headers=headers)
-    if repo_response.status_code != 200:
-        raise ValueError(f"Failed to fetch repository info: {repo_response.text}")
-    
-    repo_info = repo_response.json()
+    # Get repository information; requests are paced by the shared rate-limit governor
+    try:
+        repo_info = github_request(f"/repos/{owner}/{repo}").json()
+    except requests.HTTPError as e:
+        raise ValueError(f"Failed to fetch repository info: {e.response.text}")
     
     # Get file structure (recursive tree)
-    tree_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/HEAD?recursive=1"
-    tree_response = requests.get(tree_url, headers=headers)
-    if tree_response.status_code != 200:
-        raise ValueError(f"Failed to fetch repository structure: {tree_response.text}")
+    try:
+        tree = github_request(f"/repos/{owner}/{repo}/git/trees/HEAD", params={"recursive": "1"}).json()
+    except requests.HTTPError as e:
+        raise ValueError(f"Failed to fetch repository structure: {e.response.text}")
     
     # Combine repo info with file structure
     result = {
         "name": repo_info["name"],
         "description": repo_info["description"],
         "language": repo_info["language"],
-        "files": [item["path"] for item in tree_response.json().get("tree", []) if item["type"] == "blob"],
+        "files": [item["path"] for item in tree.get("tree", []) if item["type"] == "blob"],
         "url": repo_url
     }
     
@@ -201,6 +204,7 @@ class RepoValidationAgent:
     """Agent that validates GitHub repositories for integration tests."""
     
     db_name: str = DEFAULT_DB_NAME
+    worker_id: str = field(default_factory=default_worker_id)  # Identifier used for DB claims
     
     def validate_repo(self, repo_url: str) -> Tuple[bool, str]:
         """Validate a GitHub repository.
@@ -237,27 +241,84 @@ class RepoValidationAgent:
             
             return False, error_msg
     
-    def validate_batch(self, limit: int = 10) -> List[Tuple[str, bool, str]]:
+    def validate_batch(self, limit: int = 10,
+                       concurrency: int = VALIDATION_CONCURRENCY) -> List[Tuple[str, bool, str]]:
         """Validate a batch of unvalidated repositories from the database.
         
+        Repositories are validated concurrently: GitHub fetches run on one
+        pool of ``concurrency`` workers and LLM analyses on another, so the
+        two overlap, and results are written to the database in batches.
+        
         Args:
             limit: Maximum number of repositories to validate
+            concurrency: Number of concurrent GitHub fetches and LLM calls
             
         Returns:
             List of tuples containing (repo_url, is_valid, explanation)
         """
-        logger.info(f"Validating up to {limit} repositories...")
+        logger.info(f"Validating up to {limit} repositories (concurrency={concurrency})...")
+        concurrency = max(1, concurrency)
         
-        # Get unvalidated repositories
-        repos = get_unvalidated_repos(limit=limit, db_name=self.db_name)
+        # Claim unvalidated repositories so concurrent validators skip them
+        repos = [repo["repo_url"] for repo in claim_repos("validation", self.worker_id, limit=limit, db_name=self.db_name)]
         
-        results = []
-        for repo_url in repos:
-            is_valid, explanation = self.validate_repo(repo_url)
-            results.append((repo_url, is_valid, explanation))
+        results: Dict[str, Tuple[bool, str]] = {}
+        unwritten: List[Tuple[str, bool, str]] = []
+        
+        try:
+            with LeaseHeartbeat(self.worker_id, repos, self.db_name) as heartbeat, \
+                    ThreadPoolExecutor(concurrency, thread_name_prefix="validate-fetch") as fetch_pool, \
+                    ThreadPoolExecutor(concurrency, thread_name_prefix="validate-llm") as llm_pool:
+                
+                def record(repo_url: str, is_valid: bool, explanation: str) -> None:
+                    logger.info(f"Validation result for {repo_url}: {'PASS' if is_valid else 'FAIL'} - {explanation}")
+                    results[repo_url] = (is_valid, explanation)
+                    unwritten.append((repo_url, is_valid, explanation))
+                
+                def flush() -> None:
+                    try:
+                        update_validation_results_batch(unwritten, self.db_name)
+                    except Exception as e:
+                        logger.info(f"Error saving validation results: {str(e)}")
+                    heartbeat.discard([repo_url for repo_url, _, _ in unwritten])
+                    unwritten.clear()
+                
+                queued = deque(repos)
+                in_flight: Dict[Future, Tuple[str, str]] = {}
+                
+                while queued or in_flight:
+                    # Bound the repositories held between fetch and write
+                    while queued and len(in_flight) < 2 * concurrency:
+                        repo_url = queued.popleft()
+                        future = fetch_pool.submit(telemetry.traced, "github_fetch", repo_url,
+                                                   _get_repo_structure, repo_url)
+                        in_flight[future] = ("fetch", repo_url)
+                    
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, repo_url = in_flight.pop(future)
+                        try:
+                            value = future.result()
+                        except Exception as e:
+                            record(repo_url, False, f"Error validating repository: {str(e)}")
+                            continue
+                        if stage == "fetch":
+                            future = llm_pool.submit(telemetry.traced, "validate_llm", repo_url,
+                                                     _analyze_with_openai, value)
+                            in_flight[future] = ("analyze", repo_url)
+                        else:
+                            record(repo_url, *value)
+                    
+                    if len(unwritten) >= VALIDATION_DB_BATCH:
+                        flush()
+                
+                if unwritten:
+                    flush()
+        finally:
+            release_claims(repos, self.worker_id, self.db_name)
         
         logger.info(f"Validated {len(results)} repositories")
-        return results
+        return [(repo_url, *results[repo_url]) for repo_url in repos if repo_url in results]
 
 
 if __name__ == "__main__":
@@ -265,6 +326,8 @@ if __name__ == "__main__":
     parser.add_argument("--url", help="URL of a specific repository to validate")
     parser.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Name of the PostgreSQL database")
     parser.add_argument("--limit", type=int, default=10, help="Maximum number of repositories to validate")
+    parser.add_argument("--concurrency", type=int, default=VALIDATION_CONCURRENCY,
+                        help="Number of repositories validated concurrently")
     args = parser.parse_args()
     
     # Create agent
@@ -277,7 +340,7 @@ if __name__ == "__main__":
         logger.info(f"Explanation: {explanation}")
     else:
         # Validate a batch of repositories
-        results = agent.validate_batch(limit=args.limit)
+        results = agent.validate_batch(limit=args.limit, concurrency=args.concurrency)
         
         # Print results
         logger.info("\nValidation Results:")
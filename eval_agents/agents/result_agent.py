@@ -18,6 +18,9 @@ import re
 from anthropic import Anthropic
 from dotenv import load_dotenv
 
+from eval_agents.core import result_parsers, telemetry
+from eval_agents.core.llm_cache import create_message_text
+
 # Load env vars
 load_dotenv()
 
@@ -79,24 +82,83 @@ class ResultAgent:
             if system_prompt:
                 params["system"] = system_prompt
                 
-            # Call the API
-            message = self.claude_client.messages.create(**params)
-            return message.content[0].text
+            # Call the API; identical requests are answered from the response cache
+            return create_message_text(self.claude_client, params)
         except Exception as e:
             logger.info(f"Error calling Claude API: {str(e)}")
             return ""
     
-    def evaluate_test_validity(self, test_output: str) -> Dict[str, Any]:
+    def _parse_locally(self, test_output: str,
+                       junit: Optional[Dict[str, Any]] = None) -> Optional[result_parsers.ParsedResults]:
+        """
+        Parse the runner summary in the output with the deterministic parsers.
+        
+        Args:
+            test_output: Raw test output including setup logs and test results
+            junit: JUnit report results of the run (see core/junit.py); used instead of the output
+            
+        Returns:
+            Parsed results, or None if no parser matched with enough confidence
+        """
+        with telemetry.span("parse_locally") as span_attrs:
+            if junit and junit.get("summary", {}).get("total"):
+                parsed = result_parsers.ParsedResults.from_dict(junit["summary"])
+            else:
+                parsed = result_parsers.parse(test_output or "")
+            span_attrs["parser"] = parsed.framework if parsed else None
+        telemetry.registry.inc("eval_agents_result_parser_total", help="Test outputs by result parser used",
+                               parser=parsed.framework if parsed else "llm")
+        return parsed
+    
+    def _evaluate_parsed(self, parsed: Optional[result_parsers.ParsedResults], test_output: str,
+                         exit_code: Optional[int]) -> Optional[Dict[str, Any]]:
+        """
+        Classify the test run from its parsed summary when the outcome is unambiguous.
+        
+        See result_parsers.classify for when a run is classified without Claude.
+        
+        Args:
+            parsed: Parsed results of the run, or None
+            test_output: Raw test output including setup logs and test results
+            exit_code: Exit code of the test script, or None if unknown
+            
+        Returns:
+            Evaluation in the same format as Claude's, or None to fall back to Claude
+        """
+        classified = result_parsers.classify(parsed, test_output, exit_code) if parsed else None
+        if classified is None:
+            return None
+        validity, reason = classified
+        return {
+            "validity": validity,
+            "reason": reason,
+            "fixable": False,
+            "suggested_fix": "",
+            "confidence": parsed.confidence,
+            "parser": parsed.framework,
+            "timestamp": datetime.now().isoformat(),
+            "raw_evaluation": ""
+        }
+    
+    def evaluate_test_validity(self, test_output: str, parsed: Optional[result_parsers.ParsedResults] = None,
+                               exit_code: Optional[int] = None) -> Dict[str, Any]:
         """
         Evaluate if tests are valid or failed due to environment/dependency issues.
         
         Args:
             test_output: Raw test output including setup logs and test results
+            parsed: Results from _parse_locally; clear-cut runs are classified without Claude
+            exit_code: Exit code of the test script, or None if unknown
             
         Returns:
             Dictionary with test validity evaluation and potential fixes
         """
         try:
+            # Clear-cut runs are classified from the parsed summary without asking Claude
+            evaluation = self._evaluate_parsed(parsed, test_output, exit_code)
+            if evaluation is not None:
+                return evaluation
+            
             system_prompt = """
             You are an expert at analyzing Python test outputs and determining test validity.
             Your task is to evaluate whether test failures are due to actual code issues or due to 
@@ -173,17 +235,32 @@ class ResultAgent:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def extract_test_results(self, test_output: str) -> Dict[str, Any]:
+    def extract_test_results(self, test_output: str, parsed: Optional[result_parsers.ParsedResults] = None,
+                             junit: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Extract test results from raw output using Claude.
+        Extract test results from raw output, using Claude only if it was not parsed locally.
         
         Args:
             test_output: Raw test output including setup logs and test results
+            parsed: Results from _parse_locally, or None to ask Claude
+            junit: JUnit report results of the run, if any; their per-test records are kept
             
         Returns:
             Dictionary with parsed test results
         """
         try:
+            if parsed is not None:
+                results = {
+                    "analyzed_output": parsed.summary(),
+                    "parsed_results": parsed.to_dict(),
+                    "parser": parsed.framework,
+                    "raw_output": test_output,
+                    "timestamp": datetime.now().isoformat()
+                }
+                if junit:
+                    results["test_cases"] = junit.get("tests", [])
+                return results
+            
             system_prompt = """
             You are an expert at analyzing Python test outputs. Your task is to extract only the relevant test results 
             from the raw output of a test run. Ignore all setup logs, installation messages, and other non-test output.
@@ -250,23 +327,31 @@ class ResultAgent:
                 "timestamp": datetime.now().isoformat()
             }
     
-    def extract_and_save_results(self, test_output: str, repo_name: str = None) -> Dict[str, Any]:
+    def extract_and_save_results(self, test_output: str, repo_name: str = None,
+                                 junit: Optional[Dict[str, Any]] = None,
+                                 exit_code: Optional[int] = None) -> Dict[str, Any]:
         """
         Extract test results and save them to a JSON file.
         
         Args:
             test_output: Raw test output including setup logs and test results
             repo_name: Optional name of the repository being tested
+            junit: JUnit report results of the run (TestAgent.run_tests), if any
+            exit_code: Exit code of the test script, or None if unknown
             
         Returns:
             Dictionary with parsed test results and file path
         """
         try:
+            parsed = self._parse_locally(test_output, junit)
+            
             # First evaluate test validity
-            validity_results = self.evaluate_test_validity(test_output)
+            with telemetry.span("evaluate_validity"):
+                validity_results = self.evaluate_test_validity(test_output, parsed, exit_code)
             
             # Extract test results
-            results = self.extract_test_results(test_output)
+            with telemetry.span("parse_results"):
+                results = self.extract_test_results(test_output, parsed, junit)
             
             # Combine results
             combined_results = {
@@ -323,11 +408,13 @@ class ResultAgent:
         Returns:
             Dictionary with formatted test results including validity assessment
         """
+        parsed = self._parse_locally(test_output)
+        
         # First evaluate test validity
-        validity_results = self.evaluate_test_validity(test_output)
+        validity_results = self.evaluate_test_validity(test_output, parsed, exit_code)
         
-        # Extract results using Claude
-        results = self.extract_test_results(test_output)
+        # Extract results, using Claude if the output was not parsed locally
+        results = self.extract_test_results(test_output, parsed)
         
         # Format results according to the specified JSON schema
         # Get the first test file content if available
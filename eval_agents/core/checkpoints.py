@@ -0,0 +1,254 @@
+"""checkpoints.py
+
+Durable per-repository stage checkpoints for the Clone → Test pipeline.
+
+A worker that dies after cloning a repository and spending ten minutes on
+its dependencies used to leave nothing behind; the next worker started from
+zero.  The pipeline now records a checkpoint when each stage completes:
+
+=================== ==========================================================
+``cloned``          ``commit_id`` of the checkout
+``deps_installed``  ``snapshot`` image with the dependencies installed, if any
+``tests_discovered`` ``paths`` of the chosen test files
+``tests_run``       ``output_ref`` to the stored test run output
+=================== ==========================================================
+
+A resumed run re-clones the recorded commit and skips every stage whose
+checkpoint is still usable: a dependency snapshot that still exists, or a
+stored test output that can still be read.  Checkpoints are kept in Postgres
+(``repo_checkpoints`` table) or, without a database, as JSON files on local
+disk, and are cleared once the repository's result has been recorded.
+Test outputs are stored as JSON files under :data:`CHECKPOINT_DIR` in both
+cases.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from eval_agents.core.utils import DEFAULT_DB_NAME, db_connection
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in the order they complete
+STAGES = ("cloned", "deps_installed", "tests_discovered", "tests_run")
+
+# Where checkpoints are kept: "postgres", "file" or "0" to disable
+CHECKPOINT_STORE = os.getenv("EVAL_AGENTS_CHECKPOINTS", "postgres")
+
+# Directory for file checkpoints and stored test outputs
+CHECKPOINT_DIR = os.getenv(
+    "EVAL_AGENTS_CHECKPOINT_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "eval_agents", "checkpoints"),
+)
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _repo_key(repo_url: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_-]", "_", repo_url.rstrip("/").split("/", 3)[-1])[-60:]
+    return f"{slug}-{hashlib.sha256(repo_url.encode('utf-8')).hexdigest()[:12]}"
+
+
+class CheckpointStore(ABC):
+    """Interface shared by the checkpoint stores."""
+
+    @abstractmethod
+    def load(self, repo_url: str) -> Dict[str, Dict[str, Any]]:
+        """Return the recorded checkpoints of *repo_url* by stage."""
+
+    @abstractmethod
+    def save(self, repo_url: str, stage: str, data: Dict[str, Any]) -> None:
+        """Record that *stage* completed for *repo_url*."""
+
+    @abstractmethod
+    def clear(self, repo_url: str) -> None:
+        """Remove every checkpoint of *repo_url*."""
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Checkpoints as one JSON file per repository on local disk."""
+
+    def __init__(self, directory: str = CHECKPOINT_DIR):
+        self.directory = directory
+
+    def _path(self, repo_url: str) -> str:
+        return os.path.join(self.directory, "repos", _repo_key(repo_url) + ".json")
+
+    def load(self, repo_url: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._path(repo_url), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data.get("stages", {}) if data.get("repo_url") == repo_url else {}
+
+    def save(self, repo_url: str, stage: str, data: Dict[str, Any]) -> None:
+        stages = self.load(repo_url)
+        stages[stage] = data
+        _write_json_atomic(self._path(repo_url), {"repo_url": repo_url, "stages": stages})
+
+    def clear(self, repo_url: str) -> None:
+        try:
+            os.unlink(self._path(repo_url))
+        except OSError:
+            pass
+
+
+class PostgresCheckpointStore(CheckpointStore):
+    """Checkpoints in the ``repo_checkpoints`` table, shared by workers on every host."""
+
+    def __init__(self, db_name: str = DEFAULT_DB_NAME):
+        self.db_name = db_name
+        self._table_ready = False
+
+    def _ensure_table(self, cursor) -> None:
+        if self._table_ready:
+            return
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS repo_checkpoints (
+            repo_url TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            data JSONB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (repo_url, stage)
+        )
+        """)
+        self._table_ready = True
+
+    def load(self, repo_url: str) -> Dict[str, Dict[str, Any]]:
+        with db_connection(self.db_name) as conn:
+            cursor = conn.cursor()
+            self._ensure_table(cursor)
+            cursor.execute("SELECT stage, data FROM repo_checkpoints WHERE repo_url = %s", (repo_url,))
+            rows = cursor.fetchall()
+            cursor.close()
+        return {stage: data if isinstance(data, dict) else json.loads(data) for stage, data in rows}
+
+    def save(self, repo_url: str, stage: str, data: Dict[str, Any]) -> None:
+        with db_connection(self.db_name) as conn:
+            cursor = conn.cursor()
+            self._ensure_table(cursor)
+            cursor.execute(
+                """INSERT INTO repo_checkpoints (repo_url, stage, data, updated_at)
+                   VALUES (%s, %s, %s, NOW())
+                   ON CONFLICT (repo_url, stage) DO UPDATE
+                   SET data = EXCLUDED.data, updated_at = NOW()""",
+                (repo_url, stage, json.dumps(data))
+            )
+            cursor.close()
+
+    def clear(self, repo_url: str) -> None:
+        with db_connection(self.db_name) as conn:
+            cursor = conn.cursor()
+            self._ensure_table(cursor)
+            cursor.execute("DELETE FROM repo_checkpoints WHERE repo_url = %s", (repo_url,))
+            cursor.close()
+
+
+def default_store(db_name: Optional[str] = DEFAULT_DB_NAME) -> Optional[CheckpointStore]:
+    """Return the store selected by ``EVAL_AGENTS_CHECKPOINTS``, or None if disabled."""
+    if CHECKPOINT_STORE == "0":
+        return None
+    if CHECKPOINT_STORE == "postgres" and db_name:
+        return PostgresCheckpointStore(db_name)
+    return FileCheckpointStore()
+
+
+class RepoCheckpoints:
+    """Checkpoints of one repository, loaded once and updated as stages complete.
+
+    Store errors are logged and never fail the pipeline; at worst a stage is
+    redone on the next run.
+    """
+
+    def __init__(self, store: Optional[CheckpointStore], repo_url: str,
+                 output_dir: str = os.path.join(CHECKPOINT_DIR, "outputs")):
+        self.store = store
+        self.repo_url = repo_url
+        self.output_dir = output_dir
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        if store is not None:
+            try:
+                self.stages = store.load(repo_url)
+            except Exception as e:
+                logger.info(f"Error loading checkpoints for {repo_url}: {str(e)}")
+        if self.stages:
+            logger.info(f"Resuming {repo_url} after stage {self.last_stage()}")
+
+    def get(self, stage: str) -> Optional[Dict[str, Any]]:
+        return self.stages.get(stage)
+
+    def last_stage(self) -> Optional[str]:
+        """Return the last completed stage, if any."""
+        done = [stage for stage in STAGES if stage in self.stages]
+        return done[-1] if done else None
+
+    def record(self, stage: str, **data: Any) -> None:
+        """Record that *stage* completed with *data*."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage {stage!r}; expected one of {STAGES}")
+        self.stages[stage] = data
+        if self.store is None:
+            return
+        try:
+            self.store.save(self.repo_url, stage, data)
+        except Exception as e:
+            logger.info(f"Error saving {stage} checkpoint for {self.repo_url}: {str(e)}")
+
+    def discard(self, *stages: str) -> None:
+        """Forget *stages* (and every later one) locally, e.g. after a failed resume."""
+        first = min(STAGES.index(stage) for stage in stages)
+        for stage in STAGES[first:]:
+            self.stages.pop(stage, None)
+
+    def clear(self) -> None:
+        """Remove all checkpoints and stored outputs of the repository."""
+        for data in self.stages.values():
+            ref = data.get("output_ref")
+            if ref:
+                try:
+                    os.unlink(ref)
+                except OSError:
+                    pass
+        self.stages = {}
+        if self.store is None:
+            return
+        try:
+            self.store.clear(self.repo_url)
+        except Exception as e:
+            logger.info(f"Error clearing checkpoints for {self.repo_url}: {str(e)}")
+
+    def save_output(self, output: Dict[str, Any]) -> str:
+        """Store a test run output and return its reference."""
+        path = os.path.join(self.output_dir, _repo_key(self.repo_url) + ".json")
+        _write_json_atomic(path, output)
+        return path
+
+    @staticmethod
+    def load_output(ref: str) -> Optional[Dict[str, Any]]:
+        """Return a stored test run output, or None if it is no longer available."""
+        try:
+            with open(ref, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -1,69 +1,288 @@
 import os
+import queue
+import shutil
 import tempfile
+import threading
+import time
 import uuid
+import logging
 from contextlib import contextmanager
-from typing import Generator, Tuple
+from dataclasses import dataclass
+from typing import Generator, Optional, Tuple
 
 import docker
 
-# Default Docker image used for test runners
-DEFAULT_IMAGE = os.getenv("EVAL_AGENTS_DOCKER_IMAGE", "python:3.13-alpine")
+from eval_agents.core import pip_cache, repo_scanner, snapshot_cache, workspace
+from eval_agents.core.docker_backend import get_docker_client
+from eval_agents.core.runner_image import BASE_IMAGE, ensure_runner_image
+
+logger = logging.getLogger(__name__)
+
+# Base Docker image used for test runners; containers start from the
+# pre-baked runner image built on top of it (see runner_image.py)
+DEFAULT_IMAGE = BASE_IMAGE
 
 # Memory/RAM limit per container – override via env if you like
 MEM_LIMIT = os.getenv("EVAL_AGENTS_MEM", "2g")
 
+# Number of pre-warmed containers kept ready
+POOL_SIZE = int(os.getenv("EVAL_AGENTS_POOL_SIZE", "4"))
+
+# A container is recycled after serving this many jobs
+MAX_REUSE = int(os.getenv("EVAL_AGENTS_POOL_MAX_REUSE", "10"))
+
+# How long acquire() waits for a free container before giving up (seconds)
+ACQUIRE_TIMEOUT = float(os.getenv("EVAL_AGENTS_POOL_ACQUIRE_TIMEOUT", "1800"))
+
+# Baseline of the container's packages, recorded when a container is warmed
+_BASELINE_DIR = "/etc/eval_agents_baseline"
+
+# Records the baseline: pip packages with versions, apk packages, global npm
+# modules, and a marker file whose mtime later changes are compared against
+_BASELINE_SCRIPT = (
+    f"mkdir -p {_BASELINE_DIR} && "
+    f"pip freeze --all 2>/dev/null | sort > {_BASELINE_DIR}/pip.txt; "
+    f"(apk info 2>/dev/null || true) | sort > {_BASELINE_DIR}/apk.txt; "
+    f"(ls /usr/local/lib/node_modules 2>/dev/null || true) > {_BASELINE_DIR}/npm.txt; "
+    f"touch {_BASELINE_DIR}/marker"
+)
+
+# Files the reset itself changes, and pip's own install locations (checked by
+# comparing pip freeze against the baseline instead)
+_CHANGE_EXCLUDES = (
+    "*/site-packages/*", "*/__pycache__/*", "/usr/local/bin/*", "/root/.cache/*",
+    "/etc/profile", "/root/.profile",
+)
+
+# Resets a used container: wipe the workspace, remove the exported API key,
+# uninstall pip packages that are not in the baseline (or not at its version)
+# and reinstall the baseline versions.  Fails, so the container is recycled,
+# if pip still differs from the baseline (e.g. pip itself was upgraded), apk
+# packages or global npm modules were installed, or files under /usr, /etc or
+# /root changed outside pip's install locations.
+_RESET_SCRIPT = (
+    "rm -rf /workspace/* /workspace/.[!.]* /workspace/..?* /tmp/* /tmp/.[!.]* 2>/dev/null; "
+    f"{snapshot_cache.SCRUB_API_KEY_SCRIPT}; "
+    "pip freeze --all 2>/dev/null | sort > /tmp/pip.now; "
+    f"grep -vxFf {_BASELINE_DIR}/pip.txt /tmp/pip.now | grep -v '^pip[=@ ]' | sed 's/[=@ ].*//' "
+    "| xargs -r pip uninstall -y -q >/dev/null 2>&1; "
+    "pip freeze --all 2>/dev/null | sort > /tmp/pip.now; "
+    f"grep -vxFf /tmp/pip.now {_BASELINE_DIR}/pip.txt > /tmp/pip.missing; "
+    "test ! -s /tmp/pip.missing || pip install -q --no-deps -r /tmp/pip.missing >/dev/null 2>&1; "
+    f"pip freeze --all 2>/dev/null | sort | cmp -s - {_BASELINE_DIR}/pip.txt "
+    f"&& (apk info 2>/dev/null || true) | sort | cmp -s - {_BASELINE_DIR}/apk.txt "
+    f"&& (ls /usr/local/lib/node_modules 2>/dev/null || true) | cmp -s - {_BASELINE_DIR}/npm.txt "
+    f"&& test -z \"$(find /usr /etc /root -xdev -type f -newer {_BASELINE_DIR}/marker "
+    + " ".join(f"! -path '{pattern}'" for pattern in _CHANGE_EXCLUDES)
+    + " 2>/dev/null | head -1)\" "
+    "&& rm -rf /tmp/* /tmp/.[!.]* 2>/dev/null; "
+    "test -z \"$(ls -A /workspace /tmp)\""
+)
+
+
+@dataclass
+class _PooledContainer:
+    """Bookkeeping for one pooled container."""
+
+    container: "docker.models.containers.Container"
+    workspace_dir: str
+    uses: int = 0
+
 
 class ContainerPool:
-    """Simple synchronous container pool.
+    """Pool of pre-warmed, reusable runner containers.
 
-    For now this is *not* a true pooled implementation with a queue – it is a
-    thin convenience wrapper that centralises container lifecycle logic taken
-    from CloneAgent.  Orchestrator/Worker code will call :pyfunc:`acquire` which
-    yields a live Docker container bound to a unique workspace directory, and
-    then automatically cleans it up afterwards.
+    Up to ``size`` containers are started ahead of time (see :pyfunc:`warm`)
+    and handed out from a queue by :pyfunc:`acquire`.  Each container is bound
+    to its own host workspace directory mounted at ``/workspace`` and shares
+    the host pip cache (see :mod:`eval_agents.core.pip_cache`).  When a job
+    finishes the container is reset (workspace and ``/tmp`` wiped, pip
+    packages restored to the versions recorded when it was warmed) and
+    returned to the queue.  Containers the job changed in ways a reset cannot
+    undo (system packages, global npm modules, files under ``/usr``, ``/etc``
+    or ``/root``), that fail their health check or have served ``max_reuse``
+    jobs are destroyed and replaced lazily.
 
-    Later we can replace this with an asyncio-aware implementation without
-    touching callers.
+    Containers start from the pre-baked runner image unless ``image`` is
+    given.  The Docker client is created (and the runner image built) on first
+    use so importing this module does not require a running daemon.
     """
 
-    def __init__(self):
-        self.client = docker.from_env()
+    def __init__(self, size: int = POOL_SIZE, max_reuse: int = MAX_REUSE,
+                 image: Optional[str] = None, mem_limit: str = MEM_LIMIT):
+        self.size = max(1, size)
+        self.max_reuse = max(1, max_reuse)
+        self.image = image
+        self.mem_limit = mem_limit
+        self._client = None
+        self._idle: "queue.Queue[_PooledContainer]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0  # containers created and not yet destroyed
+        self._closed = False
 
-    @contextmanager
-    def acquire(self) -> Generator[Tuple[str, str], None, None]:
-        """Spin up a fresh container and yield (container_id, workdir).
+    @property
+    def client(self):
+        return self._client or get_docker_client()
 
-        The workspace dir is a unique host tmpdir mounted into the container at
-        /workspace.  Caller **must** chdir or set ``workdir`` explicitly when
-        executing commands inside the container.
-        """
-        container = None
+    # ------------------------------------------------------------------
+    # Container lifecycle
+    # ------------------------------------------------------------------
+
+    def _start_container(self) -> _PooledContainer:
+        """Start a new runner container with a fresh workspace directory."""
+        if self.image is None:
+            self.image = ensure_runner_image(self.client)
         workspace_dir = tempfile.mkdtemp(prefix="repo_test_")
         container_name = f"eval_agents_{uuid.uuid4().hex[:8]}"
-
         try:
             container = self.client.containers.run(
-                DEFAULT_IMAGE,
+                self.image,
                 command="sleep infinity",
                 name=container_name,
                 detach=True,
-                volumes={workspace_dir: {"bind": "/workspace", "mode": "rw"}},
+                volumes={workspace_dir: {"bind": "/workspace", "mode": "rw"}, **pip_cache.volumes()},
+                environment=pip_cache.environment(),
                 working_dir="/workspace",
-                mem_limit=MEM_LIMIT,
+                mem_limit=self.mem_limit,
+                labels={"eval_agents.pool": "1"},
             )
-            yield container.id, workspace_dir
-        finally:
-            # Stop & remove container if it exists
-            if container is not None:
+            container.exec_run(["sh", "-c", _BASELINE_SCRIPT])
+        except Exception:
+            shutil.rmtree(workspace_dir, ignore_errors=True)
+            raise
+        workspace.register_mount(container.id, workspace_dir, "/workspace")
+        logger.info(f"Started pooled container {container_name}")
+        return _PooledContainer(container=container, workspace_dir=workspace_dir)
+
+    def _destroy(self, slot: _PooledContainer) -> None:
+        """Remove a container and its workspace directory."""
+        try:
+            slot.container.remove(force=True)
+        except Exception:
+            pass
+        workspace.unregister(slot.container.id)
+        shutil.rmtree(slot.workspace_dir, ignore_errors=True)
+        with self._lock:
+            self._live -= 1
+
+    def _is_healthy(self, slot: _PooledContainer) -> bool:
+        """Return True if the container is running and can execute commands."""
+        try:
+            slot.container.reload()
+            if slot.container.status != "running":
+                return False
+            exit_code, _ = slot.container.exec_run(["true"])
+            return exit_code == 0
+        except Exception:
+            return False
+
+    def _reset(self, slot: _PooledContainer) -> bool:
+        """Return a used container to its baseline state; False if that failed."""
+        try:
+            exit_code, _ = slot.container.exec_run(["sh", "-c", _RESET_SCRIPT])
+        except Exception:
+            return False
+        if exit_code != 0:
+            logger.info(f"Recycling pooled container {slot.container.name}: the job changed it beyond a reset")
+        return exit_code == 0
+
+    # ------------------------------------------------------------------
+    # Pool API
+    # ------------------------------------------------------------------
+
+    def warm(self, count: Optional[int] = None) -> int:
+        """Pre-start containers until ``count`` (default: pool size) are live.
+
+        Returns:
+            Number of containers started
+        """
+        target = min(self.size, count or self.size)
+        pip_cache.maybe_prune()
+        started = 0
+        while True:
+            with self._lock:
+                if self._closed or self._live >= target:
+                    break
+                self._live += 1
+            try:
+                self._idle.put(self._start_container())
+                started += 1
+            except Exception as e:
+                with self._lock:
+                    self._live -= 1
+                logger.info(f"Error warming container pool: {str(e)}")
+                break
+        return started
+
+    def _checkout(self, timeout: float) -> _PooledContainer:
+        """Take a healthy container from the pool, starting one if allowed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                slot = None
+
+            if slot is None:
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("ContainerPool is closed")
+                    can_start = self._live < self.size
+                    if can_start:
+                        self._live += 1
+                if can_start:
+                    try:
+                        return self._start_container()
+                    except Exception:
+                        with self._lock:
+                            self._live -= 1
+                        raise
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a pooled container")
                 try:
-                    container.remove(force=True)
-                except Exception:
-                    pass
-            # Remove workspace dir
+                    slot = self._idle.get(timeout=remaining)
+                except queue.Empty:
+                    raise TimeoutError("Timed out waiting for a pooled container")
+
+            if self._is_healthy(slot):
+                return slot
+            logger.info(f"Discarding unhealthy pooled container {slot.container.name}")
+            self._destroy(slot)
+
+    def _checkin(self, slot: _PooledContainer) -> None:
+        """Reset and requeue a container, or recycle it."""
+        slot.uses += 1
+        repo_scanner.invalidate(slot.container.id)
+        if self._closed or slot.uses >= self.max_reuse or not self._reset(slot):
+            self._destroy(slot)
+            return
+        self._idle.put(slot)
+
+    @contextmanager
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT) -> Generator[Tuple[str, str], None, None]:
+        """Check out a warm container and yield (container_id, workdir).
+
+        The workspace dir is a host tmpdir mounted into the container at
+        /workspace.  Caller **must** chdir or set ``workdir`` explicitly when
+        executing commands inside the container.  The container is reset and
+        returned to the pool when the block exits.
+        """
+        slot = self._checkout(timeout)
+        try:
+            yield slot.container.id, slot.workspace_dir
+        finally:
+            self._checkin(slot)
+
+    def close(self) -> None:
+        """Destroy all idle containers; busy ones are destroyed on release."""
+        self._closed = True
+        while True:
             try:
-                os.system(f"rm -rf {workspace_dir}")
-            except Exception:
-                pass
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._destroy(slot)
 
 
 # Singleton helper – most callers can just `from ...container_pool import pool`
@@ -0,0 +1,225 @@
+"""docker_backend.py
+
+Execution backends for running containers and commands in them.
+
+* :class:`DockerSDKBackend` talks to the local daemon through one shared
+  Docker SDK client (:func:`get_docker_client`), so every container start,
+  exec and removal reuses the same HTTP connection pool instead of spawning
+  a ``docker`` CLI process that has to handshake with the daemon again.
+* :class:`SSHCLIBackend` drives the ``docker`` CLI on a remote host over SSH.
+  It multiplexes all commands over one master connection (``ControlMaster``)
+  so only the first command pays for the SSH handshake.
+
+Both backends expose the same small interface, so agents can be written once
+and pointed at either.  Tests and benchmarks can swap the SDK client for a
+fake with :func:`set_docker_client`.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shlex
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Union
+
+import docker
+
+from eval_agents.core import telemetry
+from eval_agents.core.utils import run_cmd
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_docker_client():
+    """Return the process-wide Docker SDK client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = docker.from_env()
+                telemetry.instrument_docker_client(_client)
+    return _client
+
+
+def set_docker_client(client) -> None:
+    """Replace the shared Docker client (e.g. with a fake in tests); None resets it."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+class ExecResult(NamedTuple):
+    exit_code: int
+    stdout: str
+    stderr: str
+
+
+Command = Union[str, List[str]]
+
+
+class DockerBackend(ABC):
+    """Interface shared by the execution backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def version(self) -> str:
+        """Return the Docker server version; raises if Docker is unreachable."""
+
+    @abstractmethod
+    def run_container(self, image: str, name: str, workdir: str = "/workspace",
+                      mem_limit: str = "2g", volumes: Optional[Dict[str, str]] = None) -> str:
+        """Start a detached ``sleep infinity`` container and return its ID.
+
+        Args:
+            image: Image to start
+            name: Container name
+            workdir: Working directory inside the container
+            mem_limit: Memory limit
+            volumes: Mapping of host path to container path
+        """
+
+    @abstractmethod
+    def exec(self, container: str, cmd: Command, workdir: Optional[str] = None) -> ExecResult:
+        """Run *cmd* in *container*; a string is run through ``sh -c``."""
+
+    @abstractmethod
+    def remove_container(self, container: str) -> None:
+        """Stop and remove *container*."""
+
+
+class DockerSDKBackend(DockerBackend):
+    """Backend using the shared Docker SDK client.
+
+    Commands run through the low-level exec API, which takes a container name
+    or ID directly, so no container object has to be looked up (or cached and
+    kept in sync with containers removed elsewhere) per command.
+    """
+
+    name = "docker-sdk"
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or get_docker_client()
+
+    def version(self) -> str:
+        return self.client.version()["Version"]
+
+    def run_container(self, image: str, name: str, workdir: str = "/workspace",
+                      mem_limit: str = "2g", volumes: Optional[Dict[str, str]] = None) -> str:
+        container = self.client.containers.run(
+            image,
+            command="sleep infinity",
+            name=name,
+            detach=True,
+            working_dir=workdir,
+            mem_limit=mem_limit,
+            volumes={host: {"bind": path, "mode": "rw"} for host, path in (volumes or {}).items()},
+        )
+        return container.id
+
+    def exec(self, container: str, cmd: Command, workdir: Optional[str] = None) -> ExecResult:
+        if isinstance(cmd, str):
+            cmd = ["sh", "-c", cmd]
+        api = self.client.api
+        exec_id = api.exec_create(container, cmd, workdir=workdir)["Id"]
+        output = api.exec_start(exec_id, demux=True)
+        exit_code = api.exec_inspect(exec_id)["ExitCode"]
+        stdout, stderr = output if output else (None, None)
+        return ExecResult(
+            exit_code,
+            (stdout or b"").decode("utf-8", errors="replace"),
+            (stderr or b"").decode("utf-8", errors="replace"),
+        )
+
+    def remove_container(self, container: str) -> None:
+        try:
+            self.client.containers.get(container).remove(force=True)
+        except docker.errors.NotFound:
+            pass
+
+
+class SSHCLIBackend(DockerBackend):
+    """Backend driving the ``docker`` CLI on a remote host over SSH."""
+
+    name = "ssh-cli"
+
+    def __init__(self, host: str, user: str, key_path: Optional[str] = None, port: str = "22",
+                 control_dir: Optional[str] = None):
+        self.host = host
+        self.user = user
+        self.key_path = key_path
+        self.port = str(port)
+        # Short directory: ControlPath must fit in a UNIX socket path
+        self.control_dir = control_dir or os.path.join(tempfile.gettempdir(), "eval_agents_ssh")
+
+    def ssh_command(self, remote_cmd: str) -> List[str]:
+        """Return the ssh argv that runs *remote_cmd* on the remote host."""
+        cmd = ["ssh"]
+        if self.key_path and os.path.exists(self.key_path):
+            cmd.extend(["-i", self.key_path])
+        os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+        cmd.extend([
+            "-p", self.port,
+            "-o", "StrictHostKeyChecking=no",
+            # Reuse one master connection for every command
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={self.control_dir}/%r@%h:%p",
+            "-o", "ControlPersist=300",
+            "-A",  # Enable SSH agent forwarding
+            f"{self.user}@{self.host}",
+            remote_cmd,
+        ])
+        return cmd
+
+    def run(self, remote_cmd: str, timeout: Optional[int] = None) -> ExecResult:
+        """Run a shell command on the remote host."""
+        try:
+            stdout, stderr, exit_code = run_cmd(self.ssh_command(remote_cmd), timeout=timeout)
+        except OSError as e:
+            # ssh is not installed; callers treat this like an unreachable host
+            return ExecResult(127, "", str(e))
+        return ExecResult(exit_code, stdout, stderr)
+
+    def version(self) -> str:
+        result = self.run("docker --version")
+        if result.exit_code != 0:
+            raise RuntimeError(result.stderr)
+        return result.stdout.strip()
+
+    def run_container(self, image: str, name: str, workdir: str = "/workspace",
+                      mem_limit: str = "2g", volumes: Optional[Dict[str, str]] = None) -> str:
+        mounts = " ".join(f"-v {shlex.quote(host)}:{shlex.quote(path)}"
+                          for host, path in (volumes or {}).items())
+        result = self.run(
+            f"docker run -d --name {shlex.quote(name)} {mounts} "
+            f"--memory={mem_limit} --workdir={shlex.quote(workdir)} "
+            f"{shlex.quote(image)} sleep infinity"
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(result.stderr)
+        return result.stdout.strip()
+
+    def exec(self, container: str, cmd: Command, workdir: Optional[str] = None) -> ExecResult:
+        if isinstance(cmd, str):
+            cmd = ["sh", "-c", cmd]
+        workdir_opt = f"--workdir={shlex.quote(workdir)} " if workdir else ""
+        start = time.monotonic()
+        try:
+            return self.run(
+                f"docker exec {workdir_opt}{shlex.quote(container)} {' '.join(shlex.quote(c) for c in cmd)}"
+            )
+        finally:
+            telemetry.record_docker("exec", time.monotonic() - start, backend=self.name)
+
+    def remove_container(self, container: str) -> None:
+        self.run(f"docker rm -f {shlex.quote(container)}")
@@ -0,0 +1,167 @@
+"""git_mirror.py
+
+Clone strategies and a host-side cache of bare git mirrors.
+
+Strategies (``EVAL_AGENTS_CLONE_STRATEGY``):
+
+* ``full``: plain ``git clone`` with the complete history
+* ``shallow``: ``--depth 1``, only the checked-out commit
+* ``blobless``: ``--filter=blob:none``, full history but file contents are
+  fetched only for the checked-out tree
+* ``mirror`` (default): keep a bare clone of the branches and tags of every
+  repository on the host, bring it up to date with an incremental
+  ``git fetch`` and clone from it into the container's bind-mounted
+  workspace.  Re-testing a repository then only downloads the commits pushed
+  since the last run.  Unlike ``git clone --mirror`` the mirror does not
+  fetch ``refs/pull/*`` and other hosting-side refs.
+
+The mirror strategy needs ``git`` on the host and a workspace that is a local
+bind mount (see :mod:`eval_agents.core.workspace`); callers fall back to
+:data:`FALLBACK_STRATEGY` inside the container otherwise.  Mirrors are guarded
+by ``fcntl`` locks so concurrent workers (threads or processes) never fetch
+the same mirror twice at once.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import time
+from typing import List, Optional
+
+from eval_agents.core.utils import file_lock, run_cmd
+
+logger = logging.getLogger(__name__)
+
+CLONE_STRATEGIES = ("full", "shallow", "blobless", "mirror")
+
+CLONE_STRATEGY = os.getenv("EVAL_AGENTS_CLONE_STRATEGY", "mirror")
+
+# In-container strategy used when the mirror cannot be used
+FALLBACK_STRATEGY = "blobless"
+
+# Directory holding the bare mirrors
+MIRROR_DIR = os.getenv(
+    "EVAL_AGENTS_GIT_MIRROR_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "eval_agents", "git-mirrors"),
+)
+
+# A mirror fetched less than this many seconds ago is used as is
+MIRROR_MAX_AGE = int(os.getenv("EVAL_AGENTS_GIT_MIRROR_MAX_AGE", "600"))
+
+# Timeout for clone and fetch commands (seconds)
+GIT_TIMEOUT = int(os.getenv("EVAL_AGENTS_GIT_TIMEOUT", "900"))
+
+# Refs kept in a mirror; pull request and other hosting-side refs are skipped
+MIRROR_REFSPECS = ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*")
+
+
+def clone_command(repo_url: str, strategy: str, dest: str = ".") -> List[str]:
+    """Return the ``git clone`` argv for an in-container *strategy*.
+
+    Raises:
+        ValueError: If *strategy* is unknown or requires the host mirror
+    """
+    if strategy == "full":
+        return ["git", "clone", repo_url, dest]
+    if strategy == "shallow":
+        return ["git", "clone", "--depth", "1", repo_url, dest]
+    if strategy == "blobless":
+        return ["git", "clone", "--filter=blob:none", repo_url, dest]
+    raise ValueError(f"Not an in-container clone strategy: {strategy}")
+
+
+def is_available() -> bool:
+    """Return True if git is installed on the host."""
+    return shutil.which("git") is not None
+
+
+def mirror_path(repo_url: str, mirror_dir: str = MIRROR_DIR) -> str:
+    """Return the mirror directory for *repo_url*."""
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", repo_url.rstrip("/").split("://")[-1])[-80:]
+    digest = hashlib.sha256(repo_url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(mirror_dir, f"{name}-{digest}.git")
+
+
+def _git(args: List[str], cwd: Optional[str] = None) -> str:
+    stdout, stderr, exit_code = run_cmd(["git"] + args, cwd=cwd, env={"GIT_TERMINAL_PROMPT": "0"},
+                                        timeout=GIT_TIMEOUT)
+    if exit_code != 0:
+        raise RuntimeError(f"git {args[0]} failed: {stderr.strip()}")
+    return stdout
+
+
+def _set_refspecs(path: str) -> None:
+    """Restrict the ``origin`` fetch refspecs of the mirror at *path* to :data:`MIRROR_REFSPECS`."""
+    _git(["config", "--replace-all", "remote.origin.fetch", MIRROR_REFSPECS[0]], cwd=path)
+    for refspec in MIRROR_REFSPECS[1:]:
+        _git(["config", "--add", "remote.origin.fetch", refspec], cwd=path)
+
+
+def _is_full_mirror(path: str) -> bool:
+    """Return True if *path* was created by ``git clone --mirror`` (fetches every ref)."""
+    stdout, _, exit_code = run_cmd(["git", "config", "--get", "remote.origin.mirror"], cwd=path)
+    return exit_code == 0 and stdout.strip() == "true"
+
+
+def update_mirror(repo_url: str, mirror_dir: str = MIRROR_DIR, max_age: int = MIRROR_MAX_AGE) -> str:
+    """Create or incrementally fetch the mirror of *repo_url*.
+
+    Mirrors left by ``git clone --mirror`` hold every pull request ref and
+    are re-created once.
+
+    Args:
+        repo_url: Repository to mirror
+        mirror_dir: Directory holding the mirrors
+        max_age: Skip the fetch if the mirror was updated this recently (seconds)
+
+    Returns:
+        Path of the bare mirror
+    """
+    path = mirror_path(repo_url, mirror_dir)
+    stamp = path + ".fetched"
+    with file_lock(path, exclusive=True):
+        if os.path.isdir(path) and _is_full_mirror(path):
+            logger.info(f"Replacing full git mirror of {repo_url}")
+            shutil.rmtree(path, ignore_errors=True)
+        if not os.path.isdir(path):
+            logger.info(f"Creating git mirror of {repo_url}")
+            tmp_path = f"{path}.tmp{os.getpid()}"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            try:
+                _git(["clone", "--bare", "--quiet", repo_url, tmp_path])
+                _set_refspecs(tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+        elif not os.path.exists(stamp) or time.time() - os.path.getmtime(stamp) >= max_age:
+            logger.info(f"Fetching updates into git mirror of {repo_url}")
+            _git(["fetch", "--prune", "--quiet", "origin", *MIRROR_REFSPECS], cwd=path)
+        else:
+            return path
+        with open(stamp, "w"):
+            pass
+    return path
+
+
+def clone_from_mirror(repo_url: str, dest: str, mirror_dir: str = MIRROR_DIR,
+                      max_age: int = MIRROR_MAX_AGE) -> str:
+    """Clone *repo_url* into the host directory *dest* through its mirror.
+
+    The clone is a local clone (objects are hard-linked where the filesystem
+    allows it) whose ``origin`` points back at *repo_url*.
+
+    Returns:
+        The checked-out commit ID
+    """
+    path = update_mirror(repo_url, mirror_dir, max_age)
+    with file_lock(path, exclusive=False):
+        try:
+            _git(["clone", "--quiet", path, dest])
+            _git(["remote", "set-url", "origin", repo_url], cwd=dest)
+            return _git(["rev-parse", "HEAD"], cwd=dest).strip()
+        except Exception:
+            shutil.rmtree(dest, ignore_errors=True)
+            raise
@@ -0,0 +1,288 @@
+"""github.py
+
+Shared GitHub REST client with a header-driven rate-limit governor.
+
+GitHub meters the REST API in separate buckets (``core``, ``search``,
+``code_search``, ...), and reports each bucket's state on every response via
+``X-RateLimit-Limit/Remaining/Reset/Resource``.  :class:`RateLimitGovernor`
+tracks those buckets for the whole process so that every caller, whether a
+thread using :func:`github_request` or a coroutine in ``github_async``, draws
+from the same budget:
+
+* while plenty of a bucket's budget is left, requests go out immediately;
+* below :data:`PACE_FRACTION` of the limit the remaining requests are spread
+  evenly until the window resets, so the bucket never runs dry mid-window;
+* when a bucket is exhausted, or GitHub asks for a ``Retry-After`` pause
+  (secondary limits), callers wait for the reset instead of hammering the API.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import requests
+
+from eval_agents.core import http_cache
+
+logger = logging.getLogger(__name__)
+
+# GitHub API root; overridable to point at a mirror or a local test server
+GITHUB_API_URL = os.getenv("EVAL_AGENTS_GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+# Below this fraction of a bucket's limit, requests are paced until the reset
+PACE_FRACTION = float(os.getenv("EVAL_AGENTS_GITHUB_PACE_FRACTION", "0.2"))
+
+# How often callers waiting on an exhausted bucket re-check it
+_RECHECK_SECONDS = 1.0
+
+# Documented limits used until the first response reports the real ones:
+# resource -> (requests per window, window seconds, anonymous requests per window)
+_DEFAULT_LIMITS = {
+    "core": (5000, 3600, 60),
+    "search": (30, 60, 10),
+    "code_search": (10, 60, 10),
+}
+
+
+def resource_for(path: str) -> str:
+    """Return the rate-limit bucket a REST API path is metered against."""
+    if path.startswith("/search/code"):
+        return "code_search"
+    if path.startswith("/search/"):
+        return "search"
+    return "core"
+
+
+def github_headers(token: Optional[str] = None) -> Dict[str, str]:
+    """Return the default request headers, authenticated if a token is available."""
+    headers = {"Accept": "application/vnd.github+json"}
+    token = token if token is not None else os.getenv("GITHUB_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+@dataclass
+class _Bucket:
+    """Known state of one rate-limit bucket."""
+
+    limit: int
+    remaining: int
+    reset: float  # epoch seconds
+    next_slot: float = 0.0  # monotonic time of the next paced request
+    blocked_until: float = 0.0  # monotonic time before which nothing is sent
+    observed: bool = False  # True once a response reported this window
+
+
+class RateLimitGovernor:
+    """Process-wide pacing of GitHub requests per rate-limit bucket.
+
+    Callers call :meth:`acquire` (or :meth:`acquire_async`) before each
+    request and :meth:`update` with the response headers afterwards.
+    """
+
+    def __init__(self, pace_fraction: float = PACE_FRACTION, authenticated: Optional[bool] = None):
+        self.pace_fraction = pace_fraction
+        self.authenticated = bool(os.getenv("GITHUB_TOKEN")) if authenticated is None else authenticated
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, resource: str) -> _Bucket:
+        bucket = self._buckets.get(resource)
+        if bucket is None:
+            limit, window, anonymous = _DEFAULT_LIMITS.get(resource, _DEFAULT_LIMITS["core"])
+            limit = limit if self.authenticated else anonymous
+            bucket = _Bucket(limit=limit, remaining=limit, reset=time.time() + window)
+            self._buckets[resource] = bucket
+        return bucket
+
+    def reserve(self, resource: str = "core") -> Tuple[float, bool]:
+        """Try to reserve one request in *resource*.
+
+        Returns:
+            ``(delay, reserved)``.  If *reserved* the request may be sent after
+            *delay* seconds (a paced slot).  Otherwise the bucket is exhausted
+            or paused and the caller should retry within *delay* seconds; not
+            holding a reservation lets fresh headers unblock it early.
+        """
+        with self._lock:
+            bucket = self._bucket(resource)
+            now = time.monotonic()
+            until_reset = max(bucket.reset - time.time(), 0.0)
+
+            if until_reset == 0.0 and bucket.remaining <= 0:
+                # The window rolled over; assume a full budget until told otherwise
+                _, window, _ = _DEFAULT_LIMITS.get(resource, _DEFAULT_LIMITS["core"])
+                bucket.remaining = bucket.limit
+                bucket.reset = time.time() + window
+                bucket.observed = False
+                until_reset = window
+
+            if bucket.blocked_until > now:
+                return bucket.blocked_until - now, False
+            if bucket.remaining <= 0:
+                return until_reset + 1, False
+
+            wait = 0.0
+            if bucket.remaining <= bucket.limit * self.pace_fraction:
+                # Spread what is left of the budget evenly until the reset
+                start = max(now, bucket.next_slot)
+                bucket.next_slot = start + max(now + until_reset - start, 0.0) / bucket.remaining
+                wait = start - now
+            bucket.remaining -= 1
+            return wait, True
+
+    def _delays(self, resource: str) -> Iterator[float]:
+        """Yield the sleeps needed before a request in *resource* may be sent."""
+        logged = False
+        while True:
+            wait, reserved = self.reserve(resource)
+            if wait > 5 and not logged:
+                logger.info(f"GitHub {resource} rate limit: waiting {wait:.0f}s")
+                logged = True
+            if reserved:
+                if wait > 0:
+                    yield wait
+                return
+            yield min(wait, _RECHECK_SECONDS)
+
+    def acquire(self, resource: str = "core") -> None:
+        """Block until a request in *resource* may be sent."""
+        for wait in self._delays(resource):
+            time.sleep(wait)
+
+    async def acquire_async(self, resource: str = "core") -> None:
+        """Asynchronous variant of :meth:`acquire`."""
+        for wait in self._delays(resource):
+            await asyncio.sleep(wait)
+
+    def update(self, headers: Mapping[str, str], resource: str = "core",
+               status: Optional[int] = None) -> None:
+        """Adopt the bucket state reported in a response's headers."""
+        resource = headers.get("X-RateLimit-Resource", resource)
+        with self._lock:
+            bucket = self._bucket(resource)
+            if "X-RateLimit-Limit" in headers:
+                bucket.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers and "X-RateLimit-Reset" in headers:
+                remaining = int(headers["X-RateLimit-Remaining"])
+                reset = float(headers["X-RateLimit-Reset"])
+                if not bucket.observed or reset > bucket.reset:
+                    # First report or a new window; older responses no longer apply
+                    bucket.reset = reset
+                    bucket.remaining = remaining
+                    bucket.observed = True
+                elif reset == bucket.reset:
+                    # Responses arrive out of order; the lowest count is the newest
+                    bucket.remaining = min(bucket.remaining, remaining)
+            if status in (403, 429) and "Retry-After" in headers:
+                # Secondary rate limit
+                bucket.blocked_until = max(bucket.blocked_until,
+                                           time.monotonic() + float(headers["Retry-After"]))
+
+    def backoff(self, resource: str, seconds: float) -> None:
+        """Hold all requests in *resource* for *seconds*."""
+        with self._lock:
+            bucket = self._bucket(resource)
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + seconds)
+
+    def refund(self, resource: str) -> None:
+        """Return a reservation that GitHub did not charge (e.g. a 304 reply)."""
+        with self._lock:
+            bucket = self._bucket(resource)
+            bucket.remaining = min(bucket.remaining + 1, bucket.limit)
+
+    def is_rate_limited(self, resp: requests.Response) -> bool:
+        """Return True if *resp* was rejected by a primary or secondary rate limit."""
+        if resp.status_code == 429:
+            return True
+        return resp.status_code == 403 and (
+            resp.headers.get("X-RateLimit-Remaining") == "0"
+            or "Retry-After" in resp.headers
+            or "rate limit" in resp.text.lower()
+        )
+
+
+# Shared governor used by all GitHub callers in the process
+governor = RateLimitGovernor()
+
+
+def github_request(path: str, params: Optional[Dict] = None, max_retries: int = 3,
+                   token: Optional[str] = None) -> requests.Response:
+    """Make an authenticated, rate-governed GET request to the GitHub API.
+
+    Waits for the shared :data:`governor` before each attempt and retries
+    rate-limited requests, server errors and connection failures.  ``core``
+    requests are made conditional on the on-disk :mod:`http_cache`; a
+    ``304 Not Modified`` reply is answered from the cache and does not count
+    against the rate limit.
+
+    Args:
+        path: API endpoint path
+        params: Query parameters
+        max_retries: Maximum number of retry attempts
+        token: GitHub token (defaults to ``GITHUB_TOKEN``)
+
+    Returns:
+        Response object from the GitHub API
+
+    Raises:
+        requests.HTTPError: If the request fails after all retries
+    """
+    url = f"{GITHUB_API_URL}{path}"
+    resource = resource_for(path)
+    headers = github_headers(token)
+
+    # Search results change constantly; only core resources are cached
+    cache = http_cache.cache if resource == "core" else None
+    cache_key = requests.Request("GET", url, params=params).prepare().url if cache else None
+    entry = cache.lookup(cache_key, headers) if cache else None
+    if entry:
+        headers.update(entry.validators())
+
+    for attempt in range(max_retries):
+        governor.acquire(resource)
+        try:
+            resp = requests.get(url, headers=headers, params=params, timeout=20)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt < max_retries - 1:
+                wait_time = 2 ** attempt
+                logger.info(f"Connection error. Retrying in {wait_time}s...")
+                time.sleep(wait_time)
+                continue
+            raise
+
+        governor.update(resp.headers, resource, resp.status_code)
+
+        if entry and resp.status_code == 304:
+            governor.refund(resource)
+            return cache.hit(entry, resp)
+
+        if attempt < max_retries - 1:
+            if governor.is_rate_limited(resp):
+                if resp.headers.get("X-RateLimit-Remaining") != "0" and "Retry-After" not in resp.headers:
+                    # Secondary limit without a hint; GitHub asks for at least a minute
+                    governor.backoff(resource, 60)
+                # The governor now holds the bucket until it may be used again
+                logger.info(f"Rate limited on {resource} bucket. Retrying...")
+                continue
+            if resp.status_code in (500, 502, 503, 504):
+                wait_time = 2 ** attempt  # Exponential backoff
+                logger.info(f"Request failed with {resp.status_code}. Retrying in {wait_time}s...")
+                time.sleep(wait_time)
+                continue
+
+        if resp.status_code >= 400:
+            logger.info(f"GitHub API error for {url}: {resp.text}")
+        resp.raise_for_status()
+        if cache:
+            cache.store(cache_key, resp, headers)
+        return resp
+
+    # This should not be reached, but just in case
+    raise RuntimeError(f"Failed to get response from {url} after {max_retries} attempts")
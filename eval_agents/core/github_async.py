@@ -0,0 +1,189 @@
+"""github_async.py
+
+Concurrent GitHub repository search on asyncio/aiohttp.
+
+A discovery sweep issues a dozen or more search queries, each of which may
+span several result pages.  Instead of walking them one after another, all
+queries and their pages are fetched concurrently: the first page of each
+query reveals ``total_count``, after which the remaining pages are requested
+in parallel.  Requests are paced by the process-wide
+:class:`~eval_agents.core.github.RateLimitGovernor`, so they share the
+``search`` bucket with every other GitHub caller, and results are
+de-duplicated as they arrive.
+
+``aiohttp`` is optional; :func:`is_available` reports whether this backend
+can be used so callers can fall back to the blocking ``requests`` path.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from eval_agents.core import github
+from eval_agents.core.github import RateLimitGovernor, github_headers
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of search requests in flight at once
+SEARCH_CONCURRENCY = int(os.getenv("EVAL_AGENTS_GITHUB_CONCURRENCY", "8"))
+
+# GitHub only returns the first 1000 results of a search
+_MAX_SEARCH_RESULTS = 1000
+
+
+def is_available() -> bool:
+    """Return True if aiohttp is installed."""
+    return aiohttp is not None
+
+
+@dataclass
+class SearchResults:
+    """Repositories found by a sweep, de-duplicated by ``html_url``."""
+
+    repos: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    matches: Dict[str, int] = field(default_factory=dict)
+    first_seen: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+    def add(self, query_index: int, offset: int, items: Sequence[Dict[str, Any]]) -> None:
+        for position, repo in enumerate(items):
+            url = repo["html_url"]
+            self.repos[url] = repo
+            self.matches[url] = self.matches.get(url, 0) + 1
+            key = (query_index, offset + position)
+            if url not in self.first_seen or key < self.first_seen[url]:
+                self.first_seen[url] = key
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        """Repositories ordered by match count, then by query and rank of first hit."""
+        urls = sorted(self.matches, key=lambda u: (-self.matches[u], self.first_seen[u]))
+        return [self.repos[u] for u in urls]
+
+
+class AsyncGitHubSearch:
+    """Runs GitHub repository searches concurrently under the shared rate-limit governor."""
+
+    def __init__(self, token: Optional[str] = None, concurrency: int = SEARCH_CONCURRENCY,
+                 governor: Optional[RateLimitGovernor] = None, max_retries: int = 3):
+        self.token = token
+        self.concurrency = max(1, concurrency)
+        self.governor = governor or github.governor
+        self.max_retries = max_retries
+
+    async def _get_page(self, session, semaphore: asyncio.Semaphore,
+                        params: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch one search page, retrying rate-limit and server errors."""
+        url = f"{github.GITHUB_API_URL}/search/repositories"
+        for attempt in range(self.max_retries):
+            await self.governor.acquire_async("search")
+            async with semaphore:
+                async with session.get(url, params=params) as resp:
+                    self.governor.update(resp.headers, "search", resp.status)
+                    if resp.status == 200:
+                        return await resp.json()
+                    body = await resp.text()
+            remaining = resp.headers.get("X-RateLimit-Remaining")
+            rate_limited = resp.status == 429 or (
+                resp.status == 403 and (remaining == "0" or "Retry-After" in resp.headers
+                                        or "rate limit" in body.lower())
+            )
+            if attempt < self.max_retries - 1 and (rate_limited or resp.status in (500, 502, 503, 504)):
+                if rate_limited and remaining != "0" and "Retry-After" not in resp.headers:
+                    # Secondary limit without a hint; GitHub asks for at least a minute
+                    self.governor.backoff("search", 60)
+                elif resp.status >= 500:
+                    await asyncio.sleep(2 ** attempt)
+                logger.info(f"Search request failed with {resp.status}. Retrying...")
+                continue
+            raise RuntimeError(f"GitHub search failed with {resp.status}: {body[:200]}")
+        raise RuntimeError(f"GitHub search failed after {self.max_retries} attempts")
+
+    async def _search_query(self, session, semaphore, results: SearchResults,
+                            query_index: int, query: str, limit: int) -> int:
+        """Fetch every page needed for *limit* results of one query."""
+        per_page = min(100, limit)
+        params = {"q": query, "sort": "stars", "order": "desc", "per_page": per_page}
+
+        first = await self._get_page(session, semaphore, dict(params, page=1))
+        items = first.get("items", [])[:limit]
+        results.add(query_index, 0, items)
+
+        available = min(first.get("total_count", 0), _MAX_SEARCH_RESULTS, limit)
+        pages = math.ceil(available / per_page)
+        if pages <= 1:
+            return len(items)
+
+        async def fetch(page: int) -> int:
+            data = await self._get_page(session, semaphore, dict(params, page=page))
+            offset = (page - 1) * per_page
+            page_items = data.get("items", [])[:max(0, limit - offset)]
+            results.add(query_index, offset, page_items)
+            return len(page_items)
+
+        counts = await asyncio.gather(*(fetch(p) for p in range(2, pages + 1)), return_exceptions=True)
+        for count in counts:
+            if isinstance(count, Exception):
+                logger.info(f"Error in paginated search for query {query_index + 1}: {str(count)}")
+        return len(items) + sum(c for c in counts if isinstance(c, int))
+
+    async def search(self, queries: Sequence[str], limit_per_query: int,
+                     stop_after: Optional[int] = None) -> SearchResults:
+        """Run all *queries* concurrently.
+
+        Args:
+            queries: Search query strings
+            limit_per_query: Maximum number of results per query
+            stop_after: Cancel outstanding requests once this many unique
+                repositories have been found
+
+        Returns:
+            De-duplicated search results
+        """
+        results = SearchResults()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=60)
+
+        async with aiohttp.ClientSession(headers=github_headers(self.token), timeout=timeout) as session:
+            tasks = {
+                asyncio.ensure_future(
+                    self._search_query(session, semaphore, results, i, q, limit_per_query)
+                ): i
+                for i, q in enumerate(queries)
+            }
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = tasks[task]
+                    if task.exception() is not None:
+                        logger.info(f"Error in search query {index + 1}: {str(task.exception())}")
+                    else:
+                        logger.info(f"Found {task.result()} repositories with query {index + 1}")
+                if stop_after and len(results.matches) >= stop_after and pending:
+                    logger.info(f"Found enough repositories ({len(results.matches)}), stopping search")
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    break
+
+        return results
+
+
+def search_repositories(queries: Sequence[str], limit_per_query: int,
+                        stop_after: Optional[int] = None, **kwargs) -> SearchResults:
+    """Blocking wrapper around :meth:`AsyncGitHubSearch.search`.
+
+    Raises:
+        RuntimeError: If aiohttp is not installed or an event loop is already running
+    """
+    if not is_available():
+        raise RuntimeError("aiohttp is not installed")
+    return asyncio.run(AsyncGitHubSearch(**kwargs).search(queries, limit_per_query, stop_after))
@@ -0,0 +1,236 @@
+"""http_cache.py
+
+On-disk conditional-request cache for GitHub API responses.
+
+Successful responses are stored under a hash of their full URL, the
+``Accept`` header and a hash of the ``Authorization`` token, together with
+their ``ETag``/``Last-Modified`` validators.  Responses differ by media type
+and by what the token may see (private repositories, per-user fields), so
+one token is never served another's cached body.  The next request for the
+same URL and headers is sent with ``If-None-Match``/``If-Modified-Since``; when GitHub answers
+``304 Not Modified`` the stored body is served instead.  Conditional requests
+answered with 304 do not count against the rate limit, so repeated discovery
+and validation sweeps are both faster and cheaper.
+
+The cache is bounded by total size; the least recently used entries are
+evicted first.  Entries are written atomically so concurrent threads and
+processes can share one cache directory.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+# Cache directory; set EVAL_AGENTS_HTTP_CACHE=0 to disable caching
+HTTP_CACHE_DIR = os.getenv(
+    "EVAL_AGENTS_HTTP_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "eval_agents", "http"),
+)
+HTTP_CACHE_ENABLED = os.getenv("EVAL_AGENTS_HTTP_CACHE", "1") != "0"
+
+# Maximum total size of cached bodies
+HTTP_CACHE_MAX_BYTES = int(float(os.getenv("EVAL_AGENTS_HTTP_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+# Response headers kept with a cached body
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+
+def cache_key(url: str, headers: Optional[Mapping[str, str]] = None) -> str:
+    """Return the cache key of a GET of *url* with the request *headers*."""
+    headers = CaseInsensitiveDict(headers or {})
+    auth = headers.get("Authorization")
+    parts = (
+        url,
+        headers.get("Accept", ""),
+        hashlib.sha256(auth.encode("utf-8")).hexdigest() if auth else "",
+    )
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """A stored response and its validators."""
+
+    url: str
+    body_path: str
+    headers: Dict[str, str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def validators(self) -> Dict[str, str]:
+        """Headers that make the next request conditional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self, not_modified: requests.Response) -> requests.Response:
+        """Build a 200 response from the stored body and a 304 reply's headers."""
+        with open(self.body_path, "rb") as f:
+            body = f.read()
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = body
+        resp.headers = CaseInsensitiveDict(self.headers)
+        resp.headers.update(not_modified.headers)
+        resp.url = self.url
+        resp.encoding = "utf-8"
+        resp.request = not_modified.request
+        return resp
+
+
+class HTTPCache:
+    """Size-bounded on-disk cache of GET responses keyed by URL and request headers."""
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: Optional[int] = None  # bytes on disk, computed lazily
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, url: str, headers: Optional[Mapping[str, str]] = None):
+        key = cache_key(url, headers)
+        base = os.path.join(self.directory, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def lookup(self, url: str, headers: Optional[Mapping[str, str]] = None) -> Optional[CacheEntry]:
+        """Return the stored entry for a GET of *url* with the request *headers*, if any."""
+        meta_path, body_path = self._paths(url, headers)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or not os.path.exists(body_path):
+            return None
+        return CacheEntry(
+            url=url,
+            body_path=body_path,
+            headers=meta.get("headers", {}),
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def hit(self, entry: CacheEntry, not_modified: requests.Response) -> requests.Response:
+        """Serve a 304 reply from the cache and mark the entry as recently used."""
+        self.hits += 1
+        try:
+            os.utime(entry.body_path)
+        except OSError:
+            pass
+        return entry.to_response(not_modified)
+
+    def store(self, url: str, resp: requests.Response, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Store a 200 response if it carries a validator; *headers* are the request headers."""
+        self.misses += 1
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if resp.status_code != 200 or not (etag or last_modified):
+            return
+
+        meta_path, body_path = self._paths(url, headers)
+        body = resp.content
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": {h: resp.headers[h] for h in _KEPT_HEADERS if h in resp.headers},
+            "stored_at": time.time(),
+        }
+        try:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            previous = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError as e:
+            logger.info(f"Error writing HTTP cache entry for {url}: {str(e)}")
+            return
+
+        with self._lock:
+            if self._total is not None:
+                self._total += len(body) - previous
+            total = self._current_size()
+        if total > self.max_bytes:
+            self.evict()
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _bodies(self):
+        """Yield (mtime, size, body_path) for every cached body."""
+        if not os.path.isdir(self.directory):
+            return
+        for shard in os.listdir(self.directory):
+            shard_dir = os.path.join(self.directory, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                if name.endswith(".body"):
+                    path = os.path.join(shard_dir, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield st.st_mtime, st.st_size, path
+
+    def _current_size(self) -> int:
+        if self._total is None:
+            self._total = sum(size for _, size, _ in self._bodies())
+        return self._total
+
+    def evict(self, target_fraction: float = 0.9) -> int:
+        """Remove least recently used entries until the cache is below *target_fraction* of its limit.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            entries = sorted(self._bodies())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * target_fraction
+            removed = 0
+            for _, size, body_path in entries:
+                if total <= target:
+                    break
+                for path in (body_path, body_path[:-len(".body")] + ".json"):
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                total -= size
+                removed += 1
+            self._total = total
+        if removed:
+            logger.info(f"Evicted {removed} entries from HTTP cache {self.directory}")
+        return removed
+
+
+# Shared cache used by github_request; None when caching is disabled
+cache: Optional[HTTPCache] = HTTPCache() if HTTP_CACHE_ENABLED else None
@@ -0,0 +1,186 @@
+"""junit.py
+
+Structured test results from JUnit XML reports.
+
+:func:`prepare` installs a small pytest plugin in the container's workspace
+and returns the environment that loads it: every pytest run started by the
+generated test script then writes a ``--junitxml`` report with a unique name
+into a per-run report directory (test files are run one at a time, so a fixed
+report path would be overwritten).  Runs that already pass ``--junitxml``
+keep their own path.
+
+After the run :func:`collect` reads the reports through the workspace mount
+and parses them with ``iterparse``, clearing every ``<testcase>`` once it is
+recorded, so suites with tens of thousands of tests are summarised in
+constant memory.  The summary is a
+:class:`~eval_agents.core.result_parsers.ParsedResults` with full confidence.
+"""
+from __future__ import annotations
+
+import io
+import logging
+import os
+import posixpath
+import uuid
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, List, Optional
+
+from eval_agents.core.result_parsers import ParsedResults
+
+if TYPE_CHECKING:
+    from eval_agents.core.workspace import Workspace
+
+logger = logging.getLogger(__name__)
+
+# Set EVAL_AGENTS_JUNIT=0 to run the generated test scripts unchanged
+ENABLED = os.getenv("EVAL_AGENTS_JUNIT", "1") != "0"
+
+# Passing test records kept per run; failures are always kept and counts stay exact
+MAX_RECORDS = int(os.getenv("EVAL_AGENTS_JUNIT_MAX_RECORDS", "20000"))
+
+# Longest failure message kept per test
+MAX_MESSAGE = 2000
+
+PLUGIN_DIR = "/workspace/.eval_agents/plugins"
+REPORT_ROOT = "/workspace/.eval_agents/junit"
+PLUGIN_MODULE = "eval_agents_junit"
+
+PYTEST_PLUGIN = '''"""Adds a uniquely named --junitxml report to every pytest run (eval_agents)."""
+import os
+import uuid
+
+
+def pytest_load_initial_conftests(early_config, parser, args):
+    report_dir = os.environ.get("EVAL_AGENTS_JUNIT_DIR")
+    if not report_dir or any(a.startswith(("--junitxml", "--junit-xml")) for a in args):
+        return
+    os.makedirs(report_dir, exist_ok=True)
+    name = "pytest-%d-%s.xml" % (os.getpid(), uuid.uuid4().hex[:8])
+    args.append("--junitxml=" + os.path.join(report_dir, name))
+'''
+
+
+@dataclass
+class TestCaseResult:
+    """One ``<testcase>`` of a JUnit report."""
+
+    name: str
+    classname: str
+    status: str
+    time: Optional[float] = None
+    file: Optional[str] = None
+    message: Optional[str] = None
+
+    @property
+    def test_id(self) -> str:
+        return f"{self.classname}.{self.name}" if self.classname else self.name
+
+
+def prepare(files: Workspace) -> Dict[str, str]:
+    """Install the pytest plugin and return the environment that enables it.
+
+    Args:
+        files: Workspace of the container the tests run in
+
+    Returns:
+        Environment variables for the test run (``PYTHONPATH`` holds only the
+        plugin directory; prepend the caller's own entries), or {} if the
+        plugin could not be installed
+    """
+    if not ENABLED:
+        return {}
+    try:
+        files.write_text(posixpath.join(PLUGIN_DIR, f"{PLUGIN_MODULE}.py"), PYTEST_PLUGIN)
+    except OSError as e:
+        logger.info(f"Could not install JUnit report plugin: {str(e)}")
+        return {}
+    return {
+        "EVAL_AGENTS_JUNIT_DIR": posixpath.join(REPORT_ROOT, uuid.uuid4().hex[:12]),
+        "PYTEST_ADDOPTS": f"-p {PLUGIN_MODULE}",
+        "PYTHONPATH": PLUGIN_DIR,
+    }
+
+
+def iter_testcases(source: BinaryIO) -> Iterator[TestCaseResult]:
+    """Yield the test cases of a JUnit XML report, parsing it incrementally."""
+    for _, elem in ET.iterparse(source, events=("end",)):
+        if elem.tag != "testcase":
+            continue
+        status, message = "passed", None
+        for child in elem:
+            if child.tag in ("failure", "error", "skipped"):
+                status = {"failure": "failed", "error": "error", "skipped": "skipped"}[child.tag]
+                message = (child.get("message") or child.text or "").strip()[:MAX_MESSAGE] or None
+                if status != "skipped":
+                    break
+        try:
+            duration = float(elem.get("time")) if elem.get("time") else None
+        except ValueError:
+            duration = None
+        yield TestCaseResult(
+            name=elem.get("name", ""),
+            classname=elem.get("classname", ""),
+            status=status,
+            time=duration,
+            file=elem.get("file"),
+            message=message,
+        )
+        elem.clear()
+
+
+def _open_report(files: Workspace, path: str) -> BinaryIO:
+    host = files.host_path(path)
+    if host is not None:
+        return open(host, "rb")
+    return io.BytesIO(files.read_bytes(path))
+
+
+def collect(files: Workspace, report_dir: str) -> Optional[Dict[str, Any]]:
+    """Parse the JUnit reports in *report_dir*.
+
+    Args:
+        files: Workspace of the container the tests ran in
+        report_dir: Directory the reports were written to (``EVAL_AGENTS_JUNIT_DIR``)
+
+    Returns:
+        Dictionary with the ``summary`` (see :meth:`ParsedResults.to_dict`), the
+        per-test records under ``tests`` and the number of ``reports``, or None
+        if no report was written
+    """
+    names = [name for name in files.list_dir(report_dir) if name.endswith(".xml")]
+    if not names:
+        return None
+    summary = ParsedResults("junit-xml", 1.0)
+    records: List[Dict[str, Any]] = []
+    passed_kept = 0
+    for name in names:
+        path = posixpath.join(report_dir, name)
+        try:
+            with _open_report(files, path) as source:
+                for case in iter_testcases(source):
+                    if case.status == "passed":
+                        summary.passed += 1
+                    elif case.status == "failed":
+                        summary.failed += 1
+                        summary.add_failed(case.test_id)
+                    elif case.status == "error":
+                        summary.errors += 1
+                        summary.add_failed(case.test_id)
+                    else:
+                        summary.skipped += 1
+                    if case.time is not None:
+                        summary.duration = (summary.duration or 0.0) + case.time
+                    if case.status == "passed":
+                        if passed_kept >= MAX_RECORDS:
+                            continue
+                        passed_kept += 1
+                    records.append(asdict(case))
+        except (OSError, ET.ParseError) as e:
+            # An interrupted run leaves a truncated report; keep what the others hold
+            logger.info(f"Error parsing JUnit report {path}: {str(e)}")
+    return {
+        "summary": summary.to_dict(),
+        "tests": records,
+        "reports": len(names),
+    }
@@ -0,0 +1,206 @@
+"""llm_cache.py
+
+Persistent, content-addressed cache for Claude completions.
+
+``TestAgent`` and ``ResultAgent`` call ``messages.create`` at temperature 0,
+so re-running a repository at the same commit repeats identical prompts for
+dependency commands, test discovery and result formatting.  Responses are
+stored in SQLite under a SHA-256 of the request (model, system prompt,
+messages and sampling parameters) and served from disk on the next identical
+call.
+
+Entries expire after :data:`LLM_CACHE_TTL` seconds and the least recently
+used ones are evicted once the cache exceeds :data:`LLM_CACHE_MAX_BYTES`.
+:meth:`LLMCache.stats` reports the hit rate and the API latency saved.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from eval_agents.core import telemetry
+
+logger = logging.getLogger(__name__)
+
+# Cache database; set EVAL_AGENTS_LLM_CACHE=0 to disable caching
+LLM_CACHE_PATH = os.getenv(
+    "EVAL_AGENTS_LLM_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "eval_agents", "llm_cache.sqlite3"),
+)
+LLM_CACHE_ENABLED = os.getenv("EVAL_AGENTS_LLM_CACHE", "1") != "0"
+
+# Entries older than this are ignored and purged (seconds, default 30 days)
+LLM_CACHE_TTL = int(os.getenv("EVAL_AGENTS_LLM_CACHE_TTL", str(30 * 24 * 3600)))
+
+# Maximum total size of cached responses
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("EVAL_AGENTS_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+
+# Request parameters that determine the response
+_KEY_FIELDS = ("model", "system", "messages", "max_tokens", "temperature", "top_p", "top_k", "stop_sequences")
+
+
+def cache_key(params: Dict[str, Any]) -> str:
+    """Return the content hash identifying a ``messages.create`` request."""
+    payload = {field: params[field] for field in _KEY_FIELDS if field in params}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL and LRU size eviction."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                latency REAL NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for *key*, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, latency, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] < now - self.ttl:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            self.saved_seconds += row[1]
+            return row[0]
+
+    def put(self, key: str, response: str, latency: float, model: Optional[str] = None) -> None:
+        """Store a response and the latency it took to produce."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """INSERT OR REPLACE INTO responses (key, model, response, latency, size, created_at, last_used)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (key, model, response, latency, len(response.encode("utf-8")), now, now)
+            )
+            conn.commit()
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Purge expired entries, then least recently used ones above the size limit."""
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+                if total <= target:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+        conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counts, hit rate and saved latency for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 2),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Shared cache used by create_message_text; None when caching is disabled
+cache: Optional[LLMCache] = LLMCache() if LLM_CACHE_ENABLED else None
+
+
+def create_message_text(client, params: Dict[str, Any]) -> str:
+    """Call ``client.messages.create(**params)`` and return the first text block, cached.
+
+    Only deterministic requests (temperature 0) are cached.  Cache errors
+    never fail the call; the API is used directly instead.
+
+    Args:
+        client: Anthropic client
+        params: Keyword arguments for ``messages.create``
+
+    Returns:
+        The response text
+    """
+    use_cache = cache is not None and params.get("temperature") == 0
+    key = cache_key(params) if use_cache else None
+
+    if use_cache:
+        try:
+            cached = cache.get(key)
+            if cached is not None:
+                telemetry.record_llm(params.get("model", ""), 0.0, cached=True)
+                return cached
+        except sqlite3.Error as e:
+            logger.info(f"Error reading LLM cache: {str(e)}")
+
+    with telemetry.span("llm", model=params.get("model")) as attrs:
+        start = time.monotonic()
+        message = client.messages.create(**params)
+        text = message.content[0].text
+        latency = time.monotonic() - start
+        usage = getattr(message, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        attrs.update(input_tokens=input_tokens, output_tokens=output_tokens)
+    telemetry.record_llm(params.get("model", ""), latency, input_tokens, output_tokens)
+
+    if use_cache and text:
+        try:
+            cache.put(key, text, latency, params.get("model"))
+        except sqlite3.Error as e:
+            logger.info(f"Error writing LLM cache: {str(e)}")
+    return text
+
+
+def log_stats() -> None:
+    """Log the cache hit rate and saved latency of this process."""
+    if cache is None:
+        return
+    stats = cache.stats()
+    if stats["hits"] or stats["misses"]:
+        logger.info(
+            f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate), saved {stats['saved_seconds']:.1f}s of API latency"
+        )
@@ -1,45 +1,260 @@
 """parallel.py
 
-Lightweight placeholder implementation for `ParallelTestRunner` used by
-`eval_agents.core.repo`.  In the current simplified workflow we run tests
-sequentially, but `ParallelTestRunner` keeps the public interface stable for
-future parallel execution.
+Concurrent Clone → Test → Result pipeline used by `eval_agents.core.repo`.
 
-If you later need real parallelism you can swap in a multiprocessing or
-async-based implementation without touching callers.
+Each repository is handled end-to-end by a single worker: the CloneAgent
+creates an isolated container and clones the repository into it, the
+TestAgent installs dependencies and runs the integration tests, and the
+ResultAgent evaluates and serialises the output.  The containers come from
+the warm :class:`ContainerPool` instead of being created and destroyed per
+repository; the TestAgent only talks to the local Docker daemon, so the
+CloneAgent is kept on local Docker as well.  Up to ``max_parallel``
+repositories are in flight at once.  Workers share nothing but the agent
+instances (which are stateless per call), and a failure in one repository is
+captured in its result dictionary instead of aborting the rest of the batch.
 """
 from __future__ import annotations
 
 import logging
-from typing import List
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from eval_agents.agents.clone_agent import CloneAgent
+from eval_agents.agents.result_agent import ResultAgent
+from eval_agents.agents.test_agent import TestAgent
+from eval_agents.core import llm_cache, telemetry
+from eval_agents.core.checkpoints import CheckpointStore, RepoCheckpoints, default_store
+from eval_agents.core.container_pool import ContainerPool, pool as default_pool
+from eval_agents.core.utils import DEFAULT_DB_NAME, update_test_results
 
 logger = logging.getLogger(__name__)
 
+
+def _repo_slug(repo_url: str) -> str:
+    """Return a filesystem-safe ``owner_repo`` slug for *repo_url*."""
+    parts = repo_url.rstrip("/").replace(".git", "").split("/")[-2:]
+    return re.sub(r"[^a-zA-Z0-9_-]", "", "_".join(parts))
+
+
 class ParallelTestRunner:
-    """Trivial sequential fallback.
+    """Run the full Clone → Test → Result pipeline for many repositories.
 
-    Parameters are accepted for API compatibility but currently ignored.
+    Args:
+        ssh_host / ssh_user / ssh_key_path / ssh_port: Forwarded to
+            :class:`CloneAgent`; ``None`` keeps the CloneAgent defaults.  The
+            TestAgent only reaches the local Docker daemon, so if the
+            CloneAgent connects to the remote host it is switched to local
+            Docker.
+        work_dir: Working directory mounted into remote containers.
+        max_parallel: Number of repositories processed concurrently.
+        db_name: Database that receives the test results.  ``None`` disables
+            database writes.
+        output_dir: Directory for the ResultAgent JSON files.
+        keep_containers: Keep containers around after processing (debugging).
+            Only honoured when containers are not taken from the pool.
+        container_pool: Pool of warm local containers; defaults to the shared
+            :data:`~eval_agents.core.container_pool.pool`.
+        checkpoint_store: Where per-stage checkpoints are kept so an
+            interrupted repository resumes from its last completed stage;
+            defaults to :func:`~eval_agents.core.checkpoints.default_store`.
     """
 
     def __init__(self, *, ssh_host: str | None = None, ssh_user: str | None = None,
                  ssh_key_path: str | None = None, ssh_port: str | None = None,
-                 work_dir: str = "/tmp/repo_tests", max_parallel: int = 4):
+                 work_dir: str = "/tmp/repo_tests", max_parallel: int = 4,
+                 db_name: Optional[str] = DEFAULT_DB_NAME, output_dir: str | None = None,
+                 keep_containers: bool = False, container_pool: ContainerPool | None = None,
+                 checkpoint_store: CheckpointStore | None = None):
         self.work_dir = work_dir
-        self.max_parallel = max_parallel
-        logger.info("ParallelTestRunner initialised (sequential fallback, max_parallel=%s)", max_parallel)
+        self.max_parallel = max(1, max_parallel)
+        self.db_name = db_name
+        self.keep_containers = keep_containers
+        self.checkpoint_store = checkpoint_store or default_store(db_name)
+
+        ssh_kwargs = {
+            "ssh_host": ssh_host,
+            "ssh_user": ssh_user,
+            "ssh_key_path": ssh_key_path,
+            "ssh_port": ssh_port,
+        }
+        self.clone_agent = CloneAgent(work_dir=work_dir,
+                                      **{k: v for k, v in ssh_kwargs.items() if v})
+        if self.clone_agent.use_remote:
+            # TestAgent only talks to the local Docker daemon, so containers on
+            # the remote host could be cloned into but never tested
+            logger.info("TestAgent cannot reach containers on %s, using local Docker instead",
+                        self.clone_agent.ssh_host)
+            self.clone_agent._connect_local()
+        self.test_agent = TestAgent(db_name=db_name or DEFAULT_DB_NAME)
+
+        self.use_pool = not keep_containers
+        self.container_pool = container_pool or default_pool
+        if self.use_pool:
+            # Make sure there is a warm container for every worker.
+            self.container_pool.size = max(self.container_pool.size, self.max_parallel)
+
+        # The ResultAgent is optional – without an API key we still record raw results.
+        try:
+            self.result_agent: Optional[ResultAgent] = ResultAgent(output_dir=output_dir)
+        except ValueError as e:
+            logger.info("ResultAgent disabled: %s", e)
+            self.result_agent = None
+
+        telemetry.start_metrics_server()
+        logger.info("ParallelTestRunner initialised (max_parallel=%s)", self.max_parallel)
+
+    def process_repo(self, repo_url: str) -> Dict[str, Any]:
+        """Clone, test and evaluate a single repository.
+
+        Never raises: any exception is recorded in the returned dictionary
+        together with the pipeline stage that failed.
+
+        Args:
+            repo_url: URL of the GitHub repository
+
+        Returns:
+            Dictionary with the per-repository outcome
+        """
+        started = time.monotonic()
+        result: Dict[str, Any] = {
+            "repo_url": repo_url,
+            "success": False,
+            "stage": "clone",
+            "commit_id": "",
+            "test_results": None,
+            "validity": None,
+            "result_file": "",
+            "error": "",
+        }
+        with telemetry.repo_context(repo_url), telemetry.span("repo") as span_attrs:
+            checkpoints = RepoCheckpoints(self.checkpoint_store, repo_url)
+            cloned = checkpoints.get("cloned")
+            try:
+                if self.use_pool:
+                    with self.container_pool.acquire() as (container_id, _workspace_dir):
+                        with telemetry.span("clone"):
+                            success, output, commit_id = self.clone_agent.clone_into(
+                                container_id, repo_url, commit_id=cloned["commit_id"] if cloned else None
+                            )
+                        if not success:
+                            result["error"] = output
+                            return result
+                        self._record_clone(checkpoints, commit_id, result)
+                        self._test_and_record(container_id, repo_url, result, checkpoints)
+                else:
+                    container_id = ""
+                    try:
+                        with telemetry.span("clone"):
+                            success, cloned_id, output, commit_id = self.clone_agent.clone_repo(
+                                repo_url, commit_id=cloned["commit_id"] if cloned else None
+                            )
+                        if not success:
+                            # clone_repo already removed the container on failure
+                            result["error"] = output
+                            return result
+                        container_id = cloned_id
+                        self._record_clone(checkpoints, commit_id, result)
+                        self._test_and_record(container_id, repo_url, result, checkpoints)
+                    finally:
+                        if container_id and not self.keep_containers:
+                            self.clone_agent._cleanup_container(container_id)
+            except Exception as e:
+                logger.info("Error processing %s during %s: %s", repo_url, result["stage"], e)
+                result["error"] = f"Exception: {e}"
+            finally:
+                result["duration"] = round(time.monotonic() - started, 2)
+                span_attrs.update(stage=result["stage"], success=result["success"])
+
+        return result
+
+    @staticmethod
+    def _record_clone(checkpoints: RepoCheckpoints, commit_id: str, result: Dict[str, Any]) -> None:
+        """Checkpoint the clone; checkpoints of another commit are no longer valid."""
+        cloned = checkpoints.get("cloned")
+        if cloned and cloned.get("commit_id") != commit_id:
+            logger.info("Repository moved from %s to %s, discarding checkpoints", cloned.get("commit_id"), commit_id)
+            checkpoints.clear()
+            cloned = None
+        if not cloned:
+            checkpoints.record("cloned", commit_id=commit_id)
+        result["commit_id"] = commit_id
+        result["resumed_from"] = checkpoints.last_stage() if cloned else None
+
+    def _test_and_record(self, container_id: str, repo_url: str, result: Dict[str, Any],
+                         checkpoints: Optional[RepoCheckpoints] = None) -> None:
+        """Run the test and result stages for a cloned repository, filling *result*."""
+        result["stage"] = "test"
+        with telemetry.span("test"):
+            test_results = self.test_agent.run(container_id, repo_url, checkpoints)
+        result["test_results"] = test_results
+        test_run = test_results.get("IntegrationTestRun", {})
+        run_output = test_run.get("result", {})
+
+        result["stage"] = "result"
+        if self.result_agent is not None:
+            test_output = f"{run_output.get('stdout', '')}\n{run_output.get('stderr', '')}"
+            with telemetry.span("result"):
+                evaluation = self.result_agent.extract_and_save_results(
+                    test_output, repo_name=_repo_slug(repo_url), junit=test_run.get("junit"),
+                    exit_code=run_output.get("returnCode")
+                )
+            result["validity"] = evaluation.get("validity")
+            result["result_file"] = evaluation.get("filepath", "")
+
+        if self.db_name:
+            update_test_results(self.db_name, repo_url, test_results)
+        if checkpoints is not None:
+            # The result is recorded; the next run starts from scratch
+            checkpoints.clear()
 
-    # pylint: disable=unused-argument
-    def process_repos_parallel(self, repo_urls: List[str]):
-        """Process repo URLs sequentially for now.
+        result["stage"] = "done"
+        result["success"] = bool(test_run.get("pass", False))
+        if not result["success"] and run_output.get("returnCode", 0) != 0:
+            result["error"] = run_output.get("stderr", "")[-2000:]
 
-        Returns a list of dummy result dictionaries; replace with real
-        orchestration logic as needed.
+    def process_repos_parallel(self, repo_urls: List[str]) -> List[Dict[str, Any]]:
+        """Process repositories concurrently using up to ``max_parallel`` workers.
+
+        Args:
+            repo_urls: List of repository URLs to process
+
+        Returns:
+            List of result dictionaries, in the same order as *repo_urls*
         """
-        results = []
-        for url in repo_urls:
-            logger.info("Processing repo %s (sequential placeholder)", url)
-            results.append({"repo_url": url, "status": "processed"})
-        return results
+        if not repo_urls:
+            return []
+
+        logger.info("Processing %d repositories (max_parallel=%d)", len(repo_urls), self.max_parallel)
+        if self.use_pool:
+            self.container_pool.warm(min(self.max_parallel, len(repo_urls)))
+        results: Dict[int, Dict[str, Any]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel,
+                                thread_name_prefix="repo-runner") as executor:
+            future_to_index = {executor.submit(self.process_repo, url): i
+                               for i, url in enumerate(repo_urls)}
+
+            for future in as_completed(future_to_index):
+                i = future_to_index[future]
+                url = repo_urls[i]
+                try:
+                    results[i] = future.result()
+                except Exception as e:  # process_repo never raises; belt and braces
+                    results[i] = {"repo_url": url, "success": False, "stage": "unknown",
+                                  "error": f"Exception: {e}"}
+                logger.info("Processed %s: %s (stage=%s, %.1fs)", url,
+                            "PASS" if results[i]["success"] else "FAIL",
+                            results[i].get("stage"), results[i].get("duration", 0.0))
+
+        passed = sum(1 for r in results.values() if r["success"])
+        logger.info("Finished %d repositories: %d passed, %d failed",
+                    len(results), passed, len(results) - passed)
+        llm_cache.log_stats()
+        telemetry.log_summary()
+        telemetry.write_metrics()
+        return [results[i] for i in range(len(repo_urls))]
 
     # Backward-compat shim – remove after callers are updated.
     process_repos_paralsslel = process_repos_parallel  # type: ignore
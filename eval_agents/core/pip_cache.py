@@ -0,0 +1,143 @@
+"""pip_cache.py
+
+Shared pip cache (and optional local wheelhouse) for runner containers.
+
+Each runner container used to download and build every wheel from scratch.
+A host directory is now bind-mounted into all pooled containers at
+:data:`CONTAINER_CACHE_DIR` and ``PIP_CACHE_DIR`` points pip at it, so a
+wheel downloaded or built for one repository is reused by every later one.
+pip writes cache entries to temporary files and renames them into place, so
+concurrent containers can share the directory safely.
+
+The cache is kept below :data:`PIP_CACHE_MAX_BYTES` by :func:`prune`, which
+removes the least recently used files under an ``fcntl`` lock so only one
+worker prunes at a time.
+
+A local wheelhouse can stand in for (or supplement) PyPI: set
+``EVAL_AGENTS_WHEELHOUSE`` to a host directory.  It is mounted read-only; a
+directory with a ``simple/`` PEP 503 layout is used as an extra index,
+otherwise its files are offered with ``--find-links``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from typing import Dict, Optional
+
+from eval_agents.core.utils import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Set EVAL_AGENTS_PIP_CACHE=0 to disable the shared cache
+PIP_CACHE_ENABLED = os.getenv("EVAL_AGENTS_PIP_CACHE", "1") != "0"
+
+# Host directory shared by all containers
+PIP_CACHE_DIR = os.getenv(
+    "EVAL_AGENTS_PIP_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "eval_agents", "pip"),
+)
+
+# Maximum size of the shared cache
+PIP_CACHE_MAX_BYTES = int(float(os.getenv("EVAL_AGENTS_PIP_CACHE_MAX_GB", "10")) * 1024 ** 3)
+
+# Minimum number of seconds between two prunes
+PRUNE_INTERVAL = int(os.getenv("EVAL_AGENTS_PIP_CACHE_PRUNE_SECONDS", "3600"))
+
+# Optional host directory of wheels/sdists, or a PEP 503 tree under simple/
+WHEELHOUSE = os.getenv("EVAL_AGENTS_WHEELHOUSE")
+
+# Mount points inside the containers
+CONTAINER_CACHE_DIR = "/var/cache/eval_agents/pip"
+CONTAINER_WHEELHOUSE = "/opt/eval_agents/wheelhouse"
+
+_NO_CACHE_FLAG = re.compile(r"[ \t]+--no-cache-dir\b")
+
+
+def volumes() -> Dict[str, Dict[str, str]]:
+    """Return the Docker SDK ``volumes`` entries for the cache and wheelhouse."""
+    mounts: Dict[str, Dict[str, str]] = {}
+    if PIP_CACHE_ENABLED:
+        os.makedirs(PIP_CACHE_DIR, exist_ok=True)
+        mounts[PIP_CACHE_DIR] = {"bind": CONTAINER_CACHE_DIR, "mode": "rw"}
+    if WHEELHOUSE and os.path.isdir(WHEELHOUSE):
+        mounts[WHEELHOUSE] = {"bind": CONTAINER_WHEELHOUSE, "mode": "ro"}
+    return mounts
+
+
+def environment() -> Dict[str, str]:
+    """Return the pip environment variables matching :func:`volumes`."""
+    env: Dict[str, str] = {}
+    if PIP_CACHE_ENABLED:
+        env["PIP_CACHE_DIR"] = CONTAINER_CACHE_DIR
+    if WHEELHOUSE and os.path.isdir(WHEELHOUSE):
+        if os.path.isdir(os.path.join(WHEELHOUSE, "simple")):
+            env["PIP_EXTRA_INDEX_URL"] = f"file://{CONTAINER_WHEELHOUSE}/simple"
+        else:
+            env["PIP_FIND_LINKS"] = CONTAINER_WHEELHOUSE
+    return env
+
+
+def strip_no_cache(script: str) -> str:
+    """Remove ``--no-cache-dir`` from pip commands so they use the shared cache."""
+    if not PIP_CACHE_ENABLED:
+        return script
+    return _NO_CACHE_FLAG.sub("", script)
+
+
+def prune(max_bytes: int = PIP_CACHE_MAX_BYTES, cache_dir: str = PIP_CACHE_DIR,
+          force: bool = False) -> int:
+    """Remove least recently used cache files until the cache fits in *max_bytes*.
+
+    Skipped if another worker pruned within :data:`PRUNE_INTERVAL` seconds,
+    unless *force* is set.
+
+    Returns:
+        Number of bytes removed
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    stamp = os.path.join(cache_dir, ".eval_agents_pruned")
+    with file_lock(cache_dir):
+        if not force and os.path.exists(stamp) and time.time() - os.path.getmtime(stamp) < PRUNE_INTERVAL:
+            return 0
+
+        files = []
+        for root, _, names in os.walk(cache_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((max(st.st_atime, st.st_mtime), st.st_size, path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        if total > max_bytes:
+            target = max_bytes * 0.9
+            for _, size, path in sorted(files):
+                if total - removed <= target:
+                    break
+                try:
+                    os.unlink(path)
+                    removed += size
+                except OSError as e:
+                    logger.info(f"Error pruning pip cache file {path}: {str(e)}")
+
+        with open(stamp, "w"):
+            pass
+    if removed:
+        logger.info(f"Pruned {removed / 1024 ** 2:.0f} MB from pip cache {cache_dir}")
+    return removed
+
+
+def maybe_prune() -> Optional[int]:
+    """Prune the shared cache if it is enabled; errors are logged, not raised."""
+    if not PIP_CACHE_ENABLED:
+        return None
+    try:
+        return prune()
+    except OSError as e:
+        logger.info(f"Error pruning pip cache: {str(e)}")
+        return None
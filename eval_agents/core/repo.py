@@ -12,8 +12,14 @@ import argparse
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
-from eval_agents.core.utils import get_db_connection, DEFAULT_DB_NAME
+from eval_agents.core.utils import DEFAULT_DB_NAME
 from eval_agents.core.parallel import ParallelTestRunner
+from eval_agents.core.work_queue import (
+    LeaseHeartbeat,
+    claim_repos,
+    default_worker_id,
+    release_claims,
+)
 
 import logging
 
@@ -31,42 +37,29 @@ if not logger.handlers:
 # Default to 10 parallel repositories
 DEFAULT_MAX_PARALLEL = 10
 
+# Identifier under which this process claims repositories
+WORKER_ID = default_worker_id()
 
-def get_untested_validated_repos(limit: int = 10, db_name: str = DEFAULT_DB_NAME) -> List[Dict[str, Any]]:
+
+def get_untested_validated_repos(limit: int = 10, db_name: str = DEFAULT_DB_NAME,
+                                 worker_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-Get repositories that have been validated but not tested yet.
+Claim repositories that have been validated but not tested yet.
+
+The repositories are leased to *worker_id* (see ``core.work_queue``) so
+concurrent workers never pick up the same repositories.  Callers must
+release the claims with ``release_claims`` once the results are stored.
 
 Args:
     limit: Maximum number of repositories to return
     db_name: Name of the database to use
+    worker_id: Identifier of the claiming worker (defaults to a per-process id)
 
 Returns:
     List of dictionaries containing repository information
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        # Get repositories that have been validated but not tested
-        cursor.execute(
-            """SELECT id, repo_url, language 
-               FROM repositories 
-               WHERE validation_results = TRUE 
-               AND (test_results IS NULL OR test_results = FALSE) 
-               LIMIT %s""",
-            (limit,)
-        )
-        
-        repos = [{
-            "id": row[0],
-            "repo_url": row[1],
-            "language": row[2]
-        } for row in cursor.fetchall()]
-        
-        cursor.close()
-        conn.close()
-        
-        return repos
+        return claim_repos("test", worker_id or WORKER_ID, limit=limit, db_name=db_name)
     except Exception as e:
         logger.info(f"Error getting untested validated repositories: {str(e)}")
         return []
@@ -113,18 +106,24 @@ Returns:
     for repo in repos:
         logger.info(f"  - {repo['repo_url']} ({repo['language']})")
     
-    # Initialize the ParallelTestRunner
-    runner = ParallelTestRunner(
-        ssh_host=ssh_host,
-        ssh_user=ssh_user,
-        ssh_key_path=ssh_key_path,
-        ssh_port=ssh_port,
-        work_dir=work_dir,
-        max_parallel=max_parallel
-    )
-    
-    # Process repositories in parallel
-    return runner.process_repos_parallel([repo["repo_url"] for repo in repos])
+    repo_urls = [repo["repo_url"] for repo in repos]
+    try:
+        # Initialize the ParallelTestRunner
+        runner = ParallelTestRunner(
+            ssh_host=ssh_host,
+            ssh_user=ssh_user,
+            ssh_key_path=ssh_key_path,
+            ssh_port=ssh_port,
+            work_dir=work_dir,
+            max_parallel=max_parallel,
+            db_name=db_name
+        )
+        
+        # Process repositories in parallel, keeping the claims alive meanwhile
+        with LeaseHeartbeat(WORKER_ID, repo_urls, db_name):
+            return runner.process_repos_parallel(repo_urls)
+    finally:
+        release_claims(repo_urls, WORKER_ID, db_name)
 
 
 def main():
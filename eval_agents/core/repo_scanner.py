@@ -0,0 +1,213 @@
+"""repo_scanner.py
+
+Single-pass repository scanner that runs inside the test container.
+
+Agents used to probe a cloned repository with one ``docker exec`` per
+question: ``test -f`` for each candidate manifest, ``find | wc -l`` for file
+counts, ``ls``/``find``/``cat`` again for every prompt.  :func:`get_manifest`
+instead runs one small Python script that walks the tree once and returns a
+JSON manifest with:
+
+* ``files``: ``[path, size]`` pairs relative to the repository root
+* ``directories``: every directory outside VCS/vendor folders
+* ``languages``: file counts per language, by extension
+* ``dependency_manifests``: contents (truncated) of dependency files such as
+  ``requirements.txt``, ``pyproject.toml`` or ``package.json``
+* ``test_candidates`` and ``test_directories``: test files and folders by name
+
+The manifest is written to ``/tmp`` inside the container and cached per
+container in this process, so every agent that needs it pays for the walk
+once.  Call :func:`invalidate` when the repository in a container changes.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import posixpath
+import threading
+from typing import Any, Dict, List, Optional
+
+from eval_agents.core.docker_backend import DockerBackend, DockerSDKBackend
+
+logger = logging.getLogger(__name__)
+
+# Repository location inside the test containers
+REPO_DIR = "/workspace/repo"
+
+# Where the scanner leaves its manifest inside the container
+MANIFEST_PATH = "/tmp/eval_agents_manifest.json"
+
+# Scanner executed with ``python3 -c``; argv: repo dir, manifest path, refresh flag
+_SCANNER_SCRIPT = r'''
+import json, os, re, sys
+root, out, refresh = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+if not refresh and os.path.exists(out):
+    sys.stdout.write(open(out).read())
+    sys.exit(0)
+SKIP = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox", ".mypy_cache", ".pytest_cache"}
+LANGS = {".py": "Python", ".js": "JavaScript", ".jsx": "JavaScript", ".ts": "TypeScript", ".tsx": "TypeScript",
+         ".go": "Go", ".java": "Java", ".kt": "Kotlin", ".rb": "Ruby", ".rs": "Rust", ".php": "PHP",
+         ".c": "C", ".h": "C", ".cc": "C++", ".cpp": "C++", ".hpp": "C++", ".cs": "C#", ".scala": "Scala",
+         ".swift": "Swift", ".sh": "Shell"}
+MANIFESTS = {"requirements.txt", "requirements-dev.txt", "requirements-test.txt", "dev-requirements.txt",
+             "test-requirements.txt", "setup.py", "setup.cfg", "pyproject.toml", "Pipfile", "tox.ini",
+             "pytest.ini", "conftest.py", "noxfile.py", "environment.yml", "package.json", "go.mod",
+             "Cargo.toml", "pom.xml", "build.gradle", "build.gradle.kts", "Gemfile", "composer.json",
+             "Makefile", "docker-compose.yml", "docker-compose.yaml"}
+TEST_FILE = re.compile(r"(^test.*\.py$|_test\.(py|go)$|\.(test|spec)\.(js|jsx|ts|tsx)$|(Test|IT)\.java$|_spec\.rb$)")
+TEST_DIR = re.compile(r"^(tests?|testing|integration|integration_tests?|e2e|functional|acceptance|spec|__tests__)$", re.I)
+MAX_FILES, MAX_MANIFEST_BYTES = 50000, 8192
+files, dirs, langs, manifests, tests, test_dirs = [], [], {}, {}, [], []
+total, count = 0, 0
+for dirpath, dirnames, filenames in os.walk(root):
+    dirnames[:] = sorted(d for d in dirnames if d not in SKIP)
+    rel_dir = os.path.relpath(dirpath, root)
+    rel_dir = "" if rel_dir == "." else rel_dir
+    if rel_dir:
+        dirs.append(rel_dir)
+        if TEST_DIR.match(os.path.basename(rel_dir)):
+            test_dirs.append(rel_dir)
+    for name in sorted(filenames):
+        path = os.path.join(rel_dir, name) if rel_dir else name
+        try:
+            size = os.lstat(os.path.join(dirpath, name)).st_size
+        except OSError:
+            continue
+        count += 1
+        total += size
+        if len(files) < MAX_FILES:
+            files.append([path, size])
+        lang = LANGS.get(os.path.splitext(name)[1].lower())
+        if lang:
+            langs[lang] = langs.get(lang, 0) + 1
+        if name in MANIFESTS and path.count("/") <= 2:
+            try:
+                with open(os.path.join(dirpath, name), "r", errors="replace") as f:
+                    manifests[path] = f.read(MAX_MANIFEST_BYTES)
+            except OSError:
+                pass
+        if TEST_FILE.search(name):
+            tests.append(path)
+manifest = {"root": root, "files": files, "file_count": count, "total_bytes": total,
+            "truncated": count > len(files), "directories": dirs, "languages": langs,
+            "dependency_manifests": manifests, "test_candidates": tests, "test_directories": test_dirs}
+data = json.dumps(manifest)
+try:
+    with open(out, "w") as f:
+        f.write(data)
+except OSError:
+    pass
+sys.stdout.write(data)
+'''
+
+# Framework name -> markers looked for in dependency manifests
+_FRAMEWORK_MARKERS = {
+    "pytest": ["pytest"],
+    "unittest": ["unittest"],
+    "nose2": ["nose2"],
+    "tox": ["[tox]", "tox"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "jest": ["\"jest\""],
+    "mocha": ["\"mocha\""],
+    "junit": ["junit"],
+    "testify": ["stretchr/testify"],
+    "rspec": ["rspec"],
+}
+
+_cache: Dict[str, Dict[str, Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def get_manifest(container_id: str, backend: Optional[DockerBackend] = None,
+                 refresh: bool = False, repo_dir: str = REPO_DIR) -> Dict[str, Any]:
+    """Return the manifest of the repository in *container_id*, scanning it once.
+
+    Args:
+        container_id: Container with the cloned repository
+        backend: Execution backend (defaults to the Docker SDK backend)
+        refresh: Rescan even if a cached manifest exists
+        repo_dir: Repository location inside the container
+
+    Returns:
+        Manifest dictionary (see module docstring)
+
+    Raises:
+        RuntimeError: If the scanner fails inside the container
+    """
+    if not refresh:
+        with _cache_lock:
+            if container_id in _cache:
+                return _cache[container_id]
+
+    backend = backend or DockerSDKBackend()
+    exit_code, stdout, stderr = backend.exec(
+        container_id,
+        ["python3", "-c", _SCANNER_SCRIPT, repo_dir, MANIFEST_PATH, "1" if refresh else "0"],
+    )
+    if exit_code != 0:
+        raise RuntimeError(f"Repository scan failed: {stderr or stdout}")
+    manifest = json.loads(stdout)
+
+    with _cache_lock:
+        _cache[container_id] = manifest
+    logger.info(f"Scanned {manifest['file_count']} files in {repo_dir} "
+                f"({len(manifest['test_candidates'])} test candidates)")
+    return manifest
+
+
+def invalidate(container_id: str, backend: Optional[DockerBackend] = None) -> None:
+    """Forget the cached manifest of *container_id* (and its in-container copy if *backend* is given)."""
+    with _cache_lock:
+        _cache.pop(container_id, None)
+    if backend is not None:
+        try:
+            backend.exec(container_id, ["rm", "-f", MANIFEST_PATH])
+        except Exception:
+            pass
+
+
+def has_file(manifest: Dict[str, Any], path: str) -> bool:
+    """Return True if *path* (relative to the repository root) is a file."""
+    return any(p == path for p, _ in manifest["files"])
+
+
+def files_with_extension(manifest: Dict[str, Any], extension: str) -> List[str]:
+    """Return the relative paths of files ending in *extension*."""
+    return [p for p, _ in manifest["files"] if p.endswith(extension)]
+
+
+def top_level_entries(manifest: Dict[str, Any]) -> List[str]:
+    """Return the names in the repository root, directories suffixed with ``/``."""
+    entries = {d + "/" for d in manifest["directories"] if "/" not in d}
+    entries.update(p for p, _ in manifest["files"] if "/" not in p)
+    return sorted(entries)
+
+
+def detect_frameworks(manifest: Dict[str, Any]) -> List[str]:
+    """Return frameworks referenced by the dependency manifests."""
+    text = "\n".join(manifest["dependency_manifests"].values()).lower()
+    frameworks = [name for name, markers in _FRAMEWORK_MARKERS.items()
+                  if any(marker.lower() in text for marker in markers)]
+    if "pytest" not in frameworks and (has_file(manifest, "conftest.py") or has_file(manifest, "pytest.ini")):
+        frameworks.append("pytest")
+    return frameworks
+
+
+def to_analysis(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a manifest to the repository analysis format used by TestAgent."""
+    root = manifest["root"]
+    languages = sorted(manifest["languages"], key=lambda lang: -manifest["languages"][lang])
+    return {
+        "languages": languages,
+        "frameworks": detect_frameworks(manifest),
+        "package_files": [posixpath.join(root, p) for p in manifest["dependency_manifests"]],
+        "test_directories": [posixpath.join(root, d) for d in manifest["test_directories"]],
+        "test_files": [posixpath.join(root, p) for p in manifest["test_candidates"]],
+        "structure_summary": (
+            f"{manifest['file_count']} files in {len(manifest['directories'])} directories; "
+            f"languages: {', '.join(languages) or 'unknown'}; "
+            f"{len(manifest['test_candidates'])} test files"
+        ),
+    }
@@ -0,0 +1,391 @@
+"""result_parsers.py
+
+Deterministic parsers for test runner output.
+
+``ResultAgent`` used to send the whole raw output of a test run to Claude to
+count passes and failures.  The parsers registered here recognise the
+summaries printed by common runners and extract the counts, the IDs of
+failed tests and the duration locally:
+
+==========  ===================================================================
+pytest      ``=== 2 failed, 10 passed in 1.23s ===`` and ``FAILED path::test``
+unittest    ``Ran 12 tests in 0.5s`` + ``OK``/``FAILED (failures=1)`` (nose2 too)
+tox         ``py311: commands succeeded`` / ``py311: FAIL code 1 (2.1 seconds)``
+jest        ``Tests: 1 failed, 10 passed, 11 total`` and ``● Suite › test``
+go          ``--- FAIL: TestName (0.01s)`` and ``ok``/``FAIL`` package lines
+junit       Maven ``Tests run: 12, Failures: 1, Errors: 0, Skipped: 0`` and
+            Gradle ``12 tests completed, 1 failed``
+==========  ===================================================================
+
+Runner scripts often invoke the runner once per test file, so every summary
+in the output is added up.  Each parser reports a confidence; :func:`parse`
+returns the most confident result if it reaches :data:`CONFIDENCE_THRESHOLD`,
+and callers fall back to the LLM otherwise.  New parsers are added with the
+:func:`register` decorator.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Minimum confidence for a parsed result to be used instead of the LLM
+CONFIDENCE_THRESHOLD = float(os.getenv("EVAL_AGENTS_PARSER_CONFIDENCE", "0.8"))
+
+# Failed test IDs kept per result
+MAX_FAILED_TESTS = 200
+
+# Output fragments that point at a broken environment rather than failing code
+ENVIRONMENT_ERROR_MARKERS = (
+    "ModuleNotFoundError",
+    "ImportError",
+    "No module named",
+    "ERROR collecting",
+    "command not found",
+    "Cannot find module",
+    "cannot find package",
+    "externally-managed-environment",
+    "Could not resolve dependencies",
+)
+
+
+@dataclass
+class ParsedResults:
+    """Test counts extracted from runner output."""
+
+    framework: str
+    confidence: float
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    skipped: int = 0
+    failed_tests: List[str] = field(default_factory=list)
+    duration: Optional[float] = None
+
+    @property
+    def total(self) -> int:
+        return self.passed + self.failed + self.errors + self.skipped
+
+    @property
+    def success(self) -> bool:
+        return self.total > 0 and self.failed == 0 and self.errors == 0
+
+    def add_failed(self, test_id: str) -> None:
+        if test_id not in self.failed_tests and len(self.failed_tests) < MAX_FAILED_TESTS:
+            self.failed_tests.append(test_id)
+
+    def to_dict(self) -> Dict[str, object]:
+        return dict(asdict(self), total=self.total, success=self.success)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "ParsedResults":
+        """Rebuild results serialised with :meth:`to_dict`."""
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+    def summary(self) -> str:
+        """Return a short human-readable summary of the results."""
+        counts = ", ".join(f"{n} {label}" for n, label in (
+            (self.passed, "passed"), (self.failed, "failed"), (self.errors, "errors"), (self.skipped, "skipped")
+        ) if n)
+        lines = [f"{self.framework}: {counts or 'no tests'}"
+                 + (f" in {self.duration:.2f}s" if self.duration is not None else "")]
+        if self.failed_tests:
+            lines.append("Failed tests:")
+            lines.extend(f"  {test_id}" for test_id in self.failed_tests)
+        return "\n".join(lines)
+
+
+Parser = Callable[[str], Optional[ParsedResults]]
+
+_PARSERS: Dict[str, Parser] = {}
+
+
+def register(name: str) -> Callable[[Parser], Parser]:
+    """Register a parser under *name*; a parser returns None if the output is not its format."""
+    def decorator(parser: Parser) -> Parser:
+        _PARSERS[name] = parser
+        return parser
+    return decorator
+
+
+def parsers() -> List[str]:
+    return list(_PARSERS)
+
+
+def parse(output: str, min_confidence: float = CONFIDENCE_THRESHOLD) -> Optional[ParsedResults]:
+    """Return the most confident parse of *output*, or None if no parser is confident enough."""
+    best: Optional[ParsedResults] = None
+    for name, parser in _PARSERS.items():
+        try:
+            result = parser(output)
+        except Exception as e:
+            logger.info(f"Result parser {name} failed: {str(e)}")
+            continue
+        if result is not None and (best is None or result.confidence > best.confidence):
+            best = result
+    if best is None or best.confidence < min_confidence:
+        return None
+    return best
+
+
+def environment_errors(output: str) -> List[str]:
+    """Return the :data:`ENVIRONMENT_ERROR_MARKERS` found in *output*."""
+    return [marker for marker in ENVIRONMENT_ERROR_MARKERS if marker in output]
+
+
+def classify(parsed: ParsedResults, output: str, exit_code: Optional[int]) -> Optional[Tuple[str, str]]:
+    """Classify a test run from its parsed summary when the outcome is unambiguous.
+
+    The runner script may run test files one at a time, so a clean summary from
+    one file says nothing about a file that died on import.  A run is therefore
+    VALID_SUCCESS only if the summary passed, the script exited with 0 and the
+    output shows no environment errors; it is VALID_FAILURE only if tests
+    failed, none errored, the script exited non-zero and the output shows no
+    environment errors.
+
+    Args:
+        parsed: Parsed results of the run
+        output: Raw test output
+        exit_code: Exit code of the test script, or None if unknown
+
+    Returns:
+        (validity, reason), or None if the run needs the LLM's judgement
+    """
+    if exit_code is None or parsed.total == 0 or environment_errors(output):
+        return None
+    if parsed.success and exit_code == 0:
+        return "VALID_SUCCESS", f"All tests passed ({parsed.passed} passed, {parsed.skipped} skipped)"
+    if parsed.failed and parsed.errors == 0 and exit_code != 0:
+        reason = f"{parsed.failed} of {parsed.total} tests failed"
+        if parsed.failed_tests:
+            reason += f": {', '.join(parsed.failed_tests[:5])}"
+        return "VALID_FAILURE", reason
+    return None
+
+
+def _add_duration(result: ParsedResults, seconds: str) -> None:
+    result.duration = (result.duration or 0.0) + float(seconds)
+
+
+# ---------------------------------
+# pytest
+# ---------------------------------
+
+_PYTEST_COUNT = re.compile(r"(\d+) (passed|failed|errors?|skipped|xfailed|xpassed|deselected|warnings?)")
+_PYTEST_SUMMARY = re.compile(
+    r"^=*\s*((?:\d+ (?:passed|failed|errors?|skipped|xfailed|xpassed|deselected|warnings?),? ?)+)"
+    r"\s+in ([\d.]+)s\b.*?=*\s*$|^=+ no tests ran in ([\d.]+)s", re.M
+)
+_PYTEST_FAILED = re.compile(r"^(FAILED|ERROR) (\S+::\S+|\S+\.py)", re.M)
+
+
+@register("pytest")
+def parse_pytest(output: str) -> Optional[ParsedResults]:
+    summaries = list(_PYTEST_SUMMARY.finditer(output))
+    if not summaries:
+        return None
+    result = ParsedResults("pytest", 0.95)
+    for match in summaries:
+        if match.group(3) is not None:
+            _add_duration(result, match.group(3))
+            continue
+        for count, label in _PYTEST_COUNT.findall(match.group(1)):
+            if label in ("passed", "xpassed"):
+                result.passed += int(count)
+            elif label == "failed":
+                result.failed += int(count)
+            elif label.startswith("error"):
+                result.errors += int(count)
+            elif label in ("skipped", "xfailed"):
+                result.skipped += int(count)
+        _add_duration(result, match.group(2))
+    for _, test_id in _PYTEST_FAILED.findall(output):
+        result.add_failed(test_id)
+    return result
+
+
+# ---------------------------------
+# unittest / nose2
+# ---------------------------------
+
+_UNITTEST_RAN = re.compile(r"^Ran (\d+) tests? in ([\d.]+)s\s*\n\s*\n?(OK|FAILED)(?: \(([^)]*)\))?", re.M)
+_UNITTEST_FAILED = re.compile(r"^(?:FAIL|ERROR): (\S+) \(([\w.]+)\)", re.M)
+
+
+@register("unittest")
+def parse_unittest(output: str) -> Optional[ParsedResults]:
+    runs = list(_UNITTEST_RAN.finditer(output))
+    if not runs:
+        return None
+    result = ParsedResults("nose2" if "nose2" in output else "unittest", 0.9)
+    for match in runs:
+        details = dict(
+            (key.strip(), int(value)) for key, value in
+            (item.split("=", 1) for item in (match.group(4) or "").split(",") if "=" in item)
+        )
+        failed, errors = details.get("failures", 0), details.get("errors", 0)
+        skipped = details.get("skipped", 0) + details.get("expected failures", 0)
+        result.failed += failed
+        result.errors += errors
+        result.skipped += skipped
+        result.passed += max(0, int(match.group(1)) - failed - errors - skipped)
+        _add_duration(result, match.group(2))
+    for name, location in _UNITTEST_FAILED.findall(output):
+        # Python 3.11+ prints the full test ID, older versions only the class
+        result.add_failed(location if location.endswith("." + name) else f"{location}.{name}")
+    return result
+
+
+# ---------------------------------
+# tox
+# ---------------------------------
+
+_TOX_ENV = re.compile(
+    r"^\s{1,4}([\w.-]+): (commands succeeded|commands failed|OK|FAIL code \d+|InvocationError)"
+    r"(?: \(([\d.]+)(?:=[^)]*)? seconds\))?", re.M
+)
+_TOX_VERDICT = re.compile(r"^\s*(congratulations :\)|evaluation failed :\()", re.M)
+
+
+@register("tox")
+def parse_tox(output: str) -> Optional[ParsedResults]:
+    if not _TOX_VERDICT.search(output):
+        return None
+    envs = _TOX_ENV.findall(output)
+    if not envs:
+        return None
+    # Only environment verdicts are known; pytest output inside tox is parsed with more confidence
+    result = ParsedResults("tox", 0.8)
+    for env, status, seconds in envs:
+        if status in ("commands succeeded", "OK"):
+            result.passed += 1
+        else:
+            result.failed += 1
+            result.add_failed(env)
+        if seconds:
+            _add_duration(result, seconds)
+    return result
+
+
+# ---------------------------------
+# Jest
+# ---------------------------------
+
+_JEST_TESTS = re.compile(r"^Tests:\s+(.*\d+ total)\s*$", re.M)
+_JEST_COUNT = re.compile(r"(\d+) (passed|failed|skipped|todo|total)")
+_JEST_TIME = re.compile(r"^Time:\s+([\d.]+)\s*(ms|s)\b", re.M)
+_JEST_FAILED = re.compile(r"^\s*● (.+?)\s*$", re.M)
+
+
+@register("jest")
+def parse_jest(output: str) -> Optional[ParsedResults]:
+    summaries = _JEST_TESTS.findall(output)
+    if not summaries:
+        return None
+    result = ParsedResults("jest", 0.95)
+    for summary in summaries:
+        for count, label in _JEST_COUNT.findall(summary):
+            if label == "passed":
+                result.passed += int(count)
+            elif label == "failed":
+                result.failed += int(count)
+            elif label in ("skipped", "todo"):
+                result.skipped += int(count)
+    for value, unit in _JEST_TIME.findall(output):
+        _add_duration(result, str(float(value) / 1000) if unit == "ms" else value)
+    for test_id in _JEST_FAILED.findall(output):
+        if " › " in test_id:
+            result.add_failed(test_id)
+    return result
+
+
+# ---------------------------------
+# Go test
+# ---------------------------------
+
+_GO_TEST = re.compile(r"^\s*--- (PASS|FAIL|SKIP): (\S+) \(([\d.]+)s\)", re.M)
+_GO_PACKAGE = re.compile(r"^(ok|FAIL)\s+(\S+)\s+(?:([\d.]+)s|\(cached\)|\[[^\]]+\])", re.M)
+
+
+@register("go")
+def parse_go(output: str) -> Optional[ParsedResults]:
+    tests = _GO_TEST.findall(output)
+    packages = _GO_PACKAGE.findall(output)
+    if not tests and not packages:
+        return None
+    if tests:
+        result = ParsedResults("go", 0.9)
+        for status, name, _ in tests:
+            # Subtests ("Parent/child") are reported as well as their parent
+            if "/" in name:
+                continue
+            if status == "PASS":
+                result.passed += 1
+            elif status == "FAIL":
+                result.failed += 1
+                result.add_failed(name)
+            else:
+                result.skipped += 1
+    else:
+        # Without -v only package verdicts are printed
+        result = ParsedResults("go", 0.8)
+        for status, package, _ in packages:
+            if status == "ok":
+                result.passed += 1
+            else:
+                result.failed += 1
+                result.add_failed(package)
+    for _, _, seconds in packages:
+        if seconds:
+            _add_duration(result, seconds)
+    return result
+
+
+# ---------------------------------
+# JUnit-style (Maven Surefire, Gradle)
+# ---------------------------------
+
+_MAVEN_TOTAL = re.compile(
+    r"^(?:\[\w+\]\s+)?Tests run: (\d+), Failures: (\d+), Errors: (\d+), Skipped: (\d+)\s*$", re.M
+)
+_MAVEN_CLASS = re.compile(
+    r"Tests run: \d+, Failures: \d+, Errors: \d+, Skipped: \d+, Time elapsed: ([\d.]+) s", re.M
+)
+_MAVEN_FAILED = re.compile(r"^(?:\[\w+\]\s+)?(\S+?)(?:\(([\w.$]+)\))?\s+Time elapsed: [\d.]+ s\s+<<< (?:FAILURE|ERROR)!", re.M)
+_GRADLE_TOTAL = re.compile(r"^(\d+) tests? completed(?:, (\d+) failed)?(?:, (\d+) skipped)?", re.M)
+_GRADLE_FAILED = re.compile(r"^([\w.$]+) > (.+?) FAILED\s*$", re.M)
+
+
+@register("junit")
+def parse_junit(output: str) -> Optional[ParsedResults]:
+    totals = _MAVEN_TOTAL.findall(output)
+    if totals:
+        # Surefire prints a total per module after the per-class lines
+        result = ParsedResults("junit", 0.9)
+        for run, failures, errors, skipped in totals:
+            result.failed += int(failures)
+            result.errors += int(errors)
+            result.skipped += int(skipped)
+            result.passed += max(0, int(run) - int(failures) - int(errors) - int(skipped))
+        for seconds in _MAVEN_CLASS.findall(output):
+            _add_duration(result, seconds)
+        for method, cls in _MAVEN_FAILED.findall(output):
+            result.add_failed(f"{cls}.{method}" if cls else method)
+        return result
+
+    totals = _GRADLE_TOTAL.findall(output)
+    if totals:
+        result = ParsedResults("junit", 0.9)
+        for completed, failed, skipped in totals:
+            failed, skipped = int(failed or 0), int(skipped or 0)
+            result.failed += failed
+            result.skipped += skipped
+            result.passed += max(0, int(completed) - failed - skipped)
+        for cls, method in _GRADLE_FAILED.findall(output):
+            result.add_failed(f"{cls}.{method}")
+        return result
+    return None
@@ -0,0 +1,135 @@
+"""runner_image.py
+
+Builds and caches the pre-baked runner image used for test containers.
+
+Every repository run used to start from ``python:3.13-alpine`` and then spend
+minutes on ``apk update``, build toolchain packages and ``pip install
+anthropic``.  Those layers are now baked once into a local image whose tag is
+derived from a content hash of the toolchain spec (``eval-agents-runner:<hash>``),
+so the image is only rebuilt when :data:`RUNNER_IMAGE_SPEC` changes.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import os
+import shlex
+import threading
+from typing import Any, Dict, Optional
+
+import docker
+
+from eval_agents.core.docker_backend import get_docker_client
+
+logger = logging.getLogger(__name__)
+
+# Base image the runner image is built from
+BASE_IMAGE = os.getenv("EVAL_AGENTS_DOCKER_IMAGE", "python:3.13-alpine")
+
+# Repository name for the locally built runner images
+RUNNER_IMAGE_REPOSITORY = os.getenv("EVAL_AGENTS_RUNNER_IMAGE_REPO", "eval-agents-runner")
+
+# Set to 0 to skip the runner image and use BASE_IMAGE directly
+USE_RUNNER_IMAGE = os.getenv("EVAL_AGENTS_USE_RUNNER_IMAGE", "1") != "0"
+
+# Toolchain baked into the runner image.  Any change here produces a new tag.
+RUNNER_IMAGE_SPEC: Dict[str, Any] = {
+    "base_image": BASE_IMAGE,
+    "apk_packages": ["git", "gcc", "musl-dev", "python3-dev", "libffi-dev", "openssl-dev"],
+    "pip_packages": ["anthropic"],
+}
+
+_DOCKERFILE_TEMPLATE = """\
+FROM {base_image}
+RUN apk add --no-cache {apk_packages}
+RUN pip install --no-cache-dir {pip_packages}
+RUN git config --system --add safe.directory '*'
+LABEL eval_agents.runner_spec="{spec_hash}"
+WORKDIR /workspace
+"""
+
+_built: Dict[str, str] = {}
+_build_lock = threading.Lock()
+
+
+def spec_hash(spec: Optional[Dict[str, Any]] = None) -> str:
+    """Return a short content hash of a runner image spec."""
+    spec = spec or RUNNER_IMAGE_SPEC
+    payload = json.dumps({"spec": spec, "template": _DOCKERFILE_TEMPLATE}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def runner_image_tag(spec: Optional[Dict[str, Any]] = None) -> str:
+    """Return the image tag for a runner image spec."""
+    return f"{RUNNER_IMAGE_REPOSITORY}:{spec_hash(spec)}"
+
+
+def render_dockerfile(spec: Optional[Dict[str, Any]] = None) -> str:
+    """Render the Dockerfile for a runner image spec."""
+    spec = spec or RUNNER_IMAGE_SPEC
+    return _DOCKERFILE_TEMPLATE.format(
+        base_image=spec["base_image"],
+        apk_packages=" ".join(shlex.quote(p) for p in spec["apk_packages"]),
+        pip_packages=" ".join(shlex.quote(p) for p in spec["pip_packages"]),
+        spec_hash=spec_hash(spec),
+    )
+
+
+def remote_build_command(spec: Optional[Dict[str, Any]] = None) -> str:
+    """Shell command that builds the runner image on a remote Docker host if missing."""
+    tag = runner_image_tag(spec)
+    dockerfile = shlex.quote(render_dockerfile(spec))
+    return (
+        f"docker image inspect {tag} >/dev/null 2>&1 || "
+        f"printf '%s' {dockerfile} | docker build -q -t {tag} -"
+    )
+
+
+def ensure_runner_image(client=None, spec: Optional[Dict[str, Any]] = None) -> str:
+    """Return the runner image tag, building the image first if necessary.
+
+    Builds happen at most once per spec and process; concurrent callers wait
+    for the first build.  If the build fails the plain base image is returned
+    so callers can still fall back to installing the toolchain at runtime.
+
+    Args:
+        client: Docker client to use (defaults to the shared client)
+        spec: Runner image spec (defaults to :data:`RUNNER_IMAGE_SPEC`)
+
+    Returns:
+        Image reference to start containers from
+    """
+    spec = spec or RUNNER_IMAGE_SPEC
+    if not USE_RUNNER_IMAGE:
+        return spec["base_image"]
+
+    tag = runner_image_tag(spec)
+    if tag in _built:
+        return _built[tag]
+
+    with _build_lock:
+        if tag in _built:
+            return _built[tag]
+
+        try:
+            client = client or get_docker_client()
+            try:
+                client.images.get(tag)
+                logger.info(f"Using cached runner image {tag}")
+            except docker.errors.ImageNotFound:
+                logger.info(f"Building runner image {tag} from {spec['base_image']}...")
+                client.images.build(
+                    fileobj=io.BytesIO(render_dockerfile(spec).encode("utf-8")),
+                    tag=tag,
+                    rm=True,
+                    pull=True,
+                )
+                logger.info(f"Built runner image {tag}")
+            _built[tag] = tag
+        except Exception as e:
+            logger.info(f"Error building runner image {tag}, falling back to {spec['base_image']}: {str(e)}")
+            _built[tag] = spec["base_image"]
+
+        return _built[tag]
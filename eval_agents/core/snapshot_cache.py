@@ -0,0 +1,201 @@
+"""snapshot_cache.py
+
+Docker image snapshots of containers with a repository's dependencies installed.
+
+Installing a repository's dependencies is the slowest phase of a test run,
+and its result is thrown away with the container.  After a successful
+install the container is ``docker commit``-ed to an image tagged with a key
+derived from:
+
+* the image the container was started from, and
+* the contents of the repository's dependency files (``requirements*.txt``,
+  ``pyproject.toml``, ``setup.py``/``setup.cfg``, ``Pipfile``, lockfiles ...).
+
+The next run of a repository with the same key starts from that image and
+skips the install.  Only the container filesystem is committed; the
+``/workspace`` bind mount (and so the repository itself) is not part of a
+snapshot.  Lines exporting ``ANTHROPIC_API_KEY`` are removed from the login
+profiles before committing so the key never ends up in an image.
+
+Snapshots are tracked in a JSON index and evicted least recently used first
+once their combined size (on top of the base image) exceeds
+:data:`SNAPSHOT_MAX_BYTES`.
+"""
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import tempfile
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from eval_agents.core import repo_scanner
+from eval_agents.core.docker_backend import get_docker_client
+from eval_agents.core.utils import file_lock
+
+logger = logging.getLogger(__name__)
+
+# Set EVAL_AGENTS_SNAPSHOTS=0 to disable snapshots
+SNAPSHOTS_ENABLED = os.getenv("EVAL_AGENTS_SNAPSHOTS", "1") != "0"
+
+# Image repository snapshots are tagged into
+SNAPSHOT_REPOSITORY = os.getenv("EVAL_AGENTS_SNAPSHOT_REPOSITORY", "eval-agents-snapshot")
+
+# Maximum disk usage of all snapshots, beyond their base images
+SNAPSHOT_MAX_BYTES = int(float(os.getenv("EVAL_AGENTS_SNAPSHOT_MAX_GB", "20")) * 1024 ** 3)
+
+# Index of snapshots (key -> image, size, timestamps)
+SNAPSHOT_INDEX = os.getenv(
+    "EVAL_AGENTS_SNAPSHOT_INDEX",
+    os.path.join(os.path.expanduser("~"), ".cache", "eval_agents", "snapshots.json"),
+)
+
+# Bump to invalidate every existing snapshot
+_KEY_VERSION = "2"
+
+# Files that determine the installed dependencies, relative to the repository root
+DEPENDENCY_FILE_PATTERNS = (
+    "requirements*.txt", "requirements/*.txt", "*requirements.txt",
+    "pyproject.toml", "setup.py", "setup.cfg",
+    "Pipfile", "Pipfile.lock", "poetry.lock", "pdm.lock", "uv.lock",
+    "environment.yml", "environment.yaml", "constraints*.txt",
+)
+
+# Removes the exported API key from the login profiles
+SCRUB_API_KEY_SCRIPT = "sed -i '/ANTHROPIC_API_KEY/d' /root/.profile /etc/profile 2>/dev/null; true"
+
+# Run before a commit: no API key, and no repository manifest left for the scanner
+# to pick up in containers started from the snapshot
+_SCRUB_SCRIPT = f"{SCRUB_API_KEY_SCRIPT}; rm -f {repo_scanner.MANIFEST_PATH}"
+
+
+def dependency_files(paths: Iterable[str]) -> List[str]:
+    """Return the dependency files among repository-relative *paths*, sorted."""
+    return sorted(
+        p for p in paths
+        if any(fnmatch.fnmatch(p, pattern) for pattern in DEPENDENCY_FILE_PATTERNS)
+        and (posixpath.dirname(p) in ("", "requirements"))
+    )
+
+
+def snapshot_key(base_image: str, files: Dict[str, bytes]) -> str:
+    """Return the snapshot key for a base image ID and dependency file contents."""
+    digest = hashlib.sha256(f"v{_KEY_VERSION}\0{base_image}\0".encode("utf-8"))
+    for path in sorted(files):
+        content = files[path]
+        digest.update(f"{path}\0{len(content)}\0".encode("utf-8"))
+        digest.update(content)
+    return digest.hexdigest()
+
+
+class SnapshotCache:
+    """Commits containers to images keyed by dependency state, with LRU eviction by size."""
+
+    def __init__(self, client=None, index_path: str = SNAPSHOT_INDEX,
+                 max_bytes: int = SNAPSHOT_MAX_BYTES, repository: str = SNAPSHOT_REPOSITORY):
+        self._client = client
+        self.index_path = index_path
+        self.max_bytes = max_bytes
+        self.repository = repository
+
+    @property
+    def client(self):
+        return self._client or get_docker_client()
+
+    def _tag(self, key: str) -> str:
+        return f"{self.repository}:{key[:32]}"
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, index: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the snapshot image for *key* and mark it used, or None."""
+        with file_lock(self.index_path):
+            index = self._load()
+            entry = index.get(key)
+            if entry is None:
+                return None
+            try:
+                self.client.images.get(entry["image"])
+            except Exception:
+                # Removed outside of the cache (e.g. docker image prune)
+                index.pop(key)
+                self._save(index)
+                return None
+            entry["last_used"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+            self._save(index)
+        logger.info(f"Using dependency snapshot {entry['image']}")
+        return entry["image"]
+
+    def save(self, container, key: str) -> Optional[str]:
+        """Commit *container* as the snapshot for *key*.
+
+        Returns:
+            The snapshot image tag, or None if committing failed
+        """
+        tag = self._tag(key)
+        try:
+            container.exec_run(["sh", "-c", _SCRUB_SCRIPT])
+            repository, _, image_tag = tag.partition(":")
+            image = container.commit(repository=repository, tag=image_tag,
+                                     message="eval_agents dependency snapshot")
+            base = self.client.images.get(container.attrs["Image"])
+            size = max(0, image.attrs.get("Size", 0) - base.attrs.get("Size", 0))
+        except Exception as e:
+            logger.info(f"Error committing dependency snapshot: {str(e)}")
+            return None
+
+        now = time.time()
+        with file_lock(self.index_path):
+            index = self._load()
+            index[key] = {"image": tag, "size": size, "created": now, "last_used": now, "hits": 0}
+            self._save(index)
+        logger.info(f"Saved dependency snapshot {tag} ({size / 1024 ** 2:.0f} MB)")
+        self.evict()
+        return tag
+
+    def evict(self) -> int:
+        """Remove least recently used snapshots until their total size fits the limit.
+
+        Returns:
+            Number of snapshots removed
+        """
+        removed = 0
+        with file_lock(self.index_path):
+            index = self._load()
+            total = sum(entry.get("size", 0) for entry in index.values())
+            for key in sorted(index, key=lambda k: index[k].get("last_used", 0)):
+                if total <= self.max_bytes:
+                    break
+                entry = index.pop(key)
+                try:
+                    self.client.images.remove(entry["image"], force=True)
+                except Exception as e:
+                    logger.info(f"Error removing snapshot {entry['image']}: {str(e)}")
+                total -= entry.get("size", 0)
+                removed += 1
+            if removed:
+                self._save(index)
+        if removed:
+            logger.info(f"Evicted {removed} dependency snapshots")
+        return removed
+
+
+# Shared cache; None when snapshots are disabled
+cache: Optional[SnapshotCache] = SnapshotCache() if SNAPSHOTS_ENABLED else None
@@ -0,0 +1,179 @@
+"""stream_exec.py
+
+Streaming command execution in containers with bounded output capture.
+
+``container.exec_run`` buffers a command's entire output in memory and
+returns nothing until it exits; a test suite that prints hundreds of MB of
+logs can push a worker out of memory.  :func:`stream_exec` starts the exec
+with the low-level API, reads stdout and stderr separately as they arrive and
+feeds each into an :class:`OutputCapture`:
+
+* the first half of the byte cap is kept in a spooled temporary file (in
+  memory up to :data:`EXEC_SPOOL_BYTES`, on disk beyond that),
+* the last half is kept in a rolling tail buffer,
+* everything in between is counted and dropped, so the text returned is
+  ``head + "[... N bytes omitted ...]" + tail``.
+
+An optional progress callback receives an :class:`ExecProgress` at most every
+:data:`EXEC_PROGRESS_INTERVAL` seconds while the command runs.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bytes of output retained per stream (head + tail)
+EXEC_MAX_BYTES = int(float(os.getenv("EVAL_AGENTS_EXEC_MAX_MB", "4")) * 1024 * 1024)
+
+# Head bytes kept in memory before the spool file rolls over to disk
+EXEC_SPOOL_BYTES = int(float(os.getenv("EVAL_AGENTS_EXEC_SPOOL_MB", "1")) * 1024 * 1024)
+
+# Minimum number of seconds between progress callbacks
+EXEC_PROGRESS_INTERVAL = float(os.getenv("EVAL_AGENTS_EXEC_PROGRESS_SECONDS", "30"))
+
+
+class OutputCapture:
+    """Keeps the head and tail of a byte stream within a fixed budget."""
+
+    def __init__(self, max_bytes: int = EXEC_MAX_BYTES, spool_bytes: int = EXEC_SPOOL_BYTES):
+        self.head_limit = max_bytes // 2
+        self.tail_limit = max_bytes - self.head_limit
+        self._head = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self._head_size = 0
+        self._tail = bytearray()
+        self.total = 0
+
+    def write(self, data: bytes) -> None:
+        self.total += len(data)
+        room = self.head_limit - self._head_size
+        if room > 0:
+            self._head.write(data[:room])
+            self._head_size += min(room, len(data))
+            data = data[room:]
+        if data:
+            self._tail += data
+            if len(self._tail) > self.tail_limit:
+                del self._tail[:len(self._tail) - self.tail_limit]
+
+    @property
+    def omitted(self) -> int:
+        """Number of bytes dropped between head and tail."""
+        return self.total - self._head_size - len(self._tail)
+
+    def getvalue(self) -> str:
+        """Return the retained output as text, marking any omitted middle part."""
+        self._head.seek(0)
+        head = self._head.read()
+        self._head.seek(0, os.SEEK_END)
+        if self.omitted:
+            marker = f"\n[... {self.omitted} bytes omitted ...]\n".encode("utf-8")
+            return (head + marker + bytes(self._tail)).decode("utf-8", errors="replace")
+        return (head + bytes(self._tail)).decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        self._head.close()
+
+
+class ExecProgress(NamedTuple):
+    elapsed: float
+    stdout_bytes: int
+    stderr_bytes: int
+    last_line: str
+
+
+class StreamResult(NamedTuple):
+    exit_code: int
+    stdout: str
+    stderr: str
+    stdout_bytes: int
+    stderr_bytes: int
+    truncated: bool
+    duration: float
+
+    @property
+    def output(self) -> str:
+        """stdout followed by stderr, like the combined output of ``exec_run``."""
+        if self.stdout and self.stderr:
+            return f"{self.stdout}\n{self.stderr}"
+        return self.stdout or self.stderr
+
+
+def _last_line(data: bytes) -> Optional[str]:
+    lines = data.decode("utf-8", errors="replace").strip().splitlines()
+    return lines[-1][:200] if lines else None
+
+
+def log_progress(label: str) -> Callable[[ExecProgress], None]:
+    """Return a progress callback that logs under *label*."""
+    def callback(progress: ExecProgress) -> None:
+        logger.info(
+            f"{label}: {progress.elapsed:.0f}s, {progress.stdout_bytes + progress.stderr_bytes} bytes of output"
+            + (f" | {progress.last_line}" if progress.last_line else "")
+        )
+    return callback
+
+
+def stream_exec(container, cmd: Union[str, List[str]], environment: Optional[Dict[str, str]] = None,
+                workdir: Optional[str] = None, max_bytes: int = EXEC_MAX_BYTES,
+                progress: Optional[Callable[[ExecProgress], None]] = None,
+                progress_interval: float = EXEC_PROGRESS_INTERVAL) -> StreamResult:
+    """Run *cmd* in *container*, streaming its output into bounded captures.
+
+    Args:
+        container: Docker SDK container object
+        cmd: Command to run; a string is run through ``sh -c``
+        environment: Extra environment variables
+        workdir: Working directory inside the container
+        max_bytes: Bytes retained per stream (head + tail)
+        progress: Called with an :class:`ExecProgress` while the command runs
+        progress_interval: Minimum seconds between progress calls
+
+    Returns:
+        The exit code and the retained stdout/stderr
+    """
+    if isinstance(cmd, str):
+        cmd = ["sh", "-c", cmd]
+    api = container.client.api
+    stdout, stderr = OutputCapture(max_bytes), OutputCapture(max_bytes)
+    start = time.monotonic()
+    next_report = start + progress_interval
+    last_line = ""
+    try:
+        exec_id = api.exec_create(container.id, cmd, stdout=True, stderr=True,
+                                  environment=environment, workdir=workdir)["Id"]
+        for out_chunk, err_chunk in api.exec_start(exec_id, stream=True, demux=True):
+            if out_chunk:
+                stdout.write(out_chunk)
+                last_line = _last_line(out_chunk) or last_line
+            if err_chunk:
+                stderr.write(err_chunk)
+                last_line = _last_line(err_chunk) or last_line
+            now = time.monotonic()
+            if progress is not None and now >= next_report:
+                next_report = now + progress_interval
+                try:
+                    progress(ExecProgress(now - start, stdout.total, stderr.total, last_line))
+                except Exception as e:
+                    logger.info(f"Error in exec progress callback: {str(e)}")
+        exit_code = api.exec_inspect(exec_id).get("ExitCode")
+        truncated = bool(stdout.omitted or stderr.omitted)
+        if truncated:
+            logger.info(f"Truncated exec output to {max_bytes} bytes per stream "
+                        f"(stdout {stdout.total}, stderr {stderr.total} bytes)")
+        return StreamResult(
+            exit_code if exit_code is not None else -1,
+            stdout.getvalue(),
+            stderr.getvalue(),
+            stdout.total,
+            stderr.total,
+            truncated,
+            time.monotonic() - start,
+        )
+    finally:
+        stdout.close()
+        stderr.close()
@@ -0,0 +1,326 @@
+"""telemetry.py
+
+Per-repository, per-stage tracing and process metrics.
+
+* :func:`span` times a block (wall clock and thread CPU time) and tags it
+  with the repository set by :func:`repo_context`.  Finished spans are
+  appended as JSON lines to :data:`TRACE_FILE` and feed the
+  ``eval_agents_stage_duration_seconds`` histogram.
+* :func:`record_llm` counts Claude requests, tokens and latency;
+  :func:`instrument_docker_client` counts Docker exec and archive calls made
+  through the shared SDK client.
+* :func:`render_prometheus` renders every metric in the Prometheus text
+  exposition format.  Metrics are written to :data:`METRICS_FILE` (for a
+  node-exporter textfile collector) by :func:`write_metrics`, and served over
+  HTTP on :data:`METRICS_PORT` when :func:`start_metrics_server` is called.
+
+The current repository and span are kept in context variables, so nested
+spans and concurrent repositories in worker threads do not mix.
+"""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+_TELEMETRY_DIR = os.path.join(os.path.expanduser("~"), ".cache", "eval_agents", "telemetry")
+
+# JSONL span log; set EVAL_AGENTS_TRACE_FILE=0 to disable
+TRACE_FILE = os.getenv("EVAL_AGENTS_TRACE_FILE", os.path.join(_TELEMETRY_DIR, "spans.jsonl"))
+
+# Prometheus textfile output; set EVAL_AGENTS_METRICS_FILE=0 to disable
+METRICS_FILE = os.getenv("EVAL_AGENTS_METRICS_FILE", os.path.join(_TELEMETRY_DIR, "eval_agents.prom"))
+
+# Port of the /metrics endpoint; 0 keeps it off
+METRICS_PORT = int(os.getenv("EVAL_AGENTS_METRICS_PORT", "0"))
+
+# Histogram buckets (seconds): LLM calls and Docker execs up to long stages
+_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+_repo: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("eval_agents_repo", default=None)
+_current_span: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("eval_agents_span", default=None)
+
+Labels = Tuple[Tuple[str, str], ...]
+T = TypeVar("T")
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and labels."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels: Any) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels: Any) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(key, _Histogram()).observe(value)
+            if help:
+                self._help.setdefault(name, help)
+
+    def histogram_totals(self, name: str) -> Dict[Labels, Tuple[int, float]]:
+        """Return (count, sum) per label set of histogram *name*."""
+        with self._lock:
+            return {k: (h.count, h.sum) for k, h in self._histograms.get(name, {}).items()}
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        def fmt(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+            items = list(labels) + ([extra] if extra else [])
+            if not items:
+                return ""
+            escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{fmt(labels)} {value:g}")
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(list(_BUCKETS) + ["+Inf"], hist.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else f"{bound:g}"
+                        lines.append(f"{name}_bucket{fmt(labels, ('le', le))} {cumulative}")
+                    lines.append(f"{name}_sum{fmt(labels)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{fmt(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+_trace_lock = threading.Lock()
+
+
+def _write_span(record: Dict[str, Any]) -> None:
+    if not TRACE_FILE or TRACE_FILE == "0":
+        return
+    try:
+        line = json.dumps(record, default=str)
+        with _trace_lock:
+            os.makedirs(os.path.dirname(TRACE_FILE) or ".", exist_ok=True)
+            with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.info(f"Error writing trace span: {str(e)}")
+
+
+@contextmanager
+def repo_context(repo_url: Optional[str]) -> Iterator[None]:
+    """Attribute spans recorded inside the block to *repo_url*."""
+    token = _repo.set(repo_url)
+    try:
+        yield
+    finally:
+        _repo.reset(token)
+
+
+@contextmanager
+def span(stage: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """Time a pipeline stage.
+
+    Yields a dictionary that the block may add attributes to; it is written
+    with the span.  Exceptions propagate and mark the span as ``error``.
+
+    Args:
+        stage: Stage name, e.g. ``clone`` or ``install_dependencies``
+        **attributes: Extra attributes recorded with the span
+    """
+    span_id = uuid.uuid4().hex[:16]
+    parent = _current_span.get()
+    token = _current_span.set(span_id)
+    start_wall = time.time()
+    start = time.monotonic()
+    start_cpu = time.thread_time()
+    status = "ok"
+    try:
+        yield attributes
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _current_span.reset(token)
+        duration = time.monotonic() - start
+        record = {
+            "span_id": span_id,
+            "parent_id": parent,
+            "repo": _repo.get(),
+            "stage": stage,
+            "status": status,
+            "start": start_wall,
+            "duration": round(duration, 6),
+            "cpu_seconds": round(time.thread_time() - start_cpu, 6),
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+        }
+        if attributes:
+            record["attributes"] = attributes
+        _write_span(record)
+        registry.observe("eval_agents_stage_duration_seconds", duration,
+                         help="Wall-clock duration of pipeline stages", stage=stage)
+        registry.inc("eval_agents_stage_total", help="Pipeline stages by outcome", stage=stage, status=status)
+
+
+def traced(stage: str, repo_url: Optional[str], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call ``fn(*args, **kwargs)`` in a :func:`span` attributed to *repo_url*.
+
+    Context variables are not inherited by pool threads; submit this instead
+    of *fn* to trace work done for a repository on an executor.
+    """
+    with repo_context(repo_url), span(stage):
+        return fn(*args, **kwargs)
+
+
+def record_llm(model: str, latency: float, input_tokens: int = 0, output_tokens: int = 0,
+               cached: bool = False) -> None:
+    """Record one Claude request (or cache hit)."""
+    registry.inc("eval_agents_llm_requests_total", help="Claude requests, including cache hits",
+                 model=model, cached=str(cached).lower())
+    if not cached:
+        registry.observe("eval_agents_llm_latency_seconds", latency, help="Claude API latency", model=model)
+        registry.inc("eval_agents_llm_tokens_total", input_tokens, help="Claude tokens used",
+                     model=model, direction="input")
+        registry.inc("eval_agents_llm_tokens_total", output_tokens, model=model, direction="output")
+
+
+def record_docker(operation: str, seconds: Optional[float] = None, backend: str = "docker-sdk") -> None:
+    """Record one Docker operation (``exec``, ``put_archive`` ...)."""
+    registry.inc("eval_agents_docker_operations_total", help="Docker API operations",
+                 operation=operation, backend=backend)
+    if seconds is not None:
+        registry.observe("eval_agents_docker_operation_seconds", seconds,
+                         help="Duration of non-streaming Docker operations", operation=operation, backend=backend)
+
+
+def instrument_docker_client(client) -> None:
+    """Count exec and archive calls made through a Docker SDK client."""
+    api = client.api
+    if getattr(api, "_eval_agents_instrumented", False):
+        return
+
+    def wrap(operation: str, method):
+        def wrapper(*args, **kwargs):
+            if kwargs.get("stream"):
+                record_docker(operation)
+                return method(*args, **kwargs)
+            start = time.monotonic()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record_docker(operation, time.monotonic() - start)
+        return wrapper
+
+    api.exec_start = wrap("exec", api.exec_start)
+    api.put_archive = wrap("put_archive", api.put_archive)
+    api.get_archive = wrap("get_archive", api.get_archive)
+    api._eval_agents_instrumented = True
+
+
+def render_prometheus() -> str:
+    return registry.render()
+
+
+def write_metrics(path: Optional[str] = None) -> None:
+    """Atomically write the metrics to *path* (default :data:`METRICS_FILE`)."""
+    path = path or METRICS_FILE
+    if not path or path == "0":
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(render_prometheus())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.info(f"Error writing metrics file {path}: {str(e)}")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """Serve ``/metrics`` on *port* in a daemon thread (once per process); 0 disables it."""
+    global _server
+    if not port or _server is not None:
+        return _server
+    try:
+        _server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    except OSError as e:
+        logger.info(f"Could not start metrics server on port {port}: {str(e)}")
+        return None
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on :{port}/metrics")
+    return _server
+
+
+def log_summary() -> None:
+    """Log total time per stage, longest first."""
+    totals = registry.histogram_totals("eval_agents_stage_duration_seconds")
+    if not totals:
+        return
+    rows = sorted(((dict(labels).get("stage", ""), count, total) for labels, (count, total) in totals.items()),
+                  key=lambda row: -row[2])
+    logger.info("Stage timings: " + ", ".join(
+        f"{stage} {total:.1f}s/{count} (avg {total / count:.1f}s)" for stage, count, total in rows
+    ))
@@ -1,16 +1,22 @@
 """
 This module provides shared functionality used across multiple agents:
-- Database operations (PostgreSQL)
+- Database operations (PostgreSQL, via a process-wide connection pool)
 - Command execution wrappers
 - Path and file utilities
 """
 
 import os
+import json
+import fcntl
+import threading
 import subprocess
+from contextlib import contextmanager
 import psycopg2
 from psycopg2 import sql
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from typing import Any, Dict, List, Optional, Tuple, Union
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -23,21 +29,17 @@ DEFAULT_DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
 DEFAULT_DB_HOST = os.getenv("POSTGRES_HOST", "localhost")
 DEFAULT_DB_PORT = os.getenv("POSTGRES_PORT", "5432")
 
+# Connection pool sizing (per database, per process)
+DB_POOL_MIN = int(os.getenv("EVAL_AGENTS_DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("EVAL_AGENTS_DB_POOL_MAX", "20"))
+
 
 # ---------------------------------
 # Database utilities
 # ---------------------------------
 
-def get_db_connection(db_name: str = DEFAULT_DB_NAME):
-    """Get a connection to the PostgreSQL database.
-    
-    Args:
-        db_name: Name of the database to connect to
-        
-    Returns:
-        PostgreSQL database connection
-    """
-    # Build connection parameters
+def _connection_params(db_name: str) -> Dict[str, str]:
+    """Build psycopg2 connection parameters for *db_name*."""
     conn_params = {
         "dbname": db_name,
         "user": DEFAULT_DB_USER,
@@ -49,32 +51,193 @@ def get_db_connection(db_name: str = DEFAULT_DB_NAME):
     if DEFAULT_DB_PASSWORD:
         conn_params["password"] = DEFAULT_DB_PASSWORD
     
+    return conn_params
+
+
+def _create_database_if_missing(db_name: str) -> None:
+    """Create *db_name* by connecting to the default ``postgres`` database."""
+    postgres_params = _connection_params("postgres")
+        
+    conn = psycopg2.connect(**postgres_params)
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    cursor = conn.cursor()
+    
+    # Check if database exists
+    cursor.execute("SELECT 1 FROM pg_catalog.pg_database WHERE datname = %s", (db_name,))
+    exists = cursor.fetchone()
+    
+    if not exists:
+        # Create database
+        cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(db_name)))
+    
+    cursor.close()
+    conn.close()
+
+
+def get_db_connection(db_name: str = DEFAULT_DB_NAME):
+    """Get a dedicated (unpooled) connection to the PostgreSQL database.
+    
+    Prefer :func:`db_connection` in long-running code; this function is kept
+    for one-off scripts that manage the connection themselves.
+    
+    Args:
+        db_name: Name of the database to connect to
+        
+    Returns:
+        PostgreSQL database connection
+    """
+    conn_params = _connection_params(db_name)
+
     try:
         conn = psycopg2.connect(**conn_params)
         return conn
     except psycopg2.OperationalError:
-        # Database might not exist yet, connect to default postgres database
-        postgres_params = conn_params.copy()
-        postgres_params["dbname"] = "postgres"
-        
-        conn = psycopg2.connect(**postgres_params)
-        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
-        cursor = conn.cursor()
-        
-        # Check if database exists
-        cursor.execute("SELECT 1 FROM pg_catalog.pg_database WHERE datname = %s", (db_name,))
-        exists = cursor.fetchone()
-        
-        if not exists:
-            # Create database
-            cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(db_name)))
-        
-        cursor.close()
-        conn.close()
+        # Database might not exist yet
+        _create_database_if_missing(db_name)
         
         # Connect to the newly created database
         return psycopg2.connect(**conn_params)
 
+
+class _BlockingPool:
+    """ThreadedConnectionPool that blocks instead of raising when exhausted."""
+
+    def __init__(self, db_name: str, minconn: int, maxconn: int):
+        params = _connection_params(db_name)
+        try:
+            self._pool = ThreadedConnectionPool(minconn, maxconn, **params)
+        except psycopg2.OperationalError:
+            # Database might not exist yet
+            _create_database_if_missing(db_name)
+            self._pool = ThreadedConnectionPool(minconn, maxconn, **params)
+        self._slots = threading.BoundedSemaphore(maxconn)
+
+    def getconn(self):
+        self._slots.acquire()
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                # Server closed the connection while it sat idle – replace it
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, close: bool = False) -> None:
+        try:
+            self._pool.putconn(conn, close=close or bool(conn.closed))
+        finally:
+            self._slots.release()
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+
+_db_pools: Dict[str, _BlockingPool] = {}
+_db_pools_lock = threading.Lock()
+
+
+def _get_db_pool(db_name: str) -> _BlockingPool:
+    """Return the process-wide connection pool for *db_name*, creating it lazily."""
+    pool = _db_pools.get(db_name)
+    if pool is None:
+        with _db_pools_lock:
+            pool = _db_pools.get(db_name)
+            if pool is None:
+                pool = _BlockingPool(db_name, DB_POOL_MIN, max(DB_POOL_MIN, DB_POOL_MAX))
+                _db_pools[db_name] = pool
+    return pool
+
+
+@contextmanager
+def db_connection(db_name: str = DEFAULT_DB_NAME) -> Iterator[Any]:
+    """Borrow a connection from the process-wide pool.
+
+    The transaction is committed when the block exits normally and rolled back
+    if it raises; either way the connection goes back to the pool.  Connections
+    that failed at the network level are discarded instead of being reused.
+    Safe to use from multiple threads.
+
+    Args:
+        db_name: Name of the database
+
+    Yields:
+        PostgreSQL database connection
+    """
+    pool = _get_db_pool(db_name)
+    conn = pool.getconn()
+    discard = False
+    try:
+        yield conn
+        conn.commit()
+        _commit_columns(conn, committed=True)
+    except Exception as e:
+        _commit_columns(conn, committed=False)
+        discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        try:
+            conn.rollback()
+        except Exception:
+            discard = True
+        raise
+    finally:
+        pool.putconn(conn, close=discard)
+
+
+def close_db_pools() -> None:
+    """Close every pooled connection (e.g. before forking or at shutdown)."""
+    with _db_pools_lock:
+        for pool in _db_pools.values():
+            pool.closeall()
+        _db_pools.clear()
+
+
+# Columns known to exist, so the information_schema lookup runs once per process
+_known_columns = set()
+
+# Columns seen by transactions still in progress, by id() of their connection;
+# only cached once the transaction commits, since a rollback undoes the ALTER TABLE
+_pending_columns = {}
+_columns_lock = threading.Lock()
+
+
+def _commit_columns(conn, committed: bool) -> None:
+    with _columns_lock:
+        pending = _pending_columns.pop(id(conn), set())
+        if committed:
+            _known_columns.update(pending)
+
+
+def ensure_column(cursor, db_name: str, column: str, definition: str) -> None:
+    """Add ``repositories.<column>`` if it does not exist yet.
+
+    Args:
+        cursor: Cursor of a pooled connection
+        db_name: Name of the database (part of the cache key)
+        column: Column name
+        definition: SQL type and default, e.g. ``"TEXT DEFAULT NULL"``
+    """
+    if (db_name, column) in _known_columns:
+        return
+
+    cursor.execute("""
+    SELECT column_name
+    FROM information_schema.columns
+    WHERE table_name = 'repositories' AND column_name = %s
+    """, (column,))
+
+    if not cursor.fetchone():
+        cursor.execute(
+            sql.SQL("ALTER TABLE repositories ADD COLUMN IF NOT EXISTS {} " + definition).format(
+                sql.Identifier(column)
+            )
+        )
+
+    with _columns_lock:
+        _pending_columns.setdefault(id(cursor.connection), set()).add((db_name, column))
+
+
 def init_db(db_name: str = DEFAULT_DB_NAME) -> None:
     """Initialize the PostgreSQL database with required tables if they don't exist.
     
@@ -82,22 +245,20 @@ def init_db(db_name: str = DEFAULT_DB_NAME) -> None:
         db_name: Name of the database to create or connect to
     """
     os.makedirs("data/repos", exist_ok=True)
-    conn = get_db_connection(db_name)
-    cursor = conn.cursor()
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS repositories (
-        id SERIAL PRIMARY KEY,
-        repo_url TEXT UNIQUE NOT NULL,
-        language TEXT NOT NULL,
-        test_results BOOLEAN DEFAULT FALSE,
-        validation_results BOOLEAN DEFAULT NULL,
-        validation_explanation TEXT DEFAULT NULL,
-        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with db_connection(db_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS repositories (
+            id SERIAL PRIMARY KEY,
+            repo_url TEXT UNIQUE NOT NULL,
+            language TEXT NOT NULL,
+            test_results BOOLEAN DEFAULT FALSE,
+            validation_results BOOLEAN DEFAULT NULL,
+            validation_explanation TEXT DEFAULT NULL,
+            added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        cursor.close()
 
 
 def is_repo_in_db(repo_url: str, db_name: str = DEFAULT_DB_NAME) -> bool:
@@ -111,17 +272,16 @@ def is_repo_in_db(repo_url: str, db_name: str = DEFAULT_DB_NAME) -> bool:
         True if the repository exists, False otherwise
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT COUNT(*) FROM repositories WHERE repo_url = %s", 
-            (repo_url,)
-        )
-        count = cursor.fetchone()[0]
-        
-        cursor.close()
-        conn.close()
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                "SELECT COUNT(*) FROM repositories WHERE repo_url = %s", 
+                (repo_url,)
+            )
+            count = cursor.fetchone()[0]
+            
+            cursor.close()
         return count > 0
     except psycopg2.errors.UndefinedTable:
         # Table doesn't exist yet
@@ -141,23 +301,15 @@ def add_repo_to_db(repo_url: str, language: str, db_name: str = DEFAULT_DB_NAME)
         True if the repository was added, False if it already exists
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        try:
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO repositories (repo_url, language) VALUES (%s, %s)",
+                "INSERT INTO repositories (repo_url, language) VALUES (%s, %s) "
+                "ON CONFLICT (repo_url) DO NOTHING",
                 (repo_url, language)
             )
-            conn.commit()
             success = cursor.rowcount > 0
-        except psycopg2.errors.UniqueViolation:
-            # Repository already exists
-            conn.rollback()
-            success = False
-        
-        cursor.close()
-        conn.close()
+            cursor.close()
         return success
     except psycopg2.errors.UndefinedTable:
         # Table doesn't exist yet
@@ -165,6 +317,47 @@ def add_repo_to_db(repo_url: str, language: str, db_name: str = DEFAULT_DB_NAME)
         return add_repo_to_db(repo_url, language, db_name)
 
 
+def add_repos_to_db(repo_urls: Iterable[str], language: str, db_name: str = DEFAULT_DB_NAME,
+                    page_size: int = 1000) -> List[str]:
+    """Add many repositories to the database in a few round trips.
+
+    Uses a multi-row ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` so
+    existing repositories are skipped without raising.
+
+    Args:
+        repo_urls: Repository URLs (duplicates are ignored)
+        language: The primary programming language of the repositories
+        db_name: Name of the database
+        page_size: Number of rows sent per INSERT statement
+
+    Returns:
+        URLs that were newly added, in input order
+    """
+    unique_urls = list(dict.fromkeys(url for url in repo_urls if url))
+    if not unique_urls:
+        return []
+
+    try:
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            rows = execute_values(
+                cursor,
+                "INSERT INTO repositories (repo_url, language) VALUES %s "
+                "ON CONFLICT (repo_url) DO NOTHING RETURNING repo_url",
+                [(url, language) for url in unique_urls],
+                page_size=page_size,
+                fetch=True,
+            )
+            cursor.close()
+
+        added = {row[0] for row in rows}
+        return [url for url in unique_urls if url in added]
+    except psycopg2.errors.UndefinedTable:
+        # Table doesn't exist yet
+        init_db(db_name)
+        return add_repos_to_db(unique_urls, language, db_name, page_size)
+
+
 def update_test_results(db_name: str, repo_url: str, results: Dict[str, Any]) -> bool:
     """Update the test results for a repository.
     
@@ -186,9 +379,6 @@ def update_test_results(db_name: str, repo_url: str, results: Dict[str, Any]) ->
         True if the update was successful, False otherwise
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
         # Extract values from results dictionary
         test_passed = results.get("IntegrationTestRun", {}).get("pass", False)
         
@@ -198,47 +388,19 @@ def update_test_results(db_name: str, repo_url: str, results: Dict[str, Any]) ->
         stderr = result_data.get("stderr", "")
         test_output = f"STDOUT:\n{stdout}\n\nSTDERR:\n{stderr}"
         
-        # Check if test_output column exists
-        cursor.execute("""
-        SELECT column_name 
-        FROM information_schema.columns 
-        WHERE table_name = 'repositories' AND column_name = 'test_output'
-        """)
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            ensure_column(cursor, db_name, "test_output", "TEXT DEFAULT NULL")
+            ensure_column(cursor, db_name, "test_details", "JSONB DEFAULT NULL")
         
-        if not cursor.fetchone():
-            # Add test_output column if it doesn't exist
-            cursor.execute("""
-            ALTER TABLE repositories 
-            ADD COLUMN test_output TEXT DEFAULT NULL
-            """)
-            conn.commit()
+            # Update test results, output and details
+            cursor.execute(
+                "UPDATE repositories SET test_results = %s, test_output = %s, test_details = %s WHERE repo_url = %s",
+                (test_passed, test_output, json.dumps(results), repo_url)
+            )
             
-        # Check if test_details column exists
-        cursor.execute("""
-        SELECT column_name 
-        FROM information_schema.columns 
-        WHERE table_name = 'repositories' AND column_name = 'test_details'
-        """)
-        
-        if not cursor.fetchone():
-            # Add test_details column if it doesn't exist
-            cursor.execute("""
-            ALTER TABLE repositories 
-            ADD COLUMN test_details JSONB DEFAULT NULL
-            """)
-            conn.commit()
-        
-        # Update test results, output and details
-        import json
-        cursor.execute(
-            "UPDATE repositories SET test_results = %s, test_output = %s, test_details = %s WHERE repo_url = %s",
-            (test_passed, test_output, json.dumps(results), repo_url)
-        )
-        
-        success = cursor.rowcount > 0
-        conn.commit()
-        cursor.close()
-        conn.close()
+            success = cursor.rowcount > 0
+            cursor.close()
         
         return success
     except psycopg2.errors.UndefinedTable:
@@ -259,23 +421,22 @@ def get_untested_repos(language: str = None, limit: int = 10, db_name: str = DEF
         List of tuples containing (repo_url, language)
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        if language:
-            cursor.execute(
-                "SELECT repo_url, language FROM repositories WHERE test_results = FALSE AND language = %s LIMIT %s", 
-                (language, limit)
-            )
-        else:
-            cursor.execute(
-                "SELECT repo_url, language FROM repositories WHERE test_results = FALSE LIMIT %s", 
-                (limit,)
-            )
-        
-        results = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            
+            if language:
+                cursor.execute(
+                    "SELECT repo_url, language FROM repositories WHERE test_results = FALSE AND language = %s LIMIT %s", 
+                    (language, limit)
+                )
+            else:
+                cursor.execute(
+                    "SELECT repo_url, language FROM repositories WHERE test_results = FALSE LIMIT %s", 
+                    (limit,)
+                )
+            
+            results = cursor.fetchall()
+            cursor.close()
         
         return results
     except psycopg2.errors.UndefinedTable:
@@ -295,18 +456,17 @@ def get_unvalidated_repos(limit: int = 10, db_name: str = DEFAULT_DB_NAME) -> Li
         List of repository URLs
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            "SELECT repo_url FROM repositories WHERE validation_results IS NULL LIMIT %s",
-            (limit,)
-        )
-        
-        repos = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        conn.close()
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                "SELECT repo_url FROM repositories WHERE validation_results IS NULL LIMIT %s",
+                (limit,)
+            )
+            
+            repos = [row[0] for row in cursor.fetchall()]
+            
+            cursor.close()
         
         return repos
     except psycopg2.errors.UndefinedTable:
@@ -328,20 +488,18 @@ def update_validation_results(repo_url: str, is_valid: bool, explanation: str, d
         True if the update was successful, False otherwise
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """UPDATE repositories 
-               SET validation_results = %s, validation_explanation = %s 
-               WHERE repo_url = %s""",
-            (is_valid, explanation, repo_url)
-        )
-        
-        success = cursor.rowcount > 0
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                """UPDATE repositories 
+                   SET validation_results = %s, validation_explanation = %s 
+                   WHERE repo_url = %s""",
+                (is_valid, explanation, repo_url)
+            )
+            
+            success = cursor.rowcount > 0
+            cursor.close()
         
         return success
     except psycopg2.errors.UndefinedTable:
@@ -350,6 +508,47 @@ def update_validation_results(repo_url: str, is_valid: bool, explanation: str, d
         return False
 
 
+def update_validation_results_batch(results: Iterable[Tuple[str, bool, str]],
+                                   db_name: str = DEFAULT_DB_NAME,
+                                   page_size: int = 1000) -> int:
+    """Update the validation results of many repositories in a few round trips.
+
+    Args:
+        results: Tuples of (repo_url, is_valid, explanation)
+        db_name: Name of the database
+        page_size: Number of rows sent per UPDATE statement
+
+    Returns:
+        Number of repositories updated
+    """
+    rows = list(results)
+    if not rows:
+        return 0
+
+    try:
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            updated = execute_values(
+                cursor,
+                """UPDATE repositories r
+                   SET validation_results = v.is_valid, validation_explanation = v.explanation
+                   FROM (VALUES %s) AS v (repo_url, is_valid, explanation)
+                   WHERE r.repo_url = v.repo_url
+                   RETURNING r.repo_url""",
+                rows,
+                template="(%s, %s::boolean, %s)",
+                page_size=page_size,
+                fetch=True,
+            )
+            cursor.close()
+
+        return len(updated)
+    except psycopg2.errors.UndefinedTable:
+        # Table doesn't exist yet
+        init_db(db_name)
+        return 0
+
+
 def get_validated_repos(db_name: str = DEFAULT_DB_NAME, limit: int = 10) -> List[str]:
     """Get repositories that have passed validation but haven't been tested yet.
     
@@ -361,20 +560,19 @@ def get_validated_repos(db_name: str = DEFAULT_DB_NAME, limit: int = 10) -> List
         List of repository URLs that passed validation but haven't been tested
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            """SELECT repo_url FROM repositories 
-               WHERE validation_results = TRUE AND test_results = FALSE 
-               LIMIT %s""",
-            (limit,)
-        )
-        
-        repos = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        conn.close()
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                """SELECT repo_url FROM repositories 
+                   WHERE validation_results = TRUE AND test_results = FALSE 
+                   LIMIT %s""",
+                (limit,)
+            )
+            
+            repos = [row[0] for row in cursor.fetchall()]
+            
+            cursor.close()
         
         return repos
     except psycopg2.errors.UndefinedTable:
@@ -395,35 +593,18 @@ def update_repo_commit_id(repo_url: str, commit_id: str, db_name: str = DEFAULT_
         True if the update was successful, False otherwise
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        # Check if commit_id column exists
-        cursor.execute("""
-        SELECT column_name 
-        FROM information_schema.columns 
-        WHERE table_name = 'repositories' AND column_name = 'commit_id'
-        """)
-        
-        if not cursor.fetchone():
-            # Add commit_id column if it doesn't exist
-            cursor.execute("""
-            ALTER TABLE repositories 
-            ADD COLUMN commit_id TEXT DEFAULT NULL
-            """)
-            conn.commit()
-        
-        cursor.execute(
-            """UPDATE repositories 
-               SET commit_id = %s 
-               WHERE repo_url = %s""",
-            (commit_id, repo_url)
-        )
-        
-        success = cursor.rowcount > 0
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            ensure_column(cursor, db_name, "commit_id", "TEXT DEFAULT NULL")
+            cursor.execute(
+                """UPDATE repositories 
+                   SET commit_id = %s 
+                   WHERE repo_url = %s""",
+                (commit_id, repo_url)
+            )
+            
+            success = cursor.rowcount > 0
+            cursor.close()
         
         return success
     except psycopg2.errors.UndefinedTable:
@@ -444,35 +625,18 @@ def update_repo_test_status(repo_url: str, test_results: str, db_name: str = DEF
         True if the update was successful, False otherwise
     """
     try:
-        conn = get_db_connection(db_name)
-        cursor = conn.cursor()
-        
-        # Check if test_results_json column exists
-        cursor.execute("""
-        SELECT column_name 
-        FROM information_schema.columns 
-        WHERE table_name = 'repositories' AND column_name = 'test_results_json'
-        """)
-        
-        if not cursor.fetchone():
-            # Add test_results_json column if it doesn't exist
-            cursor.execute("""
-            ALTER TABLE repositories 
-            ADD COLUMN test_results_json TEXT DEFAULT NULL
-            """)
-            conn.commit()
-        
-        cursor.execute(
-            """UPDATE repositories 
-               SET test_results = TRUE, test_results_json = %s 
-               WHERE repo_url = %s""",
-            (test_results, repo_url)
-        )
-        
-        success = cursor.rowcount > 0
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            ensure_column(cursor, db_name, "test_results_json", "TEXT DEFAULT NULL")
+            cursor.execute(
+                """UPDATE repositories 
+                   SET test_results = TRUE, test_results_json = %s 
+                   WHERE repo_url = %s""",
+                (test_results, repo_url)
+            )
+            
+            success = cursor.rowcount > 0
+            cursor.close()
         
         return success
     except psycopg2.errors.UndefinedTable:
@@ -531,4 +695,29 @@ def run_cmd(
         return_code = -1
         stderr += "\nCommand timed out"
     
-    return stdout, stderr, return_code
\ No newline at end of file
+    return stdout, stderr, return_code
+
+# ---------------------------------
+# File utilities
+# ---------------------------------
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True) -> Iterator[None]:
+    """Hold an ``fcntl`` lock on ``<path>.lock`` for the duration of the block.
+    
+    The lock is advisory and shared between threads and processes on this
+    host: exclusive holders exclude everyone, shared holders only exclude
+    exclusive ones.
+    
+    Args:
+        path: Path of the resource to lock; the lock file sits next to it
+        exclusive: Take an exclusive (write) lock instead of a shared one
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
@@ -0,0 +1,238 @@
+"""work_queue.py
+
+Lease-based job claiming on the ``repositories`` table.
+
+Several workers (threads, processes or machines) can pull work from the same
+database without picking up the same repositories:
+
+* :func:`claim_repos` atomically selects rows for a pipeline stage with
+  ``SELECT ... FOR UPDATE SKIP LOCKED`` and stamps them with
+  ``claimed_by``/``claimed_at``.
+* A claim is a lease: while a worker is busy it refreshes ``claimed_at``
+  (:func:`heartbeat_claims`, or :class:`LeaseHeartbeat` in the background).
+  Rows whose lease is older than ``lease_seconds`` are considered abandoned
+  and can be claimed by another worker.
+* :func:`release_claims` clears the lease once the work is recorded.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Optional
+
+import psycopg2
+
+from eval_agents.core.utils import DEFAULT_DB_NAME, ensure_column, db_connection, init_db
+
+logger = logging.getLogger(__name__)
+
+# Lease duration; a claim not refreshed within this window can be reclaimed
+DEFAULT_LEASE_SECONDS = int(os.getenv("EVAL_AGENTS_CLAIM_LEASE", "900"))
+
+# Heartbeat interval used by LeaseHeartbeat
+DEFAULT_HEARTBEAT_SECONDS = int(os.getenv("EVAL_AGENTS_CLAIM_HEARTBEAT", "60"))
+
+# Selection predicate for each claimable pipeline stage, on the status column
+# that scripts/update_db_schema.py adds together with matching partial indexes
+CLAIM_STAGES: Dict[str, str] = {
+    "validation": "status = 'discovered'",
+    "test": "status IN ('validated', 'failed')",
+}
+
+# The same selections on the result columns, for databases not yet migrated
+LEGACY_CLAIM_STAGES: Dict[str, str] = {
+    "validation": "validation_results IS NULL",
+    "test": "validation_results = TRUE AND (test_results IS NULL OR test_results = FALSE)",
+}
+
+# Databases known to have the status column
+_status_dbs = set()
+
+
+def default_worker_id() -> str:
+    """Return an identifier that is unique per host and process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _ensure_claim_columns(cursor, db_name: str) -> None:
+    ensure_column(cursor, db_name, "claimed_by", "TEXT DEFAULT NULL")
+    ensure_column(cursor, db_name, "claimed_at", "TIMESTAMP DEFAULT NULL")
+
+
+def _claim_predicate(cursor, db_name: str, stage: str) -> str:
+    """Return the selection predicate for *stage*, on the status column if it exists."""
+    if db_name not in _status_dbs:
+        cursor.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = 'repositories' AND column_name = 'status'
+        """)
+        if not cursor.fetchone():
+            return LEGACY_CLAIM_STAGES[stage]
+        _status_dbs.add(db_name)
+    return CLAIM_STAGES[stage]
+
+
+def claim_repos(stage: str, worker_id: str, limit: int = 10,
+                lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                db_name: str = DEFAULT_DB_NAME) -> List[Dict[str, Any]]:
+    """Claim up to *limit* repositories waiting in *stage* for *worker_id*.
+
+    Rows locked by a concurrent claim are skipped rather than waited on, and
+    rows with an expired lease are reclaimed.  Rows are selected by their
+    ``status``; databases without that column (``update_db_schema.py`` has
+    not run) fall back to :data:`LEGACY_CLAIM_STAGES`.
+
+    Args:
+        stage: Pipeline stage, one of :data:`CLAIM_STAGES`
+        worker_id: Identifier of the claiming worker
+        limit: Maximum number of repositories to claim
+        lease_seconds: Age after which another worker's claim is considered abandoned
+        db_name: Name of the database
+
+    Returns:
+        List of dictionaries with ``id``, ``repo_url`` and ``language``
+    """
+    if stage not in CLAIM_STAGES:
+        raise ValueError(f"Unknown stage {stage!r}; expected one of {sorted(CLAIM_STAGES)}")
+
+    try:
+        with db_connection(db_name) as conn:
+            cursor = conn.cursor()
+            _ensure_claim_columns(cursor, db_name)
+            cursor.execute(
+                f"""WITH picked AS (
+                       SELECT id FROM repositories
+                       WHERE {_claim_predicate(cursor, db_name, stage)}
+                       AND (claimed_by IS NULL OR claimed_at < NOW() - %s * INTERVAL '1 second')
+                       ORDER BY id
+                       LIMIT %s
+                       FOR UPDATE SKIP LOCKED
+                   )
+                   UPDATE repositories r
+                   SET claimed_by = %s, claimed_at = NOW()
+                   FROM picked
+                   WHERE r.id = picked.id
+                   RETURNING r.id, r.repo_url, r.language""",
+                (lease_seconds, limit, worker_id)
+            )
+            repos = [{
+                "id": row[0],
+                "repo_url": row[1],
+                "language": row[2]
+            } for row in cursor.fetchall()]
+            cursor.close()
+
+        return sorted(repos, key=lambda r: r["id"])
+    except psycopg2.errors.UndefinedTable:
+        # Table doesn't exist yet
+        init_db(db_name)
+        return []
+
+
+def heartbeat_claims(repo_urls: Iterable[str], worker_id: str,
+                     db_name: str = DEFAULT_DB_NAME) -> int:
+    """Refresh the lease on repositories still claimed by *worker_id*.
+
+    Returns:
+        Number of leases refreshed (claims lost to another worker are not)
+    """
+    urls = list(repo_urls)
+    if not urls:
+        return 0
+    with db_connection(db_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """UPDATE repositories SET claimed_at = NOW()
+               WHERE claimed_by = %s AND repo_url = ANY(%s)""",
+            (worker_id, urls)
+        )
+        count = cursor.rowcount
+        cursor.close()
+    return count
+
+
+def release_claims(repo_urls: Iterable[str], worker_id: str,
+                   db_name: str = DEFAULT_DB_NAME) -> int:
+    """Release repositories claimed by *worker_id*.
+
+    Returns:
+        Number of claims released
+    """
+    urls = list(repo_urls)
+    if not urls:
+        return 0
+    with db_connection(db_name) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """UPDATE repositories SET claimed_by = NULL, claimed_at = NULL
+               WHERE claimed_by = %s AND repo_url = ANY(%s)""",
+            (worker_id, urls)
+        )
+        count = cursor.rowcount
+        cursor.close()
+    return count
+
+
+class LeaseHeartbeat:
+    """Background thread that keeps a worker's claims alive.
+
+    Usage::
+
+        with LeaseHeartbeat(worker_id, urls, db_name) as heartbeat:
+            for url in urls:
+                process(url)
+                heartbeat.discard([url])
+    """
+
+    def __init__(self, worker_id: str, repo_urls: Iterable[str] = (),
+                 db_name: str = DEFAULT_DB_NAME,
+                 interval: float = DEFAULT_HEARTBEAT_SECONDS):
+        self.worker_id = worker_id
+        self.db_name = db_name
+        self.interval = interval
+        self._urls = set(repo_urls)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, repo_urls: Iterable[str]) -> None:
+        with self._lock:
+            self._urls.update(repo_urls)
+
+    def discard(self, repo_urls: Iterable[str]) -> None:
+        with self._lock:
+            self._urls.difference_update(repo_urls)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                urls = list(self._urls)
+            try:
+                refreshed = heartbeat_claims(urls, self.worker_id, self.db_name)
+                if refreshed < len(urls):
+                    logger.info("Lost %d of %d claims for worker %s",
+                                len(urls) - refreshed, len(urls), self.worker_id)
+            except Exception as e:
+                logger.info("Error refreshing claims: %s", e)
+
+    def start(self) -> "LeaseHeartbeat":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
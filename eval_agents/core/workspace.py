@@ -0,0 +1,180 @@
+"""workspace.py
+
+File access to a container's ``/workspace`` through its host bind mount.
+
+Pooled containers (see :mod:`eval_agents.core.container_pool`) mount a host
+temporary directory at ``/workspace``, so every file in a cloned repository
+is also a plain file on the host.  :class:`Workspace` maps container paths
+under a bind mount to host paths and reads or writes them directly instead
+of round-tripping through ``docker exec cat``.  Large files are read through
+``mmap`` so only the requested slice is paged in.
+
+Paths outside any bind mount, and containers on a remote Docker host (the
+mount source is not visible locally), fall back to running commands in the
+container through a :class:`~eval_agents.core.docker_backend.DockerBackend`.
+"""
+from __future__ import annotations
+
+import base64
+import logging
+import mmap
+import os
+import posixpath
+import threading
+from typing import Dict, List, Optional
+
+from eval_agents.core.docker_backend import DockerBackend, DockerSDKBackend
+
+logger = logging.getLogger(__name__)
+
+# Files at least this large are read through mmap
+MMAP_THRESHOLD = int(os.getenv("EVAL_AGENTS_MMAP_THRESHOLD", str(1024 * 1024)))
+
+# Largest base64 chunk passed as one exec argument (below Linux's MAX_ARG_STRLEN)
+_EXEC_CHUNK = 96 * 1024
+
+# container ID or name -> {container path: host path}, registered by the pool
+_mounts: Dict[str, Dict[str, str]] = {}
+_mounts_lock = threading.Lock()
+
+
+def register_mount(container_id: str, host_dir: str, container_dir: str = "/workspace") -> None:
+    """Record that *host_dir* is bind-mounted at *container_dir* in *container_id*."""
+    with _mounts_lock:
+        _mounts.setdefault(container_id, {})[container_dir.rstrip("/") or "/"] = host_dir
+
+
+def unregister(container_id: str) -> None:
+    """Forget the mounts recorded for *container_id*."""
+    with _mounts_lock:
+        _mounts.pop(container_id, None)
+
+
+def _inspect_mounts(backend: DockerBackend, container_id: str) -> Dict[str, str]:
+    """Return the bind mounts of a local container from ``docker inspect``."""
+    if not isinstance(backend, DockerSDKBackend):
+        return {}
+    try:
+        attrs = backend.client.api.inspect_container(container_id)
+    except Exception as e:
+        logger.info(f"Could not inspect mounts of {container_id}: {str(e)}")
+        return {}
+    return {
+        m["Destination"].rstrip("/") or "/": m["Source"]
+        for m in attrs.get("Mounts", [])
+        if m.get("Type") == "bind" and m.get("Source") and m.get("Destination")
+    }
+
+
+class Workspace:
+    """Reads and writes files of one container, via the host mount when possible."""
+
+    def __init__(self, container_id: str, backend: Optional[DockerBackend] = None,
+                 mounts: Optional[Dict[str, str]] = None):
+        self.container_id = container_id
+        self.backend = backend or DockerSDKBackend()
+        if mounts is None:
+            with _mounts_lock:
+                mounts = dict(_mounts.get(container_id, {}))
+            if not mounts:
+                mounts = _inspect_mounts(self.backend, container_id)
+        # Only mounts whose source exists here are usable (not on remote hosts)
+        self.mounts = {dest: src for dest, src in mounts.items() if os.path.isdir(src)}
+
+    def host_path(self, path: str) -> Optional[str]:
+        """Return the host path of container *path*, or None if it is not on a usable mount."""
+        path = posixpath.normpath(path)
+        for dest in sorted(self.mounts, key=len, reverse=True):
+            if path == dest or path.startswith(dest.rstrip("/") + "/"):
+                rel = posixpath.relpath(path, dest)
+                host = os.path.normpath(os.path.join(self.mounts[dest], *rel.split("/")))
+                # Refuse paths that resolve (e.g. through symlinks in the repo) outside the mount
+                root = os.path.realpath(self.mounts[dest])
+                if os.path.realpath(host) == root or os.path.realpath(host).startswith(root + os.sep):
+                    return host
+                return None
+        return None
+
+    def exists(self, path: str) -> bool:
+        host = self.host_path(path)
+        if host is not None:
+            return os.path.isfile(host)
+        return self.backend.exec(self.container_id, ["test", "-f", path]).exit_code == 0
+
+    def list_dir(self, path: str) -> List[str]:
+        """Return the names of the entries in directory *path*, or [] if it does not exist."""
+        host = self.host_path(path)
+        if host is not None:
+            try:
+                return sorted(os.listdir(host))
+            except OSError:
+                return []
+        exit_code, stdout, _ = self.backend.exec(self.container_id, ["ls", "-1", path])
+        return sorted(line for line in stdout.splitlines() if line) if exit_code == 0 else []
+
+    def read_bytes(self, path: str, limit: Optional[int] = None) -> bytes:
+        """Return the contents of *path*, at most *limit* bytes.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        host = self.host_path(path)
+        if host is not None:
+            return _read_host_file(host, limit)
+
+        # exec output is decoded as text, so binary content is base64-encoded in the container
+        if limit is None:
+            script = 'test -f "$1" && base64 < "$1"'
+        else:
+            script = 'test -f "$1" && head -c "$2" "$1" | base64'
+        exit_code, stdout, stderr = self.backend.exec(
+            self.container_id, ["sh", "-c", script, "sh", path, str(limit)]
+        )
+        if exit_code != 0:
+            raise FileNotFoundError(f"{path}: {stderr.strip() or 'not readable'}")
+        return base64.b64decode(stdout)
+
+    def read_text(self, path: str, limit: Optional[int] = None) -> str:
+        """Return the contents of *path* decoded as UTF-8, at most *limit* bytes."""
+        return self.read_bytes(path, limit).decode("utf-8", errors="replace")
+
+    def write_bytes(self, path: str, data: bytes, mode: int = 0o644) -> None:
+        """Write *data* to *path*, creating parent directories."""
+        host = self.host_path(path)
+        if host is not None:
+            os.makedirs(os.path.dirname(host), exist_ok=True)
+            with open(host, "wb") as f:
+                f.write(data)
+            os.chmod(host, mode)
+            return
+
+        encoded = base64.b64encode(data).decode("ascii")
+        chunks = [encoded[i:i + _EXEC_CHUNK] for i in range(0, len(encoded), _EXEC_CHUNK)] or [""]
+        for i, chunk in enumerate(chunks):
+            if i == 0:
+                script = 'mkdir -p "$(dirname "$2")" && printf %s "$1" | base64 -d > "$2.b64part"'
+            else:
+                script = 'printf %s "$1" | base64 -d >> "$2.b64part"'
+            exit_code, _, stderr = self.backend.exec(self.container_id, ["sh", "-c", script, "sh", chunk, path])
+            if exit_code != 0:
+                raise OSError(f"Error writing {path}: {stderr.strip()}")
+        exit_code, _, stderr = self.backend.exec(
+            self.container_id,
+            ["sh", "-c", 'mv "$1.b64part" "$1" && chmod "$2" "$1"', "sh", path, format(mode, "o")],
+        )
+        if exit_code != 0:
+            raise OSError(f"Error writing {path}: {stderr.strip()}")
+
+    def write_text(self, path: str, text: str, mode: int = 0o644) -> None:
+        self.write_bytes(path, text.encode("utf-8"), mode)
+
+
+def _read_host_file(host_path: str, limit: Optional[int] = None) -> bytes:
+    """Read a host file, mapping it into memory when it is large."""
+    with open(host_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        length = size if limit is None else min(size, limit)
+        if size < MMAP_THRESHOLD or length == 0:
+            return f.read(length)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:length]
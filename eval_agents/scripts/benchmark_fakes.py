@@ -0,0 +1,621 @@
+"""
+In-process stand-ins for Docker, GitHub, OpenAI and Anthropic used by benchmark_pipeline.py.
+
+- FakeDockerClient implements the subset of the Docker SDK the agents use
+  (containers.run/get, exec_run, put_archive, the low-level exec API, images).
+  Every container gets a private root directory on the host; bind mounts map
+  to their host directories, so the workspace fast paths behave as with a
+  real daemon.  Commands are answered by pattern: ``git clone`` writes a
+  synthetic repository, ``python3 -c`` scripts (the repository scanner) run
+  on the host against the container's files, the dependency and test scripts
+  only wait, and anything else succeeds immediately.
+- FakeAnthropic answers ``messages.create`` with canned responses chosen by
+  system prompt.
+- FakeAPIServer is a local HTTP server for the GitHub search/repository/tree
+  endpoints and an OpenAI-compatible ``/v1/chat/completions`` endpoint.
+
+Each operation has an OpProfile giving its mean latency, jitter and failure
+rate, so the fakes can model a slow registry, a flaky API or failing test runs.
+"""
+
+import hashlib
+import io
+import json
+import os
+import posixpath
+import random
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import docker
+
+
+@dataclass(frozen=True)
+class OpProfile:
+    """Latency and failure behaviour of one fake operation."""
+
+    latency: float = 0.0  # mean seconds
+    jitter: float = 0.25  # uniform +/- fraction of the latency
+    failure_rate: float = 0.0
+
+
+# Default behaviour of the fakes, roughly the shape of a real run
+DEFAULT_PROFILES = {
+    "container_run": OpProfile(0.5),
+    "exec": OpProfile(0.02),
+    "clone": OpProfile(2.0, failure_rate=0.02),
+    "install": OpProfile(20.0, jitter=0.5, failure_rate=0.05),
+    "tests": OpProfile(8.0, jitter=0.5, failure_rate=0.15),
+    "llm": OpProfile(3.0, jitter=0.5, failure_rate=0.01),
+    "github": OpProfile(0.15, failure_rate=0.01),
+    "openai": OpProfile(4.0, jitter=0.5, failure_rate=0.01),
+}
+
+
+class Behaviour:
+    """Thread-safe source of latencies and failures for the fakes.
+
+    Args:
+        profiles: Overrides of DEFAULT_PROFILES by operation name
+        time_scale: Multiplier applied to every latency (e.g. 0.01 in CI)
+        seed: Seed for reproducible runs
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, OpProfile]] = None,
+                 time_scale: float = 1.0, seed: Optional[int] = None):
+        self.profiles = dict(DEFAULT_PROFILES, **(profiles or {}))
+        self.time_scale = time_scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, op: str) -> None:
+        """Sleep for one sampled latency of *op*."""
+        profile = self.profiles.get(op, OpProfile())
+        with self._lock:
+            spread = self._rng.uniform(-profile.jitter, profile.jitter)
+        seconds = max(0.0, profile.latency * (1 + spread) * self.time_scale)
+        if seconds:
+            time.sleep(seconds)
+
+    def fails(self, op: str) -> bool:
+        profile = self.profiles.get(op, OpProfile())
+        with self._lock:
+            return self._rng.random() < profile.failure_rate
+
+    def run(self, op: str) -> bool:
+        """Wait for *op* and return True if it succeeded."""
+        self.delay(op)
+        return not self.fails(op)
+
+
+# ---------------------------------
+# Synthetic repositories
+# ---------------------------------
+
+REPO_TEST_FILE = "tests/integration/test_api.py"
+
+
+def synthetic_repo(repo_url: str, modules: int = 20) -> Dict[str, str]:
+    """Return the files of the synthetic repository served for *repo_url*."""
+    package = re.sub(r"[^a-z0-9_]", "_", repo_url.rstrip("/").split("/")[-1].lower()) or "package"
+    files = {
+        "README.md": f"# {package}\n",
+        "setup.py": f"from setuptools import setup, find_packages\nsetup(name='{package}', packages=find_packages())\n",
+        "requirements.txt": "requests>=2.31\npytest>=8\n",
+        "pytest.ini": "[pytest]\nmarkers =\n    integration: integration tests\n",
+        f"{package}/__init__.py": "",
+        "tests/__init__.py": "",
+        "tests/conftest.py": "import pytest\n",
+        "tests/test_unit.py": "def test_unit():\n    assert True\n",
+        REPO_TEST_FILE: (
+            "import pytest\n\n\n@pytest.mark.integration\n"
+            "def test_round_trip():\n    assert True\n"
+        ),
+    }
+    for i in range(modules):
+        files[f"{package}/module_{i}.py"] = f"def handler_{i}(value):\n    return value * {i}\n"
+    return files
+
+
+def commit_sha(repo_url: str) -> str:
+    return hashlib.sha1(repo_url.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------
+# Docker
+# ---------------------------------
+
+class FakeImage:
+    def __init__(self, tag: str, size: int = 200 * 1024 ** 2):
+        self.id = "sha256:" + hashlib.sha256(tag.encode("utf-8")).hexdigest()
+        self.tags = [tag]
+        self.attrs = {"Id": self.id, "Size": size}
+
+
+class FakeImages:
+    def __init__(self):
+        self._images: Dict[str, FakeImage] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> FakeImage:
+        with self._lock:
+            image = self._images.get(name)
+            if image is None:
+                # Every base image "exists"
+                image = self._images[name] = FakeImage(name)
+            return image
+
+    def build(self, tag: str = "", **kwargs) -> Tuple[FakeImage, List[Dict[str, str]]]:
+        return self.get(tag), [{"stream": f"Successfully tagged {tag}\n"}]
+
+    def remove(self, image: str, force: bool = False) -> None:
+        with self._lock:
+            self._images.pop(image, None)
+
+
+class FakeContainer:
+    """A container whose filesystem lives in host directories."""
+
+    def __init__(self, client: "FakeDockerClient", image: str, name: str,
+                 volumes: Optional[Dict[str, Dict[str, str]]] = None,
+                 environment: Optional[Dict[str, str]] = None, working_dir: str = "/"):
+        self.client = client
+        self.id = uuid.uuid4().hex
+        self.name = name or self.id[:12]
+        self.image = image
+        self.status = "running"
+        self.environment = dict(environment or {})
+        self.working_dir = working_dir
+        self.rootfs = tempfile.mkdtemp(prefix="fake_container_")
+        # Container path -> host directory, longest first
+        self.mounts = sorted(((spec["bind"].rstrip("/") or "/", host) for host, spec in (volumes or {}).items()),
+                             key=lambda m: -len(m[0]))
+        self.repo_url = ""
+        self.attrs = {
+            "Id": self.id,
+            "Name": "/" + self.name,
+            "Image": client.images.get(image).id,
+            "HostConfig": {"Memory": 0},
+            "Mounts": [{"Type": "bind", "Source": host, "Destination": dest} for dest, host in self.mounts],
+        }
+
+    # Docker SDK API ------------------------------------------------------
+
+    def exec_run(self, cmd, workdir: Optional[str] = None, environment: Optional[Dict[str, str]] = None,
+                 demux: bool = False, **kwargs):
+        api = self.client.api
+        exec_id = api.exec_create(self.id, cmd, environment=environment, workdir=workdir)["Id"]
+        output = api.exec_start(exec_id, demux=demux)
+        return api.exec_inspect(exec_id)["ExitCode"], output
+
+    def put_archive(self, path: str, data: bytes) -> bool:
+        return self.client.api.put_archive(self.id, path, data)
+
+    def commit(self, repository: str = "", tag: str = "", **kwargs) -> FakeImage:
+        return self.client.images.get(f"{repository}:{tag}")
+
+    def reload(self) -> None:
+        pass
+
+    def stop(self, **kwargs) -> None:
+        self.status = "exited"
+
+    def remove(self, force: bool = False, **kwargs) -> None:
+        self.status = "removed"
+        self.client.containers._remove(self)
+        shutil.rmtree(self.rootfs, ignore_errors=True)
+
+    # Filesystem ----------------------------------------------------------
+
+    def host_path(self, path: str, workdir: Optional[str] = None) -> str:
+        """Return the host path backing container *path*."""
+        path = posixpath.normpath(posixpath.join(workdir or self.working_dir, path))
+        for dest, host in self.mounts:
+            if path == dest or path.startswith(dest.rstrip("/") + "/"):
+                return os.path.join(host, posixpath.relpath(path, dest))
+        return os.path.join(self.rootfs, path.lstrip("/"))
+
+    def extract(self, path: str, data: bytes) -> None:
+        with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+            for member in archive.getmembers():
+                target = self.host_path(posixpath.join(path, member.name))
+                if member.isdir():
+                    os.makedirs(target, exist_ok=True)
+                elif member.isfile():
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    with open(target, "wb") as f:
+                        f.write(archive.extractfile(member).read())
+                    os.chmod(target, member.mode & 0o777)
+
+    # Command handling ----------------------------------------------------
+
+    def execute(self, cmd, workdir: Optional[str] = None,
+                environment: Optional[Dict[str, str]] = None) -> Tuple[int, bytes, bytes]:
+        """Run *cmd* against the fake and return (exit_code, stdout, stderr)."""
+        argv = shlex.split(cmd) if isinstance(cmd, str) else list(cmd)
+        text = " ".join(argv)
+        behaviour = self.client.behaviour
+
+        if argv[:2] == ["git", "clone"]:
+            if not behaviour.run("clone"):
+                return 128, b"", b"fatal: simulated clone failure\n"
+            # clone_command() always passes the URL and then the destination last
+            self.repo_url = argv[-2]
+            dest = self.host_path(argv[-1], workdir)
+            for rel, content in synthetic_repo(self.repo_url, self.client.repo_modules).items():
+                target = os.path.join(dest, rel)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "w", encoding="utf-8") as f:
+                    f.write(content)
+            return 0, b"", b"Cloning into '.'...\n"
+        if argv[:2] == ["git", "rev-parse"]:
+            return 0, (commit_sha(self.repo_url) + "\n").encode("utf-8"), b""
+        if "install_dependencies.sh" in text:
+            if not behaviour.run("install"):
+                return 1, b"Collecting requests\n", b"ERROR: simulated dependency failure\n"
+            return 0, b"Successfully installed requests pytest\n", b""
+        if "run_tests.sh" in text:
+            passed = behaviour.run("tests")
+            report_dir = (environment or {}).get("EVAL_AGENTS_JUNIT_DIR")
+            if report_dir:
+                self._write_junit_report(report_dir, failed=0 if passed else 1)
+            if not passed:
+                return 1, b"==== 1 failed, 11 passed in 3.02s ====\n", b""
+            return 0, b"==== 12 passed in 2.87s ====\n", b""
+        if "rm -rf /workspace/*" in text:
+            for dest, host in self.mounts:
+                if dest == "/workspace":
+                    for name in os.listdir(host):
+                        path = os.path.join(host, name)
+                        if os.path.isdir(path):
+                            shutil.rmtree(path, ignore_errors=True)
+                        else:
+                            os.unlink(path)
+            return 0, b"", b""
+        if "import anthropic" in text:
+            return 0, b"", b""
+        if len(argv) >= 3 and argv[0] == "python3" and argv[1] == "-c":
+            return self._run_python(argv[2], argv[3:], workdir)
+        if argv[0] == "cat" and len(argv) == 2:
+            try:
+                with open(self.host_path(argv[1], workdir), "rb") as f:
+                    return 0, f.read(), b""
+            except OSError as e:
+                return 1, b"", f"cat: {argv[1]}: {e.strerror}\n".encode("utf-8")
+        behaviour.delay("exec")
+        return 0, b"", b""
+
+    def _write_junit_report(self, report_dir: str, tests: int = 12, failed: int = 0) -> None:
+        """Write the JUnit report the pytest plugin of core/junit.py would have produced."""
+        cases = []
+        for i in range(tests):
+            failure = '<failure message="assert 1 == 2">AssertionError</failure>' if i < failed else ""
+            cases.append(f'<testcase classname="tests.test_integration" name="test_case_{i}" time="0.24">'
+                         f'{failure}</testcase>')
+        target = self.host_path(posixpath.join(report_dir, f"pytest-{uuid.uuid4().hex[:8]}.xml"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0" encoding="utf-8"?><testsuites><testsuite name="pytest" '
+                    f'tests="{tests}" failures="{failed}">{"".join(cases)}</testsuite></testsuites>')
+
+    def _run_python(self, script: str, args: List[str], workdir: Optional[str]) -> Tuple[int, bytes, bytes]:
+        """Run a ``python3 -c`` script on the host with container paths mapped to host paths."""
+        host_args = [self.host_path(a, workdir) if a.startswith("/") else a for a in args]
+        for arg in host_args:
+            if arg.startswith(self.rootfs):
+                os.makedirs(os.path.dirname(arg), exist_ok=True)
+        result = subprocess.run([sys.executable, "-c", script] + host_args,
+                                capture_output=True, cwd=self.host_path(".", workdir) if workdir else None)
+        stdout = result.stdout
+        for container_arg, host_arg in zip(args, host_args):
+            if container_arg != host_arg:
+                stdout = stdout.replace(json.dumps(host_arg)[1:-1].encode("utf-8"),
+                                        json.dumps(container_arg)[1:-1].encode("utf-8"))
+        return result.returncode, stdout, result.stderr
+
+
+class FakeContainers:
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+        self._containers: Dict[str, FakeContainer] = {}
+        self._lock = threading.Lock()
+
+    def run(self, image: str, command: Any = None, name: Optional[str] = None, detach: bool = True,
+            volumes: Optional[Dict[str, Dict[str, str]]] = None, environment: Optional[Dict[str, str]] = None,
+            working_dir: str = "/", **kwargs) -> FakeContainer:
+        if not self.client.behaviour.run("container_run"):
+            raise docker.errors.APIError("simulated container start failure")
+        container = FakeContainer(self.client, image, name or "", volumes, environment, working_dir)
+        with self._lock:
+            self._containers[container.id] = container
+            self._containers[container.name] = container
+        return container
+
+    def get(self, container_id: str) -> FakeContainer:
+        with self._lock:
+            container = self._containers.get(container_id)
+        if container is None:
+            raise docker.errors.NotFound(f"No such container: {container_id}")
+        return container
+
+    def list(self, **kwargs) -> List[FakeContainer]:
+        with self._lock:
+            return list({c.id: c for c in self._containers.values()}.values())
+
+    def _remove(self, container: FakeContainer) -> None:
+        with self._lock:
+            self._containers.pop(container.id, None)
+            self._containers.pop(container.name, None)
+
+
+class FakeAPIClient:
+    """Low-level API used by stream_exec and the Docker SDK container methods."""
+
+    def __init__(self, client: "FakeDockerClient"):
+        self.client = client
+        self._execs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def exec_create(self, container: str, cmd, environment=None, workdir=None, **kwargs) -> Dict[str, str]:
+        exec_id = uuid.uuid4().hex
+        with self._lock:
+            self._execs[exec_id] = {"container": container, "cmd": cmd, "workdir": workdir,
+                                    "environment": environment, "ExitCode": None}
+        return {"Id": exec_id}
+
+    def exec_start(self, exec_id: str, stream: bool = False, demux: bool = False, **kwargs):
+        with self._lock:
+            spec = self._execs[exec_id]
+        container = self.client.containers.get(spec["container"])
+        exit_code, stdout, stderr = container.execute(spec["cmd"], spec["workdir"], spec["environment"])
+        with self._lock:
+            spec["ExitCode"] = exit_code
+        if stream:
+            return iter([(stdout or None, stderr or None)] if demux else [stdout + stderr])
+        return (stdout or None, stderr or None) if demux else stdout + stderr
+
+    def exec_inspect(self, exec_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return {"ExitCode": self._execs.pop(exec_id)["ExitCode"], "Running": False}
+
+    def inspect_container(self, container: str) -> Dict[str, Any]:
+        return self.client.containers.get(container).attrs
+
+    def put_archive(self, container: str, path: str, data: bytes) -> bool:
+        self.client.containers.get(container).extract(path, data)
+        return True
+
+    def get_archive(self, container: str, path: str, **kwargs):
+        raise docker.errors.NotFound("get_archive is not supported by the fake client")
+
+
+class FakeDockerClient:
+    """Docker SDK client stand-in; install it with ``set_docker_client``.
+
+    Args:
+        behaviour: Latencies and failure rates
+        repo_modules: Number of modules in each synthetic repository
+    """
+
+    def __init__(self, behaviour: Optional[Behaviour] = None, repo_modules: int = 20):
+        self.behaviour = behaviour or Behaviour()
+        self.repo_modules = repo_modules
+        self.images = FakeImages()
+        self.containers = FakeContainers(self)
+        self.api = FakeAPIClient(self)
+
+    def version(self) -> Dict[str, str]:
+        return {"Version": "fake"}
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        for container in self.containers.list():
+            container.remove(force=True)
+
+
+# ---------------------------------
+# Anthropic
+# ---------------------------------
+
+_TEST_SCRIPT = f"#!/bin/sh\ncd /workspace/repo\npython3 -m pytest {REPO_TEST_FILE}\n"
+_INSTALL_SCRIPT = "#!/bin/sh\nset -e\npip install -r requirements.txt\npip install pytest\n"
+
+# (system prompt marker, response); the first match wins
+_CLAUDE_RESPONSES = [
+    ("commit ID", "0" * 40),
+    ("install all dependencies", _INSTALL_SCRIPT),
+    ("fixing dependency issues", _INSTALL_SCRIPT),
+    ("identify integration test files", json.dumps([f"/workspace/repo/{REPO_TEST_FILE}"])),
+    ("BusyBox sh-compatible", _TEST_SCRIPT),
+    ("JSON data formatting", "{}"),
+    ("determining test validity", json.dumps({
+        "validity": "VALID_SUCCESS", "reason": "Tests ran", "fixable": False,
+        "suggested_fix": "", "confidence": 90,
+    })),
+    ("extract only the relevant test results", "test_round_trip PASSED\n12 passed"),
+]
+
+
+class _FakeMessages:
+    def __init__(self, behaviour: Behaviour):
+        self.behaviour = behaviour
+
+    def create(self, **params) -> SimpleNamespace:
+        if not self.behaviour.run("llm"):
+            raise RuntimeError("simulated Anthropic API error")
+        system = params.get("system", "")
+        text = next((response for marker, response in _CLAUDE_RESPONSES if marker in system), "")
+        prompt_chars = len(system) + sum(len(str(m.get("content", ""))) for m in params.get("messages", []))
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=prompt_chars // 4, output_tokens=max(1, len(text) // 4)),
+            model=params.get("model"),
+            stop_reason="end_turn",
+        )
+
+
+class FakeAnthropic:
+    """``anthropic.Anthropic`` stand-in answering the agents' prompts."""
+
+    def __init__(self, behaviour: Optional[Behaviour] = None):
+        self.messages = _FakeMessages(behaviour or Behaviour())
+
+
+# ---------------------------------
+# GitHub and OpenAI over HTTP
+# ---------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FakeAPIServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        resource = "search" if url.path.startswith("/search/") else "core"
+        headers = {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": "4999",
+            "X-RateLimit-Reset": str(int(time.time()) + 3600),
+            "X-RateLimit-Resource": resource,
+        }
+        if not self.server.behaviour.run("github"):
+            self._send(502, {"message": "simulated server error"}, headers)
+            return
+
+        parts = url.path.strip("/").split("/")
+        if url.path == "/search/repositories":
+            query = parse_qs(url.query)
+            page = int(query.get("page", ["1"])[0])
+            per_page = int(query.get("per_page", ["30"])[0])
+            start = (page - 1) * per_page
+            items = [self.server.repo_info("bench-org", f"repo-{i}")
+                     for i in range(start, min(start + per_page, self.server.search_total))]
+            self._send(200, {"total_count": self.server.search_total, "incomplete_results": False,
+                             "items": items}, headers)
+        elif len(parts) == 3 and parts[0] == "repos":
+            self._send(200, self.server.repo_info(parts[1], parts[2]), headers)
+        elif len(parts) == 6 and parts[0] == "repos" and parts[3:5] == ["git", "trees"]:
+            repo_url = f"https://github.com/{parts[1]}/{parts[2]}"
+            paths = sorted(synthetic_repo(repo_url, self.server.repo_modules))
+            dirs = sorted({posixpath.dirname(p) for p in paths if "/" in p})
+            tree = [{"path": d, "type": "tree"} for d in dirs] + [{"path": p, "type": "blob"} for p in paths]
+            self._send(200, {"sha": commit_sha(repo_url), "tree": tree, "truncated": False}, headers)
+        else:
+            self._send(404, {"message": "Not Found"}, headers)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send(404, {"error": {"message": "Not Found"}})
+            return
+        if not self.server.behaviour.run("openai"):
+            self._send(502, {"error": {"message": "simulated server error"}})
+            return
+        with self.server.lock:
+            is_valid = self.server.rng.random() < self.server.valid_rate
+        content = json.dumps({"is_valid": is_valid,
+                              "explanation": "integration tests found" if is_valid else "unit tests only"})
+        self._send(200, {
+            "id": "chatcmpl-" + uuid.uuid4().hex[:12],
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": length // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (length + len(content)) // 4},
+        })
+
+
+class FakeAPIServer(ThreadingHTTPServer):
+    """Local server for GitHub REST (search, repository, tree) and OpenAI chat completions.
+
+    Point ``EVAL_AGENTS_GITHUB_API_URL`` at :attr:`url` and ``OPENAI_BASE_URL``
+    at ``url + "/v1"``.
+
+    Args:
+        behaviour: Latencies and failure rates ("github", "openai")
+        search_total: Number of repositories the search endpoint reports
+        valid_rate: Fraction of repositories the fake model accepts
+        repo_modules: Number of modules in each synthetic repository
+    """
+
+    daemon_threads = True
+
+    def __init__(self, behaviour: Optional[Behaviour] = None, search_total: int = 1000,
+                 valid_rate: float = 0.5, repo_modules: int = 20, seed: Optional[int] = None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.behaviour = behaviour or Behaviour()
+        self.search_total = search_total
+        self.valid_rate = valid_rate
+        self.repo_modules = repo_modules
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def repo_info(self, owner: str, name: str) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "html_url": f"https://github.com/{owner}/{name}",
+            "clone_url": f"https://github.com/{owner}/{name}.git",
+            "description": "Synthetic benchmark repository",
+            "language": "Python",
+            "default_branch": "main",
+            "stargazers_count": 100,
+            "fork": False,
+            "archived": False,
+        }
+
+    def start(self) -> "FakeAPIServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def repo_urls(count: int, owner: str = "bench-org") -> Iterator[str]:
+    """Yield the URLs of *count* synthetic repositories."""
+    for i in range(count):
+        yield f"https://github.com/{owner}/repo-{i}"
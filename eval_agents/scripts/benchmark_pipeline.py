@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Benchmark Pipeline Throughput
+
+Runs the pipeline offline against the stand-ins in benchmark_fakes.py (a fake
+Docker client, a fake Anthropic client and a local GitHub/OpenAI HTTP server)
+and reports the throughput in repositories per hour and the p50/p95 latency of
+every traced stage (see core/telemetry.py) for:
+
+- parallel:   ParallelTestRunner.process_repos_parallel (clone, test, result)
+- clone:      CloneAgent.process_repos_parallel (clone, structure scan)
+- validation: RepoValidationAgent.validate_batch (GitHub fetch, LLM analysis)
+
+Latencies of the fakes are multiplied by --time-scale so a CI run takes
+seconds.  With --baseline the run fails if the throughput of any benchmark
+dropped by more than --tolerance compared to an earlier --output file.
+
+Caches, snapshots, checkpoints and database writes are disabled; traces and
+result files go to a scratch directory.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest import mock
+
+# Import the agents as eval_agents.* so they share the Docker client installed below
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from eval_agents.scripts.benchmark_fakes import (
+    DEFAULT_PROFILES,
+    Behaviour,
+    FakeAnthropic,
+    FakeAPIServer,
+    FakeDockerClient,
+    OpProfile,
+    repo_urls,
+)
+
+BENCHMARKS = ("parallel", "clone", "validation")
+
+# Pooled containers start from this (fake) image instead of building the runner image
+BENCH_IMAGE = "eval-agents-bench:latest"
+
+
+def configure_environment(scratch_dir, api_url):
+    """Point the pipeline at the fakes and keep it away from host caches.
+
+    Must run before any eval_agents.core module is imported, since they read
+    their configuration at import time.
+    """
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.update({
+        "EVAL_AGENTS_GITHUB_API_URL": api_url,
+        "OPENAI_BASE_URL": f"{api_url}/v1",
+        "OPENAI_API_KEY": "bench",
+        "CLAUDE_API_KEY": "bench",
+        "ANTHROPIC_API_KEY": "bench",
+        "GITHUB_TOKEN": "bench",
+        "EVAL_AGENTS_CLONE_STRATEGY": "blobless",
+        "EVAL_AGENTS_LLM_CACHE": "0",
+        "EVAL_AGENTS_HTTP_CACHE": "0",
+        "EVAL_AGENTS_SNAPSHOTS": "0",
+        "EVAL_AGENTS_PIP_CACHE": "0",
+        "EVAL_AGENTS_CHECKPOINTS": "0",
+        "EVAL_AGENTS_METRICS_PORT": "0",
+        "EVAL_AGENTS_TRACE_FILE": os.path.join(scratch_dir, "spans.jsonl"),
+        "EVAL_AGENTS_METRICS_FILE": os.path.join(scratch_dir, "metrics.prom"),
+    })
+
+
+def percentile(sorted_values, fraction):
+    """Return the *fraction* percentile of *sorted_values* by linear interpolation."""
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = fraction * (len(sorted_values) - 1)
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def stage_stats(spans):
+    """Return count, p50, p95 and mean duration of the spans per stage."""
+    durations = {}
+    for span in spans:
+        durations.setdefault(span["stage"], []).append(span["duration"])
+    stats = {}
+    for stage, values in durations.items():
+        values.sort()
+        stats[stage] = {
+            "count": len(values),
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "mean": statistics.fmean(values),
+        }
+    return stats
+
+
+def measure(name, urls, run, trace_file):
+    """Run one benchmark and summarise its throughput and the spans it recorded."""
+    offset = os.path.getsize(trace_file) if os.path.exists(trace_file) else 0
+    start = time.monotonic()
+    succeeded = run(urls)
+    wall = time.monotonic() - start
+
+    spans = []
+    if os.path.exists(trace_file):
+        with open(trace_file, "r", encoding="utf-8") as f:
+            f.seek(offset)
+            spans = [json.loads(line) for line in f if line.strip()]
+    return {
+        "benchmark": name,
+        "repos": len(urls),
+        "succeeded": succeeded,
+        "wall_seconds": wall,
+        "repos_per_hour": len(urls) / wall * 3600 if wall else 0.0,
+        "stages": stage_stats(spans),
+    }
+
+
+def run_parallel_runner(urls, parallel, llm, scratch_dir):
+    """Benchmark ParallelTestRunner with pooled containers; returns the number of passing repos."""
+    from eval_agents.core.container_pool import ContainerPool
+    from eval_agents.core.parallel import ParallelTestRunner
+
+    pool = ContainerPool(size=parallel, image=BENCH_IMAGE)
+    # An unreachable SSH port makes the CloneAgent fall back to the (fake) local Docker
+    runner = ParallelTestRunner(ssh_host="127.0.0.1", ssh_port="1", max_parallel=parallel, db_name=None,
+                                output_dir=os.path.join(scratch_dir, "results"), container_pool=pool)
+    runner.test_agent.claude_client = llm
+    if runner.result_agent is not None:
+        runner.result_agent.claude_client = llm
+    try:
+        results = runner.process_repos_parallel(urls)
+    finally:
+        pool.close()
+    return sum(1 for r in results if r["success"])
+
+
+def run_clone_agent(urls, parallel):
+    """Benchmark CloneAgent.process_repos_parallel; returns the number of cloned repos."""
+    from eval_agents.agents.clone_agent import CloneAgent
+
+    agent = CloneAgent(ssh_host="127.0.0.1", ssh_port="1", clone_strategy="blobless")
+    results = agent.process_repos_parallel(urls, max_parallel=parallel)
+    return sum(1 for r in results if r["success"])
+
+
+def run_validation(urls, concurrency):
+    """Benchmark RepoValidationAgent.validate_batch with an in-memory work queue."""
+    from eval_agents.agents import repo_validation_agent as validation
+    from eval_agents.core import work_queue
+
+    def claim_repos(stage, worker_id, limit=10, db_name=None):
+        return [{"repo_url": url} for url in urls[:limit]]
+
+    with mock.patch.object(validation, "claim_repos", claim_repos), \
+            mock.patch.object(validation, "release_claims", lambda *args, **kwargs: 0), \
+            mock.patch.object(validation, "update_validation_results_batch", lambda *args, **kwargs: None), \
+            mock.patch.object(work_queue, "heartbeat_claims", lambda urls, *args, **kwargs: len(urls)):
+        agent = validation.RepoValidationAgent(db_name="bench")
+        results = agent.validate_batch(limit=len(urls), concurrency=concurrency)
+    return sum(1 for _, _, explanation in results if not explanation.startswith("Error"))
+
+
+def print_report(report, time_scale):
+    print()
+    print(f"{report['benchmark']}: {report['repos']} repos ({report['succeeded']} succeeded) "
+          f"in {report['wall_seconds']:.1f}s -> {report['repos_per_hour']:,.0f} repos/hour "
+          f"(latencies x{time_scale:g})")
+    print(f"  {'stage':<22} {'count':>6} {'p50 (s)':>9} {'p95 (s)':>9} {'mean (s)':>9}")
+    for stage, stats in sorted(report["stages"].items(), key=lambda item: -item[1]["mean"] * item[1]["count"]):
+        print(f"  {stage:<22} {stats['count']:>6} {stats['p50']:>9.3f} {stats['p95']:>9.3f} {stats['mean']:>9.3f}")
+
+
+def regressions(reports, baseline, tolerance):
+    """Return a message for every benchmark slower than *baseline* by more than *tolerance*."""
+    previous = {report["benchmark"]: report for report in baseline.get("reports", [])}
+    messages = []
+    for report in reports:
+        before = previous.get(report["benchmark"])
+        if before and report["repos_per_hour"] < before["repos_per_hour"] * (1 - tolerance):
+            messages.append(f"{report['benchmark']}: {report['repos_per_hour']:,.0f} repos/hour, "
+                            f"baseline {before['repos_per_hour']:,.0f}")
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline throughput against fake backends")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS),
+                        help="Benchmarks to run")
+    parser.add_argument("--repos", type=int, default=40, help="Repositories per benchmark")
+    parser.add_argument("--parallel", type=int, default=4, help="Parallel repositories for runner and clone")
+    parser.add_argument("--concurrency", type=int, default=8, help="Validation concurrency")
+    parser.add_argument("--time-scale", type=float, default=0.01, help="Multiplier for all fake latencies")
+    parser.add_argument("--no-failures", action="store_true", help="Disable simulated failures")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latencies and failures")
+    parser.add_argument("--output", help="Write the reports as JSON to this file")
+    parser.add_argument("--baseline", help="Fail if throughput regressed against this --output file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop against the baseline")
+    args = parser.parse_args()
+
+    profiles = None
+    if args.no_failures:
+        profiles = {name: OpProfile(p.latency, p.jitter, 0.0) for name, p in DEFAULT_PROFILES.items()}
+    behaviour = Behaviour(profiles, time_scale=args.time_scale, seed=args.seed)
+    scratch_dir = tempfile.mkdtemp(prefix="eval_agents_bench_")
+
+    with FakeAPIServer(behaviour, search_total=args.repos, seed=args.seed) as server:
+        configure_environment(scratch_dir, server.url)
+
+        from eval_agents.core import telemetry
+        from eval_agents.core.docker_backend import set_docker_client
+
+        docker_client = FakeDockerClient(behaviour)
+        telemetry.instrument_docker_client(docker_client)
+        set_docker_client(docker_client)
+        llm = FakeAnthropic(behaviour)
+
+        runs = {
+            "parallel": lambda urls: run_parallel_runner(urls, args.parallel, llm, scratch_dir),
+            "clone": lambda urls: run_clone_agent(urls, args.parallel),
+            "validation": lambda urls: run_validation(urls, args.concurrency),
+        }
+        reports = []
+        try:
+            for name in args.benchmarks:
+                print(f"Running {name} benchmark ({args.repos} repos)...")
+                urls = list(repo_urls(args.repos, owner=f"bench-{name}"))
+                reports.append(measure(name, urls, runs[name], telemetry.TRACE_FILE))
+        finally:
+            set_docker_client(None)
+            docker_client.close()
+        telemetry.write_metrics()
+
+    for report in reports:
+        print_report(report, args.time_scale)
+    print()
+    print(f"Traces and metrics: {scratch_dir}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"time_scale": args.time_scale, "reports": reports}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("time_scale") != args.time_scale:
+            print(f"Baseline was recorded with --time-scale {baseline.get('time_scale')}; not comparing")
+            return 0
+        slower = regressions(reports, baseline, args.tolerance)
+        for message in slower:
+            print(f"REGRESSION {message}")
+        return 1 if slower else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
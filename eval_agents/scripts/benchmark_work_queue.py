@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark Work Queue Selection
+
+Builds a scratch copy of the repositories table with a large number of rows
+(1M by default) and measures the latency of each pipeline-state selection
+query before and after creating the indexes from update_db_schema.py.
+
+The scratch table is UNLOGGED and dropped afterwards unless --keep is given.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from dotenv import load_dotenv
+
+# Add parent directory to path to import from core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Import database utilities
+from core.utils import get_db_connection, DEFAULT_DB_NAME
+from scripts.update_db_schema import index_statements
+
+TABLE = "repositories_bench"
+
+# Selection queries issued by the pipeline, keyed by stage
+QUERIES = {
+    "claim validation": f"""SELECT id FROM {TABLE}
+        WHERE status = 'discovered'
+        AND (claimed_by IS NULL OR claimed_at < NOW() - INTERVAL '900 seconds')
+        ORDER BY id LIMIT 10 FOR UPDATE SKIP LOCKED""",
+    "claim test": f"""SELECT id FROM {TABLE}
+        WHERE status IN ('validated', 'failed')
+        AND (claimed_by IS NULL OR claimed_at < NOW() - INTERVAL '900 seconds')
+        ORDER BY id LIMIT 10 FOR UPDATE SKIP LOCKED""",
+    "validated untested": f"""SELECT repo_url, language FROM {TABLE}
+        WHERE validation_results = TRUE AND test_results = FALSE LIMIT 10""",
+    "untested by language": f"""SELECT repo_url, language FROM {TABLE}
+        WHERE test_results = FALSE AND language = 'Go' LIMIT 10""",
+    "expired claims": f"""SELECT COUNT(*) FROM {TABLE}
+        WHERE claimed_by IS NOT NULL AND claimed_at < NOW() - INTERVAL '900 seconds'""",
+}
+
+
+def create_bench_table(cursor, rows):
+    """Create and fill the scratch table.
+
+    Most rows are finished (validated and tested); about 1% are still
+    waiting for validation and 1% for tests, which is the shape of a
+    long-running pipeline where selection queries look for rare rows.
+    """
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(f"""
+    CREATE UNLOGGED TABLE {TABLE} (
+        id SERIAL PRIMARY KEY,
+        repo_url TEXT UNIQUE NOT NULL,
+        language TEXT NOT NULL,
+        test_results BOOLEAN,
+        validation_results BOOLEAN,
+        claimed_by TEXT,
+        claimed_at TIMESTAMP,
+        status TEXT
+    )
+    """)
+    cursor.execute(f"""
+    INSERT INTO {TABLE} (repo_url, language, validation_results, test_results, claimed_by, claimed_at)
+    SELECT
+        'https://github.com/bench/repo-' || g,
+        (ARRAY['Python', 'JavaScript', 'Go', 'Java'])[1 + g % 4],
+        CASE WHEN g % 100 = 0 THEN NULL WHEN g % 10 = 1 THEN FALSE ELSE TRUE END,
+        CASE WHEN g % 100 = 0 THEN NULL WHEN g % 100 = 2 THEN FALSE ELSE TRUE END,
+        CASE WHEN g % 1000 = 3 THEN 'bench-worker' END,
+        CASE WHEN g % 1000 = 3 THEN NOW() - INTERVAL '1 hour' END
+    FROM generate_series(1, %s) AS g
+    """, (rows,))
+    cursor.execute(f"""
+    UPDATE {TABLE} SET status = CASE
+        WHEN validation_results IS NULL THEN 'discovered'
+        WHEN validation_results = FALSE THEN 'rejected'
+        WHEN test_results IS TRUE THEN 'passed'
+        ELSE 'validated'
+    END
+    """)
+    cursor.execute(f"VACUUM ANALYZE {TABLE}")
+
+
+def measure(cursor, repeat):
+    """Return the median execution time in milliseconds of each query."""
+    timings = {}
+    for name, query in QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(query)
+            cursor.fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def explain(cursor, query):
+    """Return the scan node of the query plan."""
+    cursor.execute(f"EXPLAIN (ANALYZE, COSTS OFF) {query}")
+    lines = [row[0].strip().lstrip("-> ") for row in cursor.fetchall()]
+    return next((line for line in lines if "Scan" in line), lines[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark work queue selection queries")
+    parser.add_argument("--db-name", default=DEFAULT_DB_NAME, help="Database to create the scratch table in")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of rows to generate")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table afterwards")
+    args = parser.parse_args()
+
+    conn = get_db_connection(args.db_name)
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    try:
+        print(f"Creating {TABLE} with {args.rows:,} rows...")
+        create_bench_table(cursor, args.rows)
+
+        print("Measuring without indexes...")
+        before = measure(cursor, args.repeat)
+        plans_before = {name: explain(cursor, query) for name, query in QUERIES.items()}
+
+        print("Creating indexes...")
+        for statement in index_statements(TABLE, concurrently=False):
+            cursor.execute(statement)
+        cursor.execute(f"ANALYZE {TABLE}")
+
+        print("Measuring with indexes...")
+        after = measure(cursor, args.repeat)
+        plans_after = {name: explain(cursor, query) for name, query in QUERIES.items()}
+
+        print()
+        print(f"{'query':<24} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>9}")
+        for name in QUERIES:
+            speedup = before[name] / after[name] if after[name] else float("inf")
+            print(f"{name:<24} {before[name]:>12.2f} {after[name]:>12.2f} {speedup:>8.1f}x")
+
+        print()
+        for name in QUERIES:
+            print(f"{name}:")
+            print(f"  before: {plans_before[name]}")
+            print(f"  after:  {plans_after[name]}")
+    finally:
+        if not args.keep:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    load_dotenv()
+    main()
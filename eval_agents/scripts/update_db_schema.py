@@ -1,5 +1,12 @@
 """
-Update database schema to add validation and commit_id columns to the repositories table.
+Update database schema for the repositories work queue.
+
+- Adds the validation, commit_id, test output and claim columns if missing.
+- Adds a ``status`` enum column plus ``updated_at``/``validated_at``/``tested_at``
+  timestamps, maintained by a trigger so existing writers keep working.
+- Adds partial indexes matching each pipeline-state selection query, so
+  picking work no longer needs a sequential scan of the whole table.  Work
+  queue claims (core/work_queue.py) select on ``status`` once it exists.
 """
 
 import os
@@ -13,59 +20,147 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 # Import database utilities
 from core.utils import get_db_connection, DEFAULT_DB_NAME
 
+# Columns added when missing: (name, definition)
+COLUMNS = [
+    ("validation_results", "BOOLEAN DEFAULT NULL"),
+    ("validation_explanation", "TEXT DEFAULT NULL"),
+    ("commit_id", "TEXT DEFAULT NULL"),
+    ("test_output", "TEXT DEFAULT NULL"),
+    ("test_details", "JSONB DEFAULT NULL"),
+    ("claimed_by", "TEXT DEFAULT NULL"),
+    ("claimed_at", "TIMESTAMP DEFAULT NULL"),
+    ("status", "repo_status NOT NULL DEFAULT 'discovered'"),
+    ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ("validated_at", "TIMESTAMP DEFAULT NULL"),
+    ("tested_at", "TIMESTAMP DEFAULT NULL"),
+]
+
+# Pipeline states of a repository
+STATUS_VALUES = ["discovered", "validated", "rejected", "passed", "failed"]
+
+# SQL expression deriving the status from the legacy result columns
+STATUS_EXPRESSION = """CASE
+    WHEN {row}validation_results IS NULL THEN 'discovered'
+    WHEN {row}validation_results = FALSE THEN 'rejected'
+    WHEN {row}test_results IS TRUE THEN 'passed'
+    WHEN {row}test_output IS NOT NULL THEN 'failed'
+    ELSE 'validated'
+END::repo_status"""
+
+# Partial indexes for the work-selection queries: (name, columns, predicate).
+# Predicates must match the WHERE clauses in core/utils.py and
+# core/work_queue.py for the planner to use them.
+WORK_QUEUE_INDEXES = [
+    ("unvalidated", "id", "validation_results IS NULL"),
+    ("claim_validation", "id", "status = 'discovered'"),
+    ("claim_test", "id", "status IN ('validated', 'failed')"),
+    ("validated_untested", "id", "validation_results = TRUE AND test_results = FALSE"),
+    ("untested_language", "language, id", "test_results = FALSE"),
+    ("claimed_at", "claimed_at", "claimed_by IS NOT NULL"),
+    ("status", "status", None),
+]
+
+# Indexes replaced by the ones above, dropped by update_schema
+OBSOLETE_INDEXES = ["untested"]
+
+
+def index_statements(table="repositories", concurrently=True):
+    """Return the CREATE INDEX statements for *table*."""
+    statements = []
+    for name, columns, predicate in WORK_QUEUE_INDEXES:
+        statement = (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+            f"idx_{table}_{name} ON {table} ({columns})"
+        )
+        if predicate:
+            statement += f" WHERE {predicate}"
+        statements.append(statement)
+    return statements
+
+
+def _create_status_type(cursor):
+    """Create the repo_status enum type if it doesn't exist."""
+    values = ", ".join(f"'{value}'" for value in STATUS_VALUES)
+    cursor.execute(f"""
+    DO $$ BEGIN
+        CREATE TYPE repo_status AS ENUM ({values});
+    EXCEPTION
+        WHEN duplicate_object THEN NULL;
+    END $$
+    """)
+
+
+def _create_status_trigger(cursor):
+    """Keep status and timestamps in sync with the result columns."""
+    cursor.execute(f"""
+    CREATE OR REPLACE FUNCTION repositories_track_status() RETURNS trigger AS $$
+    BEGIN
+        NEW.status := {STATUS_EXPRESSION.format(row="NEW.")};
+        NEW.updated_at := NOW();
+        IF TG_OP = 'INSERT' OR NEW.validation_results IS DISTINCT FROM OLD.validation_results THEN
+            NEW.validated_at := CASE WHEN NEW.validation_results IS NULL THEN NULL ELSE NOW() END;
+        END IF;
+        IF TG_OP = 'UPDATE' AND (NEW.test_results IS DISTINCT FROM OLD.test_results
+                                 OR NEW.test_output IS DISTINCT FROM OLD.test_output) THEN
+            NEW.tested_at := NOW();
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS repositories_track_status ON repositories")
+    cursor.execute("""
+    CREATE TRIGGER repositories_track_status
+    BEFORE INSERT OR UPDATE OF validation_results, test_results, test_output ON repositories
+    FOR EACH ROW EXECUTE FUNCTION repositories_track_status()
+    """)
+
+
 def update_schema(db_name=DEFAULT_DB_NAME):
-    """Add validation and commit_id columns to the repositories table if they don't exist."""
+    """Add work-queue columns, status tracking and indexes to the repositories table."""
     print(f"Updating database schema for {db_name}...")
-    
+
     conn = get_db_connection(db_name)
     cursor = conn.cursor()
-    
-    # Check if validation_results column exists
-    cursor.execute("""
-    SELECT column_name 
-    FROM information_schema.columns 
-    WHERE table_name = 'repositories' AND column_name = 'validation_results'
-    """)
-    
-    if not cursor.fetchone():
-        print("Adding validation_results column...")
-        cursor.execute("""
-        ALTER TABLE repositories 
-        ADD COLUMN validation_results BOOLEAN DEFAULT NULL
-        """)
-    
-    # Check if validation_explanation column exists
-    cursor.execute("""
-    SELECT column_name 
-    FROM information_schema.columns 
-    WHERE table_name = 'repositories' AND column_name = 'validation_explanation'
-    """)
-    
-    if not cursor.fetchone():
-        print("Adding validation_explanation column...")
+
+    _create_status_type(cursor)
+
+    for column, definition in COLUMNS:
         cursor.execute("""
-        ALTER TABLE repositories 
-        ADD COLUMN validation_explanation TEXT DEFAULT NULL
-        """)
-    
-    # Check if commit_id column exists
-    cursor.execute("""
-    SELECT column_name 
-    FROM information_schema.columns 
-    WHERE table_name = 'repositories' AND column_name = 'commit_id'
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = 'repositories' AND column_name = %s
+        """, (column,))
+
+        if not cursor.fetchone():
+            print(f"Adding {column} column...")
+            cursor.execute(f"ALTER TABLE repositories ADD COLUMN {column} {definition}")
+
+    print("Backfilling status and timestamps...")
+    cursor.execute(f"""
+    UPDATE repositories
+    SET status = {STATUS_EXPRESSION.format(row="")},
+        validated_at = COALESCE(validated_at, CASE WHEN validation_results IS NULL THEN NULL ELSE added_at END)
+    WHERE status IS DISTINCT FROM {STATUS_EXPRESSION.format(row="")}
+       OR (validation_results IS NOT NULL AND validated_at IS NULL)
     """)
-    
-    if not cursor.fetchone():
-        print("Adding commit_id column...")
-        cursor.execute("""
-        ALTER TABLE repositories 
-        ADD COLUMN commit_id TEXT DEFAULT NULL
-        """)
-    
+    print(f"Backfilled {cursor.rowcount} rows")
+
+    _create_status_trigger(cursor)
     conn.commit()
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    conn.autocommit = True
+    for name in OBSOLETE_INDEXES:
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS idx_repositories_{name}")
+    for statement in index_statements():
+        print(f"Running: {statement}")
+        cursor.execute(statement)
+    cursor.execute("ANALYZE repositories")
+
     cursor.close()
     conn.close()
-    
+
     print("Database schema updated successfully!")
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import eval_agents from this checkout without installing it
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+import requests
+
+from eval_agents.core.github import RateLimitGovernor, resource_for
+
+
+def _headers(limit, remaining, reset_in, resource="core"):
+    return {
+        "X-RateLimit-Resource": resource,
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time() + reset_in)),
+    }
+
+
+def test_default_limits_depend_on_authentication():
+    assert RateLimitGovernor(authenticated=True)._bucket("core").limit == 5000
+    assert RateLimitGovernor(authenticated=False)._bucket("core").limit == 60
+    assert RateLimitGovernor(authenticated=False)._bucket("search").limit == 10
+
+
+def test_full_budget_is_not_paced():
+    governor = RateLimitGovernor(authenticated=True)
+    assert governor.reserve("core") == (0.0, True)
+    assert governor._bucket("core").remaining == 4999
+
+
+def test_exhausted_bucket_waits_for_reset():
+    governor = RateLimitGovernor(authenticated=True)
+    governor.update(_headers(5000, 0, reset_in=100))
+    wait, reserved = governor.reserve("core")
+    assert not reserved
+    assert 95 < wait <= 101
+
+
+def test_low_budget_is_spread_until_reset():
+    governor = RateLimitGovernor(authenticated=True, pace_fraction=0.2)
+    governor.update(_headers(100, 10, reset_in=10))
+    waits = [governor.reserve("core") for _ in range(3)]
+    assert all(reserved for _, reserved in waits)
+    assert waits[0][0] == 0.0
+    # Ten requests left for about ten seconds: roughly one per second
+    assert 0.5 < waits[1][0] < 1.5
+    assert 1.5 < waits[2][0] < 2.5
+
+
+def test_out_of_order_responses_keep_the_lowest_count():
+    governor = RateLimitGovernor(authenticated=True)
+    headers = _headers(5000, 100, reset_in=600)
+    governor.update(headers)
+    governor.update({**headers, "X-RateLimit-Remaining": "150"})
+    assert governor._bucket("core").remaining == 100
+    # A later reset starts a new window
+    governor.update(_headers(5000, 4999, reset_in=4000))
+    assert governor._bucket("core").remaining == 4999
+
+
+def test_retry_after_blocks_the_bucket():
+    governor = RateLimitGovernor(authenticated=True)
+    governor.update({"Retry-After": "30"}, "search", status=403)
+    wait, reserved = governor.reserve("search")
+    assert not reserved
+    assert 29 < wait <= 30
+    assert governor.reserve("core") == (0.0, True)
+
+
+def test_refund_does_not_exceed_limit():
+    governor = RateLimitGovernor(authenticated=True)
+    governor.reserve("core")
+    governor.refund("core")
+    governor.refund("core")
+    assert governor._bucket("core").remaining == 5000
+
+
+@pytest.mark.parametrize("status, headers, text, expected", [
+    (429, {}, "", True),
+    (403, {"X-RateLimit-Remaining": "0"}, "", True),
+    (403, {"Retry-After": "60"}, "", True),
+    (403, {}, "You have exceeded a secondary rate limit", True),
+    (403, {"X-RateLimit-Remaining": "12"}, "Resource not accessible", False),
+    (404, {}, "", False),
+])
+def test_is_rate_limited(status, headers, text, expected):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.headers.update(headers)
+    resp._content = text.encode("utf-8")
+    assert RateLimitGovernor().is_rate_limited(resp) is expected
+
+
+def test_resource_for():
+    assert resource_for("/search/code") == "code_search"
+    assert resource_for("/search/repositories") == "search"
+    assert resource_for("/repos/owner/name") == "core"
@@ -0,0 +1,33 @@
+import requests
+
+from eval_agents.core.http_cache import HTTPCache
+
+URL = "https://api.github.com/repos/owner/repo"
+
+
+def _response(body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = 200
+    resp._content = body
+    resp.headers["ETag"] = '"abc"'
+    return resp
+
+
+def test_entries_are_separate_per_token_and_accept(tmp_path):
+    cache = HTTPCache(directory=str(tmp_path))
+    alice = {"Accept": "application/vnd.github+json", "Authorization": "Bearer alice"}
+    cache.store(URL, _response(b"private"), alice)
+
+    assert cache.lookup(URL, alice).etag == '"abc"'
+    assert cache.lookup(URL, {**alice, "Authorization": "Bearer bob"}) is None
+    assert cache.lookup(URL, {"Accept": "application/vnd.github+json"}) is None
+    assert cache.lookup(URL, {**alice, "Accept": "application/vnd.github.raw"}) is None
+
+
+def test_token_is_not_written_to_disk(tmp_path):
+    cache = HTTPCache(directory=str(tmp_path))
+    cache.store(URL, _response(b"{}"), {"Authorization": "Bearer secret-token"})
+    for path in tmp_path.rglob("*"):
+        if path.is_file():
+            assert b"secret-token" not in path.read_bytes()
+            assert "secret-token" not in path.name
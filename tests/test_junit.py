@@ -0,0 +1,110 @@
+import io
+import os
+import posixpath
+import subprocess
+import sys
+
+from eval_agents.core import junit
+
+REPORT = b"""<?xml version="1.0" encoding="utf-8"?>
+<testsuites>
+  <testsuite name="pytest" tests="4" failures="1" errors="1" skipped="1">
+    <testcase classname="tests.test_api" name="test_ok" time="0.5" file="tests/test_api.py"/>
+    <testcase classname="tests.test_api" name="test_bad" time="0.25">
+      <failure message="assert 1 == 2">Traceback...</failure>
+    </testcase>
+    <testcase classname="tests.test_api" name="test_broken" time="bogus">
+      <error>fixture 'db' not found</error>
+    </testcase>
+    <testcase classname="" name="test_skip">
+      <skipped message="needs network"/>
+    </testcase>
+  </testsuite>
+</testsuites>
+"""
+
+
+class FakeWorkspace:
+    """Container files held in memory; nothing is on a host mount."""
+
+    def __init__(self, files):
+        self.files = files
+
+    def host_path(self, path):
+        return None
+
+    def list_dir(self, path):
+        return sorted(posixpath.basename(p) for p in self.files if posixpath.dirname(p) == path)
+
+    def read_bytes(self, path, limit=None):
+        return self.files[path]
+
+    def write_text(self, path, text):
+        self.files[path] = text.encode("utf-8")
+
+
+def test_iter_testcases():
+    cases = list(junit.iter_testcases(io.BytesIO(REPORT)))
+    assert [(c.test_id, c.status) for c in cases] == [
+        ("tests.test_api.test_ok", "passed"),
+        ("tests.test_api.test_bad", "failed"),
+        ("tests.test_api.test_broken", "error"),
+        ("test_skip", "skipped"),
+    ]
+    assert cases[0].time == 0.5 and cases[0].file == "tests/test_api.py"
+    assert cases[1].message == "assert 1 == 2"
+    assert cases[2].time is None
+    assert cases[2].message == "fixture 'db' not found"
+
+
+def test_collect_adds_up_reports_and_survives_truncated_ones():
+    files = FakeWorkspace({
+        "/r/a.xml": REPORT,
+        "/r/b.xml": REPORT,
+        "/r/c.xml": REPORT[:200],
+        "/r/notes.txt": b"ignored",
+    })
+    result = junit.collect(files, "/r")
+    summary = result["summary"]
+    assert result["reports"] == 3
+    assert (summary["passed"], summary["failed"], summary["errors"], summary["skipped"]) == (2, 2, 2, 2)
+    assert summary["failed_tests"] == ["tests.test_api.test_bad", "tests.test_api.test_broken"]
+    assert summary["duration"] == 1.5
+    assert len(result["tests"]) == 8
+
+
+def test_collect_caps_passing_records(monkeypatch):
+    monkeypatch.setattr(junit, "MAX_RECORDS", 1)
+    result = junit.collect(FakeWorkspace({"/r/a.xml": REPORT, "/r/b.xml": REPORT}), "/r")
+    assert result["summary"]["passed"] == 2
+    assert [r["status"] for r in result["tests"]].count("passed") == 1
+    assert len(result["tests"]) == 7
+
+
+def test_collect_without_reports():
+    assert junit.collect(FakeWorkspace({}), "/r") is None
+
+
+def test_prepare_installs_plugin():
+    files = FakeWorkspace({})
+    env = junit.prepare(files)
+    assert posixpath.join(junit.PLUGIN_DIR, "eval_agents_junit.py") in files.files
+    assert env["PYTEST_ADDOPTS"] == "-p eval_agents_junit"
+    assert env["EVAL_AGENTS_JUNIT_DIR"].startswith(junit.REPORT_ROOT + "/")
+
+
+def test_plugin_writes_a_report_per_pytest_run(tmp_path):
+    (tmp_path / "plugins").mkdir()
+    (tmp_path / "plugins" / f"{junit.PLUGIN_MODULE}.py").write_text(junit.PYTEST_PLUGIN)
+    (tmp_path / "test_sample.py").write_text("def test_one():\n    pass\n")
+    report_dir = tmp_path / "reports"
+    env = dict(os.environ, EVAL_AGENTS_JUNIT_DIR=str(report_dir), PYTHONPATH=str(tmp_path / "plugins"),
+               PYTEST_ADDOPTS=f"-p {junit.PLUGIN_MODULE} -p no:cacheprovider")
+    for _ in range(2):
+        subprocess.run([sys.executable, "-m", "pytest", "-q", "test_sample.py"], cwd=tmp_path, env=env,
+                       check=True, capture_output=True)
+
+    reports = sorted(report_dir.iterdir())
+    assert len(reports) == 2
+    with open(reports[0], "rb") as f:
+        assert [c.test_id for c in junit.iter_testcases(f)] == ["test_sample.test_one"]
@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("anthropic")
+pytest.importorskip("dotenv")
+
+from eval_agents.agents.result_agent import ResultAgent
+from eval_agents.core import telemetry
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setattr(telemetry, "TRACE_FILE", "0")
+    agent = ResultAgent(output_dir=str(tmp_path))
+    agent.prompts = []
+
+    def ask_claude(prompt, system_prompt=None):
+        agent.prompts.append(prompt)
+        return '{"validity": "INVALID_ENVIRONMENT", "reason": "missing requests", "fixable": true, "confidence": 0.9}'
+
+    monkeypatch.setattr(agent, "ask_claude", ask_claude)
+    return agent
+
+
+def test_import_error_next_to_clean_summary_is_left_to_claude(agent):
+    output = "ModuleNotFoundError: No module named 'requests'\n===== 2 passed in 0.10s =====\n"
+    result = agent.extract_and_save_results(output, repo_name="repo", exit_code=1)
+    assert result["validity"] == "INVALID_ENVIRONMENT"
+    # Only the validity needed Claude; the counts came from the parser
+    assert len(agent.prompts) == 1
+    assert result["parser"] == "pytest"
+
+
+def test_clean_run_needs_no_claude(agent):
+    result = agent.extract_and_save_results("===== 2 passed in 0.10s =====\n", repo_name="repo", exit_code=0)
+    assert result["validity"] == "VALID_SUCCESS"
+    assert agent.prompts == []
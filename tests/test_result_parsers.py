@@ -0,0 +1,90 @@
+import pytest
+
+from eval_agents.core import result_parsers
+
+
+def test_pytest_summaries_are_added_up():
+    output = (
+        "FAILED tests/test_a.py::test_x - assert 1 == 2\n"
+        "========== 1 failed, 2 passed, 1 skipped in 0.12s ==========\n"
+        "3 passed in 0.01s\n"
+    )
+    parsed = result_parsers.parse(output)
+    assert parsed.framework == "pytest"
+    assert (parsed.passed, parsed.failed, parsed.skipped) == (5, 1, 1)
+    assert parsed.failed_tests == ["tests/test_a.py::test_x"]
+    assert parsed.duration == pytest.approx(0.13)
+
+
+def test_unittest_failures_and_skips():
+    output = (
+        "FAIL: test_b (tests.test_m.T)\n"
+        "----------------------------------------------------------------------\n"
+        "Ran 3 tests in 0.001s\n\n"
+        "FAILED (failures=1, skipped=1)\n"
+    )
+    parsed = result_parsers.parse(output)
+    assert parsed.framework == "unittest"
+    assert (parsed.passed, parsed.failed, parsed.skipped) == (1, 1, 1)
+    assert parsed.failed_tests == ["tests.test_m.T.test_b"]
+
+
+def test_jest_go_and_maven_summaries():
+    jest = result_parsers.parse("  ● Math › adds\n\nTests:       1 failed, 10 passed, 11 total\nTime:        2.5 s\n")
+    assert (jest.framework, jest.passed, jest.failed) == ("jest", 10, 1)
+    assert jest.failed_tests == ["Math › adds"]
+
+    go = result_parsers.parse("--- PASS: TestA (0.00s)\n--- FAIL: TestB (0.01s)\n"
+                              "    --- FAIL: TestB/sub (0.00s)\nFAIL\texample.com/pkg\t0.012s\n")
+    assert (go.framework, go.passed, go.failed, go.failed_tests) == ("go", 1, 1, ["TestB"])
+
+    maven = result_parsers.parse("testBar(com.x.FooTest)  Time elapsed: 0.01 s  <<< FAILURE!\n\n"
+                                 "Tests run: 3, Failures: 1, Errors: 0, Skipped: 0\n")
+    assert (maven.framework, maven.passed, maven.failed) == ("junit", 2, 1)
+    assert maven.failed_tests == ["com.x.FooTest.testBar"]
+
+
+def test_unrecognised_output_is_not_parsed():
+    assert result_parsers.parse("Collecting requests\nSuccessfully installed requests\n") is None
+
+
+def test_tox_verdict_is_below_a_stricter_threshold():
+    output = "  py311: commands succeeded\n  congratulations :)\n"
+    assert result_parsers.parse(output).framework == "tox"
+    assert result_parsers.parse(output, min_confidence=0.9) is None
+
+
+def test_round_trip_through_dict():
+    parsed = result_parsers.parse("==== 1 failed, 3 passed in 0.2s ====\nFAILED t.py::test_a\n")
+    assert result_parsers.ParsedResults.from_dict(parsed.to_dict()) == parsed
+
+
+def test_clean_summary_with_passing_exit_code_is_success():
+    output = "===== 2 passed in 0.10s =====\n"
+    parsed = result_parsers.parse(output)
+    assert result_parsers.classify(parsed, output, exit_code=0)[0] == "VALID_SUCCESS"
+
+
+def test_clean_summary_next_to_an_import_error_needs_the_llm():
+    # One test file died on import, another printed a clean summary
+    output = "ModuleNotFoundError: No module named 'requests'\n===== 2 passed in 0.10s =====\n"
+    parsed = result_parsers.parse(output)
+    assert parsed.success
+    assert result_parsers.environment_errors(output)
+    assert result_parsers.classify(parsed, output, exit_code=1) is None
+    assert result_parsers.classify(parsed, output, exit_code=0) is None
+
+
+def test_clean_summary_with_failing_exit_code_needs_the_llm():
+    output = "===== 2 passed in 0.10s =====\n"
+    parsed = result_parsers.parse(output)
+    assert result_parsers.classify(parsed, output, exit_code=1) is None
+    assert result_parsers.classify(parsed, output, exit_code=None) is None
+
+
+def test_plain_test_failures_are_valid_failures():
+    output = "FAILED t.py::test_a - assert 0\n===== 1 failed, 3 passed in 0.2s =====\n"
+    parsed = result_parsers.parse(output)
+    validity, reason = result_parsers.classify(parsed, output, exit_code=1)
+    assert validity == "VALID_FAILURE"
+    assert "t.py::test_a" in reason
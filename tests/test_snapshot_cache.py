@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("docker")
+pytest.importorskip("psycopg2")
+pytest.importorskip("dotenv")
+
+from eval_agents.core.snapshot_cache import dependency_files, snapshot_key
+
+FILES = {"requirements.txt": b"requests==2.31.0\n", "pyproject.toml": b"[project]\nname = 'x'\n"}
+
+
+def test_key_ignores_file_order():
+    reordered = dict(reversed(list(FILES.items())))
+    assert snapshot_key("sha256:base", FILES) == snapshot_key("sha256:base", reordered)
+
+
+def test_key_changes_with_base_image_and_contents():
+    key = snapshot_key("sha256:base", FILES)
+    assert snapshot_key("sha256:other", FILES) != key
+    assert snapshot_key("sha256:base", {**FILES, "requirements.txt": b"requests==2.32.0\n"}) != key
+    assert snapshot_key("sha256:base", {**FILES, "setup.cfg": b""}) != key
+
+
+def test_key_does_not_confuse_path_and_content_boundaries():
+    assert snapshot_key("base", {"a": b"bc"}) != snapshot_key("base", {"ab": b"c"})
+
+
+def test_dependency_files_only_at_root_or_requirements_dir():
+    paths = [
+        "requirements.txt", "requirements/dev.txt", "dev-requirements.txt", "pyproject.toml",
+        "docs/requirements.txt", "vendor/lib/setup.py", "src/app.py", "README.md",
+    ]
+    assert dependency_files(paths) == [
+        "dev-requirements.txt", "pyproject.toml", "requirements.txt", "requirements/dev.txt",
+    ]
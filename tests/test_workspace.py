@@ -0,0 +1,47 @@
+import subprocess
+
+import pytest
+
+pytest.importorskip("docker")
+
+from eval_agents.core.docker_backend import DockerBackend, ExecResult
+from eval_agents.core.workspace import Workspace
+
+
+class LocalBackend(DockerBackend):
+    """Runs the "container" commands on the host, decoding output like the real backends."""
+
+    name = "local"
+
+    def version(self):
+        return "local"
+
+    def run_container(self, image, name, workdir="/workspace", mem_limit="2g", volumes=None):
+        raise NotImplementedError
+
+    def exec(self, container, cmd, workdir=None):
+        proc = subprocess.run(cmd, cwd=workdir, capture_output=True)
+        return ExecResult(proc.returncode, proc.stdout.decode("utf-8", errors="replace"),
+                          proc.stderr.decode("utf-8", errors="replace"))
+
+    def remove_container(self, container):
+        pass
+
+
+@pytest.fixture
+def files():
+    # No mounts: every read and write goes through exec
+    return Workspace("container", backend=LocalBackend(), mounts={})
+
+
+def test_exec_fallback_round_trips_binary_content(files, tmp_path):
+    data = bytes(range(256)) * 1000
+    path = str(tmp_path / "data.bin")
+    files.write_bytes(path, data)
+    assert files.read_bytes(path) == data
+    assert files.read_bytes(path, limit=300) == data[:300]
+
+
+def test_exec_fallback_missing_file(files, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        files.read_bytes(str(tmp_path / "missing"))